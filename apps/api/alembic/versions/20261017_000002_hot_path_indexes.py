@@ -0,0 +1,74 @@
+"""hot path indexes
+
+Revision ID: 20261017_000002
+Revises: 20260210_000001
+Create Date: 2026-10-17 00:00:02
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261017_000002"
+down_revision = "20260210_000001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_goals_user_id_created_at",
+        "goals",
+        ["user_id", "created_at"],
+    )
+
+    op.create_index(
+        "ix_focus_sessions_user_id_started_at",
+        "focus_sessions",
+        ["user_id", "started_at"],
+        postgresql_include=["duration_seconds"],
+    )
+    op.create_index(
+        "ix_focus_sessions_active",
+        "focus_sessions",
+        ["user_id", "started_at"],
+        postgresql_where=sa.text("status IN ('running', 'paused')"),
+    )
+
+    op.create_index(
+        "ix_goal_logs_date",
+        "goal_logs",
+        ["date"],
+        postgresql_include=["goal_id", "value"],
+    )
+    op.create_index(
+        "ix_goal_logs_focus_session_id",
+        "goal_logs",
+        ["focus_session_id"],
+        postgresql_where=sa.text("focus_session_id IS NOT NULL"),
+    )
+
+    op.create_index(
+        "ix_goal_revisions_goal_id_valid_from",
+        "goal_revisions",
+        ["goal_id", "valid_from"],
+    )
+    op.create_index(
+        "ix_goal_revisions_open",
+        "goal_revisions",
+        ["goal_id"],
+        postgresql_where=sa.text("valid_to IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_goal_revisions_open", table_name="goal_revisions")
+    op.drop_index("ix_goal_revisions_goal_id_valid_from", table_name="goal_revisions")
+    op.drop_index("ix_goal_logs_focus_session_id", table_name="goal_logs")
+    op.drop_index("ix_goal_logs_date", table_name="goal_logs")
+    op.drop_index("ix_focus_sessions_active", table_name="focus_sessions")
+    op.drop_index("ix_focus_sessions_user_id_started_at", table_name="focus_sessions")
+    op.drop_index("ix_goals_user_id_created_at", table_name="goals")
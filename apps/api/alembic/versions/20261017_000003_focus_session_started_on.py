@@ -0,0 +1,40 @@
+"""focus session started_on
+
+Revision ID: 20261017_000003
+Revises: 20261017_000002
+Create Date: 2026-10-17 00:00:03
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261017_000003"
+down_revision = "20261017_000002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("focus_sessions", sa.Column("started_on", sa.Date()))
+
+    # Mismo dia que create_focus_log asigna al GoalLog (started_at en UTC)
+    op.execute(
+        "UPDATE focus_sessions SET started_on = (started_at AT TIME ZONE 'UTC')::date"
+    )
+    op.alter_column("focus_sessions", "started_on", nullable=False)
+
+    op.create_index(
+        "ix_focus_sessions_user_id_started_on",
+        "focus_sessions",
+        ["user_id", "started_on"],
+        postgresql_include=["goal_id", "duration_seconds"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_focus_sessions_user_id_started_on", table_name="focus_sessions")
+    op.drop_column("focus_sessions", "started_on")
@@ -0,0 +1,78 @@
+"""daily rollups
+
+Revision ID: 20261017_000004
+Revises: 20261017_000003
+Create Date: 2026-10-17 00:00:04
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261017_000004"
+down_revision = "20261017_000003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_rollups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "user_id",
+            sa.Integer(),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "goal_id",
+            sa.Integer(),
+            sa.ForeignKey("goals.id", ondelete="CASCADE"),
+        ),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("value_sum", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("log_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("focus_seconds", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("session_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.UniqueConstraint(
+            "user_id",
+            "goal_id",
+            "date",
+            name="uq_daily_rollups_user_id_goal_id_date",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+    op.create_index("ix_daily_rollups_user_id_date", "daily_rollups", ["user_id", "date"])
+    op.create_index("ix_daily_rollups_goal_id_date", "daily_rollups", ["goal_id", "date"])
+
+    # Backfill desde las filas crudas; mismo calculo que services.rollups.compute_rollups
+    op.execute(
+        """
+        INSERT INTO daily_rollups (user_id, goal_id, date, value_sum, log_count, focus_seconds, session_count)
+        SELECT user_id, goal_id, date, SUM(value_sum), SUM(log_count), SUM(focus_seconds), SUM(session_count)
+        FROM (
+            SELECT g.user_id, l.goal_id, l.date,
+                   SUM(l.value) AS value_sum, COUNT(*) AS log_count,
+                   0 AS focus_seconds, 0 AS session_count
+            FROM goal_logs l
+            JOIN goals g ON g.id = l.goal_id
+            GROUP BY g.user_id, l.goal_id, l.date
+            UNION ALL
+            SELECT s.user_id, s.goal_id, s.started_on AS date,
+                   0, 0, SUM(s.duration_seconds), COUNT(*)
+            FROM focus_sessions s
+            GROUP BY s.user_id, s.goal_id, s.started_on
+        ) AS parts
+        GROUP BY user_id, goal_id, date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_daily_rollups_goal_id_date", table_name="daily_rollups")
+    op.drop_index("ix_daily_rollups_user_id_date", table_name="daily_rollups")
+    op.drop_table("daily_rollups")
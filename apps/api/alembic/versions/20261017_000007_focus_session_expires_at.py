@@ -0,0 +1,41 @@
+"""focus session expires_at
+
+Revision ID: 20261017_000007
+Revises: 20261017_000006
+Create Date: 2026-10-17 00:00:07
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261017_000007"
+down_revision = "20261017_000006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("focus_sessions", sa.Column("expires_at", sa.DateTime(timezone=True)))
+
+    # Solo las sesiones activas necesitan vencimiento
+    op.execute(
+        "UPDATE focus_sessions "
+        "SET expires_at = started_at + (duration_seconds + paused_seconds) * interval '1 second' "
+        "WHERE status IN ('running', 'paused')"
+    )
+
+    op.create_index(
+        "ix_focus_sessions_active_expires_at",
+        "focus_sessions",
+        ["expires_at"],
+        postgresql_where=sa.text("status IN ('running', 'paused')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_focus_sessions_active_expires_at", table_name="focus_sessions")
+    op.drop_column("focus_sessions", "expires_at")
@@ -0,0 +1,34 @@
+"""user revision version
+
+Revision ID: 20261017_000008
+Revises: 20261017_000007
+Create Date: 2026-10-17 00:00:08
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261017_000008"
+down_revision = "20261017_000007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column(
+            "revision_version",
+            sa.Integer(),
+            nullable=False,
+            server_default=sa.text("0"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "revision_version")
@@ -5,17 +5,18 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 from starlette.status import HTTP_401_UNAUTHORIZED
 
-from app.services.auth import get_current_user
+from app.services.auth import CurrentUser, get_current_user
 from app.core.settings import settings
 from app.core.security import create_access_token, hash_password, verify_password
 from app.services.system_conf import is_registration_enabled, verify_admin_password
-from app.db.session import get_db
+from app.db.session import get_sync_db
 from app.models.user import User
 from app.models.system_conf import SystemSetting
 from app.schemas.user import UserCreate, UserLogin, UserOut
 from app.schemas.system import RegistrationToggle
 
 #Auth Router
+# Sesion sincrona siempre: bcrypt es costoso y no debe bloquear el event loop en modo DB_ASYNC
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 # Domain Restriction Missing
 def _set_auth_cookie(response: Response, token: str) -> None:
@@ -42,7 +43,7 @@ def _set_auth_cookie(response: Response, token: str) -> None:
 def login(
     payload: UserLogin,
     response: Response,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_sync_db),
 ):
     username = payload.username.lower().strip()
 
@@ -62,7 +63,7 @@ def login(
             detail="Invalid credentials",
         )
 
-    token = create_access_token(user.id)
+    token = create_access_token(user.id, user.token_version, user.is_active)
     _set_auth_cookie(response, token)
 
     return user
@@ -87,7 +88,7 @@ def login(
 def register(
     payload: UserCreate,
     response: Response,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_sync_db),
 ):
     if not is_registration_enabled(db):
         raise HTTPException(
@@ -121,7 +122,7 @@ def register(
     db.commit()
     db.refresh(user)
 
-    token = create_access_token(user.id)
+    token = create_access_token(user.id, user.token_version, user.is_active)
     _set_auth_cookie(response, token)
 
     return user
@@ -141,7 +142,7 @@ def register(
 )
 def toggle_registration(
     payload: RegistrationToggle,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_sync_db),
 ):
     if not verify_admin_password(payload.admin_password):
         raise HTTPException(
@@ -197,7 +198,11 @@ def logout(response: Response):
     },
 )
 def me(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_sync_db),
 ):
-    return current_user
+    user = db.get(User, current_user.id)
+    if not user:
+        raise HTTPException(status_code=HTTP_401_UNAUTHORIZED, detail="User inactive")
+    return user
 
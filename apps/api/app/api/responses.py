@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, Sequence
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.engine import Row
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON rendered by orjson; UTC datetimes end in Z, as Pydantic writes them."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+def schema_columns(model: type, schema: type[BaseModel]) -> tuple[Any, ...]:
+    """Columns of the ORM model named like the schema fields, in schema order."""
+    return tuple(getattr(model, name) for name in schema.model_fields)
+
+
+def schema_rows(rows: Iterable[Row], schema: type[BaseModel]) -> list[dict[str, Any]]:
+    """Rows selected with schema_columns as plain dicts, without validating each one."""
+    keys: Sequence[str] = tuple(schema.model_fields)
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def fast_json(content: Any, response: Response) -> ORJSONResponse:
+    """Skips response_model validation for bulk payloads built from SQL rows.
+
+    Headers set by dependencies on the injected response (ETag,
+    Cache-Control) are carried over, since FastAPI only merges them into
+    responses it builds itself.
+    """
+    fast = ORJSONResponse(content)
+    fast.headers.raw.extend(response.headers.raw)
+    return fast
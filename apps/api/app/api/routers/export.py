@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.status import HTTP_400_BAD_REQUEST
+
+from app.api.routing import SessionRoute
+from app.services.auth import CurrentUser, get_current_user
+from app.services.export import EXPORT_ENTITIES, ExportFormat, stream_export
+
+
+router = APIRouter(prefix="/api/export", tags=["export"], dependencies=[Depends(get_current_user)], route_class=SessionRoute)
+
+_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+@router.get(
+    "",
+    summary="Export history",
+    description=(
+        "Streams the user's goals, revisions, logs and focus sessions. NDJSON exports "
+        "every entity with a 'type' field per line; CSV exports a single entity. "
+        "Set gzip=true to receive a gzip-compressed file."
+    ),
+    responses={
+        200: {"description": "Export stream"},
+        400: {"description": "CSV export requires a single entity"},
+    },
+)
+def export_history(
+    export_format: ExportFormat = Query(default="ndjson", alias="format"),
+    entity: Literal["all", "goals", "revisions", "logs", "sessions"] = Query(default="all"),
+    compress: bool = Query(default=False, alias="gzip"),
+    user: CurrentUser = Depends(get_current_user),
+):
+    if export_format == "csv" and entity == "all":
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="CSV export requires a single entity")
+
+    entities = EXPORT_ENTITIES if entity == "all" else (entity,)
+    filename = f"ethos-{entity}.{export_format}"
+    media_type = _MEDIA_TYPES[export_format]
+    if compress:
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        stream_export(user.id, export_format, entities, compress),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
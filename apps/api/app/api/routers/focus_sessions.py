@@ -1,18 +1,36 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
-from sqlalchemy import func, select
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from starlette.status import HTTP_400_BAD_REQUEST, HTTP_409_CONFLICT
 
+from app.api.responses import fast_json, schema_columns, schema_rows
+from app.api.routing import SessionRoute
+from app.core.cache import stats_cache
 from app.db.session import get_db
 from app.models.focussession import FocusSession
-from app.models.user import User
 from app.schemas.focus_session import FocusSessionCreate, FocusSessionOut, FocusSessionsOut
-from app.services.focus import utcnow, is_expired, active_session, create_focus_log
-from app.services.auth import get_current_user
+from app.services.focus import (
+    utcnow,
+    is_expired,
+    active_session,
+    complete_expired_sessions,
+    create_focus_log,
+    session_expires_at,
+)
+from app.services.focus_events import focus_event_stream, publish_session
+from app.services.auth import CurrentUser, get_current_user
+from app.services.pagination import count_rows, keyset_page
+from app.services.rollups import record_session
+from app.services.versioning import bump_data_version, etag_guard
+
+router = APIRouter(prefix="/api/focus", tags=["focus_sessions"], dependencies=[Depends(get_current_user)], route_class=SessionRoute)
 
-router = APIRouter(prefix="/api/focus", tags=["focus_sessions"], dependencies=[Depends(get_current_user)])
+def _locked_session(db: Session, session_id: int) -> FocusSession | None:
+    # Bloquea la fila: el barrido (SKIP LOCKED) la salta y, si la completo antes, se lee ya completada
+    return db.get(FocusSession, session_id, with_for_update=True)
 
 def _ensure_owns_session(session: FocusSession | None, user_id: int) -> FocusSession:
     if not session or session.user_id != user_id:
@@ -34,33 +52,37 @@ def _ensure_owns_session(session: FocusSession | None, user_id: int) -> FocusSes
 def create_session(
     payload: FocusSessionCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
 ):
     if payload.duration_seconds % 60 != 0:
         raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Duration must be in 60 second steps")
 
-    existing = active_session(db, user.id)
-    if existing:
-        now = utcnow()
-        if not is_expired(existing, now):
-            raise HTTPException(status_code=HTTP_409_CONFLICT, detail="Active session exists")
-        existing.status = "completed"
-        existing.ended_at = now
-        create_focus_log(db, existing)
-        db.commit()
+    # Una sesion vencida que el barrido aun no completo no bloquea la nueva
+    expired = complete_expired_sessions(db, utcnow(), user_id=user.id)
+    if active_session(db, user.id):
+        raise HTTPException(status_code=HTTP_409_CONFLICT, detail="Active session exists")
 
+    started_at = utcnow()
     session = FocusSession(
         user_id=user.id,
         goal_id=payload.goal_id,
         duration_seconds=payload.duration_seconds,
         paused_seconds=0,
         status="running",
-        started_at=utcnow(),
+        started_at=started_at,
+        started_on=started_at.date(),
         ended_at=None,
     )
+    session.expires_at = session_expires_at(session)
     db.add(session)
+    record_session(db, session)
+    bump_data_version(db, user.id)
     db.commit()
+    stats_cache.invalidate_user(user.id)
     db.refresh(session)
+    for item in expired:
+        publish_session(item, "completed")
+    publish_session(session)
     return session
 
 @router.post(
@@ -76,9 +98,9 @@ def create_session(
 def complete_session(
     session_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
 ):
-    session = _ensure_owns_session(db.get(FocusSession, session_id), user.id)
+    session = _ensure_owns_session(_locked_session(db, session_id), user.id)
     if session.status in {"completed", "canceled"}:
         raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Session already finished")
 
@@ -87,8 +109,11 @@ def complete_session(
     session.status = "completed"
     session.ended_at = now
     create_focus_log(db, session)
+    bump_data_version(db, user.id)
     db.commit()
+    stats_cache.invalidate_user(user.id)
     db.refresh(session)
+    publish_session(session)
     return session
 
 
@@ -105,15 +130,17 @@ def complete_session(
 def pause_session(
     session_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
 ):
-    session = _ensure_owns_session(db.get(FocusSession, session_id), user.id)
+    session = _ensure_owns_session(_locked_session(db, session_id), user.id)
     if session.status != "running":
         raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Session is not running")
     session.status = "paused"
     session.ended_at = utcnow()
+    bump_data_version(db, user.id)
     db.commit()
     db.refresh(session)
+    publish_session(session)
     return session
 
 
@@ -130,9 +157,9 @@ def pause_session(
 def resume_session(
     session_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
 ):
-    session = _ensure_owns_session(db.get(FocusSession, session_id), user.id)
+    session = _ensure_owns_session(_locked_session(db, session_id), user.id)
     if session.status != "paused":
         raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Session is not paused")
     now = utcnow()
@@ -140,8 +167,11 @@ def resume_session(
         session.paused_seconds += int((now - session.ended_at).total_seconds())
     session.status = "running"
     session.ended_at = None
+    session.expires_at = session_expires_at(session)
+    bump_data_version(db, user.id)
     db.commit()
     db.refresh(session)
+    publish_session(session)
     return session
 
 
@@ -158,15 +188,17 @@ def resume_session(
 def cancel_session(
     session_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
 ):
-    session = _ensure_owns_session(db.get(FocusSession, session_id), user.id)
+    session = _ensure_owns_session(_locked_session(db, session_id), user.id)
     if session.status in {"completed", "canceled"}:
         raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Session already finished")
     session.status = "canceled"
     session.ended_at = utcnow()
+    bump_data_version(db, user.id)
     db.commit()
     db.refresh(session)
+    publish_session(session)
     return session
 
 
@@ -174,29 +206,29 @@ def cancel_session(
     "/sessions",
     response_model=FocusSessionsOut,
     summary="List sessions",
-    description="Lists sessions with pagination.",
+    description=(
+        "Lists sessions with offset or keyset (next_cursor) pagination; "
+        "the total count can be skipped with include_total=false."
+    ),
+    dependencies=[Depends(etag_guard)],
 )
 def list_sessions(
+    response: Response,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(default=None),
+    include_total: bool = Query(default=True),
 ):
-    total = db.execute(
-        select(func.count()).select_from(FocusSession).where(FocusSession.user_id == user.id)
-    ).scalar_one()
-    items = (
-        db.execute(
-            select(FocusSession)
-            .where(FocusSession.user_id == user.id)
-            .order_by(FocusSession.started_at.desc())
-            .limit(limit)
-            .offset(offset)
-        )
-        .scalars()
-        .all()
+    base = select(*schema_columns(FocusSession, FocusSessionOut)).where(FocusSession.user_id == user.id)
+    total = count_rows(db, base) if include_total else None
+    rows, next_cursor = keyset_page(
+        db, base, (FocusSession.started_at, FocusSession.id), limit, offset, cursor
+    )
+    return fast_json(
+        {"items": schema_rows(rows, FocusSessionOut), "total": total, "next_cursor": next_cursor}, response
     )
-    return {"items": items, "total": total}
 
 
 @router.get(
@@ -206,17 +238,29 @@ def list_sessions(
     summary="Current session",
     description="Returns the current active session if any.",
 )
-def get_current_session(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def get_current_session(db: Session = Depends(get_db), user: CurrentUser = Depends(get_current_user)):
     session = active_session(db, user.id)
-    if not session:
+    # Solo lectura: la sesion vencida la completa el barrido en segundo plano
+    if not session or is_expired(session, utcnow()):
         return Response(status_code=204)
+    return session
 
-    now = utcnow()
-    if is_expired(session, now):
-        session.status = "completed"
-        session.ended_at = now
-        create_focus_log(db, session)
-        db.commit()
-        return Response(status_code=204)
 
-    return session
+@router.get(
+    "/sessions/events",
+    summary="Session event stream",
+    description=(
+        "Server-sent events replacing polling of /sessions/current: `session` carries the "
+        "active session (or null) on connect and after every change, `completed` is sent "
+        "when a running session reaches its duration."
+    ),
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def session_events(user: CurrentUser = Depends(get_current_user)):
+    return StreamingResponse(
+        focus_event_stream(user.id),
+        media_type="text/event-stream",
+        # Sin buffering en nginx para que cada evento salga en cuanto se genera
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
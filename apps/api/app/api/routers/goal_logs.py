@@ -2,20 +2,47 @@ from __future__ import annotations
 
 from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from starlette.status import HTTP_404_NOT_FOUND
+from starlette.status import HTTP_404_NOT_FOUND, HTTP_413_CONTENT_TOO_LARGE
 
-from app.db.session import get_db
+from app.api.responses import fast_json, schema_columns, schema_rows
+from app.api.routing import SessionRoute
+from app.core.cache import stats_cache
+from app.db.session import get_db, run_db
 from app.models.goal import Goal
 from app.models.goallog import GoalLog
-from app.models.user import User
-from app.schemas.goallog import GoalLogCreate, GoalLogOut, GoalLogsOut, GoalLogUpdate
-from app.services.auth import get_current_user
+from app.schemas.goallog import (
+    GoalLogBatchIn,
+    GoalLogBatchOut,
+    GoalLogCreate,
+    GoalLogImportOut,
+    GoalLogOut,
+    GoalLogsOut,
+    GoalLogUpdate,
+)
+from app.services.auth import CurrentUser, get_current_user
+from app.services.importer import (
+    MAX_IMPORT_ERRORS,
+    ImportFormat,
+    ImportLimitError,
+    ImportResult,
+    ImportRow,
+    RowParser,
+    import_goal_logs,
+)
+from app.services.pagination import count_rows, keyset_page
+from app.services.rollups import record_log, record_log_totals, record_log_value_change
+from app.services.versioning import bump_data_version, etag_guard
 
 
-router = APIRouter(prefix="/api", tags=["goal_logs"], dependencies=[Depends(get_current_user)])
+router = APIRouter(prefix="/api", tags=["goal_logs"], dependencies=[Depends(get_current_user)], route_class=SessionRoute)
+
+# Orden de los listados, el id desempata para la paginacion por cursor
+LOG_ORDER = (GoalLog.date, GoalLog.created_at, GoalLog.id)
+# Los listados leen columnas sueltas y se serializan sin validar cada fila
+LOG_COLUMNS = schema_columns(GoalLog, GoalLogOut)
 
 
 def _ensure_owns(goal: Goal | None, user_id: int) -> Goal:
@@ -39,7 +66,7 @@ def create_goal_log(
     goal_id: int,
     payload: GoalLogCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
 ):
     goal = _ensure_owns(db.get(Goal, goal_id), user.id)
     log = GoalLog(
@@ -50,7 +77,10 @@ def create_goal_log(
         source="manual",
     )
     db.add(log)
+    record_log(db, user.id, log)
+    bump_data_version(db, user.id)
     db.commit()
+    stats_cache.invalidate_user(user.id)
     db.refresh(log)
     return log
 
@@ -59,32 +89,30 @@ def create_goal_log(
     "/goals/{goal_id}/logs",
     response_model=GoalLogsOut,
     summary="List goal logs",
-    description="Lists logs for a goal with pagination.",
+    description=(
+        "Lists logs for a goal. Supports offset pagination or keyset pagination "
+        "through the opaque next_cursor; the total count can be skipped with include_total=false."
+    ),
     responses={404: {"description": "Goal not found"}},
+    dependencies=[Depends(etag_guard)],
 )
 def list_goal_logs(
     goal_id: int,
+    response: Response,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(default=None),
+    include_total: bool = Query(default=True),
 ):
     goal = _ensure_owns(db.get(Goal, goal_id), user.id)
-    total = db.execute(
-        select(func.count()).select_from(GoalLog).where(GoalLog.goal_id == goal.id)
-    ).scalar_one()
-    items = (
-        db.execute(
-            select(GoalLog)
-            .where(GoalLog.goal_id == goal.id)
-            .order_by(GoalLog.date.desc(), GoalLog.created_at.desc())
-            .limit(limit)
-            .offset(offset)
-        )
-        .scalars()
-        .all()
+    base = select(*LOG_COLUMNS).where(GoalLog.goal_id == goal.id)
+    total = count_rows(db, base) if include_total else None
+    rows, next_cursor = keyset_page(db, base, LOG_ORDER, limit, offset, cursor)
+    return fast_json(
+        {"items": schema_rows(rows, GoalLogOut), "total": total, "next_cursor": next_cursor}, response
     )
-    return {"items": items, "total": total}
 
 
 @router.patch(
@@ -101,15 +129,19 @@ def update_goal_log(
     log_id: int,
     payload: GoalLogUpdate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
 ):
     goal = _ensure_owns(db.get(Goal, goal_id), user.id)
     log = db.get(GoalLog, log_id)
     if not log or log.goal_id != goal.id or log.focus_session_id is not None:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Log not found")
 
+    old_value = log.value
     log.value = payload.value
+    record_log_value_change(db, user.id, log, old_value)
+    bump_data_version(db, user.id)
     db.commit()
+    stats_cache.invalidate_user(user.id)
     db.refresh(log)
     return log
 
@@ -125,14 +157,17 @@ def delete_goal_log(
     goal_id: int,
     log_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
 ):
     goal = _ensure_owns(db.get(Goal, goal_id), user.id)
     log = db.get(GoalLog, log_id)
     if not log or log.goal_id != goal.id or log.focus_session_id is not None:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Log not found")
+    record_log(db, user.id, log, sign=-1)
     db.delete(log)
+    bump_data_version(db, user.id)
     db.commit()
+    stats_cache.invalidate_user(user.id)
     return None
 
 
@@ -140,42 +175,160 @@ def delete_goal_log(
     "/logs",
     response_model=GoalLogsOut,
     summary="List logs by range",
-    description="Lists logs filtered by date range.",
+    description=(
+        "Lists logs filtered by date range. Supports offset pagination or keyset pagination "
+        "through the opaque next_cursor; the total count can be skipped with include_total=false."
+    ),
+    dependencies=[Depends(etag_guard)],
 )
 def list_logs_by_date_range(
+    response: Response,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
     start_date: date | None = Query(default=None),
     end_date: date | None = Query(default=None),
     limit: int = Query(200, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(default=None),
+    include_total: bool = Query(default=True),
 ):
-    base = select(GoalLog).join(Goal, GoalLog.goal_id == Goal.id).where(Goal.user_id == user.id)
+    base = select(*LOG_COLUMNS).join(Goal, GoalLog.goal_id == Goal.id).where(Goal.user_id == user.id)
     if start_date:
         base = base.where(GoalLog.date >= start_date)
     if end_date:
         base = base.where(GoalLog.date <= end_date)
 
-    total_query = (
-        select(func.count())
-        .select_from(GoalLog)
-        .join(Goal, GoalLog.goal_id == Goal.id)
-        .where(Goal.user_id == user.id)
+    total = count_rows(db, base) if include_total else None
+    rows, next_cursor = keyset_page(db, base, LOG_ORDER, limit, offset, cursor)
+    return fast_json(
+        {"items": schema_rows(rows, GoalLogOut), "total": total, "next_cursor": next_cursor}, response
     )
-    if start_date:
-        total_query = total_query.where(GoalLog.date >= start_date)
-    if end_date:
-        total_query = total_query.where(GoalLog.date <= end_date)
 
-    total = db.execute(total_query).scalar_one()
 
-    items = (
-        db.execute(
-            base.order_by(GoalLog.date.desc(), GoalLog.created_at.desc())
-            .limit(limit)
-            .offset(offset)
-        )
-        .scalars()
-        .all()
+def _apply_import(db: Session, user_id: int, rows: list[ImportRow]) -> ImportResult:
+    result = import_goal_logs(db, user_id, rows)
+    if result.inserted:
+        bump_data_version(db, user_id)
+        db.commit()
+        stats_cache.invalidate_user(user_id)
+    return result
+
+
+@router.post(
+    "/logs/import",
+    response_model=GoalLogImportOut,
+    summary="Bulk import logs",
+    description=(
+        "Imports logs from a streamed CSV (header goal_id,date,value) or NDJSON body. "
+        "Rows are inserted in batches with source 'import'. Invalid rows, unknown goals and "
+        "logs that already exist for a goal and date are reported per line and skipped. "
+        "A body over the size, line length or row limits is rejected with 413 and nothing is imported."
+    ),
+    responses={413: {"description": "Body, line or row count over the import limits"}},
+)
+async def import_logs(
+    request: Request,
+    import_format: ImportFormat = Query(default="csv", alias="format"),
+    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(get_current_user),
+):
+    parser = RowParser(import_format)
+    try:
+        # Al pasar un limite se deja de leer el cuerpo
+        async for chunk in request.stream():
+            parser.feed(chunk)
+        parser.close()
+    except ImportLimitError as exc:
+        raise HTTPException(status_code=HTTP_413_CONTENT_TOO_LARGE, detail=str(exc))
+
+    # El acceso a la base es sincrono: threadpool o run_sync segun DB_ASYNC
+    result = await run_db(db, _apply_import, user.id, parser.rows)
+
+    # Cada lista ya viene recortada y en orden de linea
+    errors = sorted(parser.result.errors + result.errors, key=lambda item: item.line)
+    return {
+        "inserted": result.inserted,
+        "skipped": parser.result.skipped + result.skipped,
+        "errors": [{"line": item.line, "error": item.error} for item in errors[:MAX_IMPORT_ERRORS]],
+    }
+
+
+@router.post(
+    "/logs/batch",
+    response_model=GoalLogBatchOut,
+    summary="Batch log changes",
+    description=(
+        "Applies a list of manual log create, update and delete operations across goals "
+        "in a single transaction. If any operation fails nothing is applied."
+    ),
+    responses={404: {"description": "Goal or log not found"}},
+)
+def batch_goal_logs(
+    payload: GoalLogBatchIn,
+    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(get_current_user),
+):
+    operations = payload.operations
+    goal_ids = {operation.goal_id for operation in operations}
+    owned = set(
+        db.execute(select(Goal.id).where(Goal.user_id == user.id).where(Goal.id.in_(goal_ids))).scalars()
     )
-    return {"items": items, "total": total}
+    log_ids = {operation.log_id for operation in operations if operation.op != "create"}
+    logs = {}
+    if log_ids:
+        logs = {log.id: log for log in db.execute(select(GoalLog).where(GoalLog.id.in_(log_ids))).scalars()}
+
+    totals: dict[tuple[int, date], tuple[int, int]] = {}
+
+    def _add_total(log: GoalLog, value_delta: int, count_delta: int) -> None:
+        value_sum, count = totals.get((log.goal_id, log.date), (0, 0))
+        totals[(log.goal_id, log.date)] = (value_sum + value_delta, count + count_delta)
+
+    touched: list[GoalLog] = []
+    deleted_ids: list[int] = []
+    for index, operation in enumerate(operations):
+        if operation.goal_id not in owned:
+            raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail=f"Operation {index}: Goal not found")
+
+        if operation.op == "create":
+            log = GoalLog(
+                goal_id=operation.goal_id,
+                focus_session_id=None,
+                date=operation.date,
+                value=operation.value,
+                source="manual",
+            )
+            db.add(log)
+            _add_total(log, log.value, 1)
+            touched.append(log)
+            continue
+
+        log = logs.get(operation.log_id)
+        if not log or log.goal_id != operation.goal_id or log.focus_session_id is not None:
+            raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail=f"Operation {index}: Log not found")
+
+        if operation.op == "update":
+            _add_total(log, operation.value - log.value, 0)
+            log.value = operation.value
+            if log not in touched:
+                touched.append(log)
+        else:
+            _add_total(log, -log.value, -1)
+            db.delete(log)
+            del logs[log.id]
+            if log in touched:
+                touched.remove(log)
+            deleted_ids.append(log.id)
+
+    db.flush()
+    record_log_totals(db, user.id, totals)
+    touched_ids = [log.id for log in touched]
+    bump_data_version(db, user.id)
+    db.commit()
+    stats_cache.invalidate_user(user.id)
+    if touched_ids:
+        # Como db.refresh en create_goal_log, pero una sola consulta: created_at vuelve de la base con zona
+        db.execute(
+            select(GoalLog).where(GoalLog.id.in_(touched_ids)).execution_options(populate_existing=True)
+        ).scalars().all()
+    return {"items": touched, "deleted_ids": deleted_ids}
@@ -5,15 +5,17 @@ from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from starlette.status import HTTP_404_NOT_FOUND
 
+from app.api.routing import SessionRoute
+from app.core.cache import revision_cache, stats_cache
 from app.db.session import get_db
 from app.models.goal import Goal
 from app.models.goalrevision import GoalRevision
-from app.models.user import User
 from app.schemas.goalrevision import GoalRevisionCreate, GoalRevisionOut, GoalRevisionsOut
-from app.services.auth import get_current_user
+from app.services.auth import CurrentUser, get_current_user
+from app.services.versioning import bump_data_version, etag_guard
 
 
-router = APIRouter(prefix="/api/goals/{goal_id}/revisions", tags=["goal_revisions"], dependencies=[Depends(get_current_user)])
+router = APIRouter(prefix="/api/goals/{goal_id}/revisions", tags=["goal_revisions"], dependencies=[Depends(get_current_user)], route_class=SessionRoute)
 
 
 def _ensure_owns(goal: Goal | None, user_id: int) -> Goal:
@@ -37,7 +39,7 @@ def create_revision(
     goal_id: int,
     payload: GoalRevisionCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
 ):
     goal = _ensure_owns(db.get(Goal, goal_id), user.id)
 
@@ -61,7 +63,11 @@ def create_revision(
         valid_to=payload.valid_to,
     )
     db.add(revision)
+    bump_data_version(db, user.id, revisions=True)
     db.commit()
+    # La completitud por dia depende de la revision vigente
+    revision_cache.invalidate_user(user.id)
+    stats_cache.invalidate_user(user.id)
     db.refresh(revision)
     return revision
 
@@ -72,11 +78,12 @@ def create_revision(
     summary="List revisions",
     description="Lists revisions for a goal.",
     responses={404: {"description": "Goal not found"}},
+    dependencies=[Depends(etag_guard)],
 )
 def list_revisions(
     goal_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
 ):
     goal = _ensure_owns(db.get(Goal, goal_id), user.id)
 
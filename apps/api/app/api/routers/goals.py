@@ -1,22 +1,36 @@
 from __future__ import annotations
 
 from datetime import date, timedelta
+from typing import Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from starlette.status import HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND
 
+from app.api.routing import SessionRoute
+from app.core.cache import revision_cache, stats_cache
 from app.db.session import get_db
 from app.models.goal import Goal
-from app.models.goallog import GoalLog
-from app.models.user import User
 from app.schemas.goal import GoalCreate, GoalOut, GoalsOut, GoalUpdate
-from app.services.auth import get_current_user
-from app.schemas.goal_heatmap import GoalHeatmapOut
+from app.services.auth import CurrentUser, get_current_user
+from app.services.pagination import count_rows, keyset_page
+from app.services.revisions import completion_matrix, goal_completion
+from app.services.heatmap import heatmap_counts, pack_counts
+from app.services.rollups import release_goal_rollups
+from app.services.versioning import bump_data_version, etag_guard
+from app.schemas.goal_heatmap import GoalHeatmapDenseOut, GoalHeatmapOut, GoalsHeatmapOut, HeatmapFormat
+from app.schemas.goal_completion import GoalCompletionOut, GoalMatrixOut
 
 
-router = APIRouter(prefix="/api/goals", tags=["goals"], dependencies=[Depends(get_current_user)])
+# Mismo limite que /stats/range con bucket=day
+MAX_COMPLETION_DAYS = 2000
+# La matriz trae objetivo y valor por celda: pensada para ventanas de dias o un mes
+MAX_MATRIX_DAYS = 92
+# Diez anos de dias; en formato dense/packed siguen siendo unos KB
+MAX_HEATMAP_DAYS = 3660
+
+router = APIRouter(prefix="/api/goals", tags=["goals"], dependencies=[Depends(get_current_user)], route_class=SessionRoute)
 
 
 def _ensure_owns(goal: Goal | None, user_id: int) -> Goal:
@@ -39,7 +53,7 @@ def _ensure_owns(goal: Goal | None, user_id: int) -> Goal:
 def create_goal(
     payload: GoalCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
 ):
     goal = Goal(
         user_id=user.id,
@@ -48,7 +62,10 @@ def create_goal(
         is_active=payload.is_active,
     )
     db.add(goal)
+    bump_data_version(db, user.id, revisions=True)
     db.commit()
+    stats_cache.invalidate_user(user.id)
+    revision_cache.invalidate_user(user.id)
     db.refresh(goal)
     return goal
 
@@ -57,29 +74,145 @@ def create_goal(
     "",
     response_model=GoalsOut,
     summary="List goals",
-    description="Lists goals for the authenticated user with pagination.",
+    description=(
+        "Lists goals for the authenticated user with offset or keyset (next_cursor) "
+        "pagination; the total count can be skipped with include_total=false."
+    ),
+    dependencies=[Depends(etag_guard)],
 )
 def list_goals(
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(default=None),
+    include_total: bool = Query(default=True),
 ):
-    total = db.execute(
-        select(func.count()).select_from(Goal).where(Goal.user_id == user.id)
-    ).scalar_one()
-    items = (
-        db.execute(
-            select(Goal)
-            .where(Goal.user_id == user.id)
-            .order_by(Goal.created_at.desc())
-            .limit(limit)
-            .offset(offset)
-        )
-        .scalars()
-        .all()
+    base = select(Goal).where(Goal.user_id == user.id)
+    total = count_rows(db, base) if include_total else None
+    items, next_cursor = keyset_page(db, base, (Goal.created_at, Goal.id), limit, offset, cursor)
+    return {"items": items, "total": total, "next_cursor": next_cursor}
+
+
+@router.get(
+    "/completion",
+    response_model=GoalCompletionOut,
+    summary="Goal completion",
+    description=(
+        "Whether each day in the range met the target in force that day, per goal. "
+        "Covers active goals unless goal_ids is given."
+    ),
+    responses={400: {"description": "Invalid date range"}},
+)
+def completion(
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    goal_ids: list[int] | None = Query(default=None),
+    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(get_current_user),
+    data_version: int = Depends(etag_guard),
+):
+    if from_date > to_date:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="'from' must be <= 'to'")
+    if (to_date - from_date).days >= MAX_COMPLETION_DAYS:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Range too large")
+
+    cache_key = ("completion", data_version, from_date, to_date, tuple(sorted(set(goal_ids or []))))
+    return stats_cache.get_or_set(
+        user.id,
+        cache_key,
+        lambda: GoalCompletionOut(
+            **{
+                "from": from_date,
+                "to": to_date,
+            },
+            goals=[
+                {"goal_id": goal_id, "met": met}
+                for goal_id, met in goal_completion(db, user.id, from_date, to_date, goal_ids)
+            ],
+        ),
     )
-    return {"items": items, "total": total}
+
+
+@router.get(
+    "/matrix",
+    response_model=GoalMatrixOut,
+    summary="Goal completion matrix",
+    description=(
+        "Goals x days matrix with the target in force, the logged value and whether the "
+        "target was met. Covers active goals unless goal_ids or include_inactive is given."
+    ),
+    responses={400: {"description": "Invalid date range"}},
+)
+def matrix(
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    goal_ids: list[int] | None = Query(default=None),
+    include_inactive: bool = Query(default=False),
+    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(get_current_user),
+    data_version: int = Depends(etag_guard),
+):
+    if from_date > to_date:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="'from' must be <= 'to'")
+    if (to_date - from_date).days >= MAX_MATRIX_DAYS:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Range too large")
+
+    cache_key = ("matrix", data_version, from_date, to_date, tuple(sorted(set(goal_ids or []))), include_inactive)
+    return stats_cache.get_or_set(
+        user.id,
+        cache_key,
+        lambda: GoalMatrixOut(
+            **{
+                "from": from_date,
+                "to": to_date,
+            },
+            goals=completion_matrix(db, user.id, from_date, to_date, goal_ids, include_inactive),
+        ),
+    )
+
+
+@router.get(
+    "/heatmap",
+    response_model=GoalsHeatmapOut,
+    summary="Goals heatmap",
+    description=(
+        "Per-day log counts of several goals in one call, as a flat array per goal "
+        "(dense) or base64 little-endian uint16 (packed). Covers active goals unless "
+        "goal_ids is given."
+    ),
+    responses={400: {"description": "Invalid date range"}},
+)
+def goals_heatmap(
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    goal_ids: list[int] | None = Query(default=None),
+    format: Literal["dense", "packed"] = Query(default="dense"),
+    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(get_current_user),
+    data_version: int = Depends(etag_guard),
+):
+    _check_heatmap_range(from_date, to_date)
+
+    def build() -> GoalsHeatmapOut:
+        goals = select(Goal.id).where(Goal.user_id == user.id).order_by(Goal.created_at, Goal.id)
+        goals = goals.where(Goal.id.in_(goal_ids)) if goal_ids else goals.where(Goal.is_active.is_(True))
+        series = heatmap_counts(db, user.id, list(db.execute(goals).scalars()), from_date, to_date)
+        return GoalsHeatmapOut(
+            **{
+                "from": from_date,
+                "to": to_date,
+            },
+            unit="day",
+            format=format,
+            goals=[
+                {"goal_id": goal_id, "counts": pack_counts(counts) if format == "packed" else counts}
+                for goal_id, counts in series.items()
+            ],
+        )
+
+    cache_key = ("goals_heatmap", data_version, from_date, to_date, tuple(sorted(set(goal_ids or []))), format)
+    return stats_cache.get_or_set(user.id, cache_key, build)
 
 
 @router.get(
@@ -88,11 +221,12 @@ def list_goals(
     summary="Get goal",
     description="Gets a goal by id.",
     responses={404: {"description": "Goal not found"}},
+    dependencies=[Depends(etag_guard)],
 )
 def get_goal(
     goal_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
 ):
     goal = _ensure_owns(db.get(Goal, goal_id), user.id)
     return goal
@@ -112,7 +246,7 @@ def update_goal(
     goal_id: int,
     payload: GoalUpdate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
 ):
     goal = _ensure_owns(db.get(Goal, goal_id), user.id)
 
@@ -126,7 +260,10 @@ def update_goal(
     if payload.is_active is not None:
         goal.is_active = payload.is_active
 
+    bump_data_version(db, user.id, revisions=True)
     db.commit()
+    stats_cache.invalidate_user(user.id)
+    revision_cache.invalidate_user(user.id)
     db.refresh(goal)
     return goal
 
@@ -141,55 +278,78 @@ def update_goal(
 def delete_goal(
     goal_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
 ):
     goal = _ensure_owns(db.get(Goal, goal_id), user.id)
+    # Solo los rollups de esta meta: el tiempo de foco pasa a las filas sin meta
+    release_goal_rollups(db, user.id, goal.id)
     db.delete(goal)
+    bump_data_version(db, user.id, revisions=True)
     db.commit()
+    stats_cache.invalidate_user(user.id)
+    revision_cache.invalidate_user(user.id)
     return None
 
 
+def _check_heatmap_range(from_date: date, to_date: date) -> None:
+    if from_date > to_date:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="'from' must be <= 'to'")
+    if (to_date - from_date).days >= MAX_HEATMAP_DAYS:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Range too large")
+
+
 @router.get(
     "/{goal_id}/heatmap",
-    response_model=GoalHeatmapOut,
+    response_model=GoalHeatmapOut | GoalHeatmapDenseOut,
     summary="Goal heatmap",
-    description="Returns per-day counts for a goal in a date range.",
+    description=(
+        "Returns per-day counts for a goal in a date range: one {date, count} object per day "
+        "(values), a flat array starting at 'from' (dense) or base64 little-endian uint16 (packed)."
+    ),
     responses={400: {"description": "Invalid date range"}, 404: {"description": "Goal not found"}},
 )
 def goal_heatmap(
     goal_id: int,
     from_date: date = Query(..., alias="from"),
     to_date: date = Query(..., alias="to"),
+    format: HeatmapFormat = Query(default="values"),
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
+    data_version: int = Depends(etag_guard),
 ):
-    if from_date > to_date:
-        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="'from' must be <= 'to'")
+    _check_heatmap_range(from_date, to_date)
+
+    cache_key = ("heatmap", data_version, goal_id, from_date, to_date, format)
+    cached = stats_cache.get(user.id, cache_key)
+    if cached is not None:
+        return cached
 
     goal = _ensure_owns(db.get(Goal, goal_id), user.id)
+    counts = heatmap_counts(db, user.id, [goal.id], from_date, to_date)[goal.id]
 
-    rows = db.execute(
-        select(GoalLog.date, func.count())
-        .where(GoalLog.goal_id == goal.id)
-        .where(GoalLog.date >= from_date)
-        .where(GoalLog.date <= to_date)
-        .group_by(GoalLog.date)
-        .order_by(GoalLog.date)
-    ).all()
-    counts_by_date = {row[0]: int(row[1]) for row in rows}
-
-    values = []
-    day = from_date
-    while day <= to_date:
-        values.append({"date": day, "count": counts_by_date.get(day, 0)})
-        day += timedelta(days=1)
-
-    return GoalHeatmapOut(
-    goal_id=goal.id,
-    **{
-        "from": from_date,
-        "to": to_date,
-    },
-    unit="day",
-    values=values,
-)
+    if format == "values":
+        heatmap = GoalHeatmapOut(
+            goal_id=goal.id,
+            **{
+                "from": from_date,
+                "to": to_date,
+            },
+            unit="day",
+            values=[
+                {"date": from_date + timedelta(days=offset), "count": count}
+                for offset, count in enumerate(counts)
+            ],
+        )
+    else:
+        heatmap = GoalHeatmapDenseOut(
+            goal_id=goal.id,
+            **{
+                "from": from_date,
+                "to": to_date,
+            },
+            unit="day",
+            format=format,
+            counts=pack_counts(counts) if format == "packed" else counts,
+        )
+    stats_cache.set(user.id, cache_key, heatmap)
+    return heatmap
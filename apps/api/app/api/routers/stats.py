@@ -2,64 +2,34 @@ from __future__ import annotations
 
 from datetime import date, datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from starlette.status import HTTP_400_BAD_REQUEST
 
+from app.api.routing import SessionRoute
+from app.core.cache import stats_cache
 from app.db.session import get_db
-from app.models.focussession import FocusSession
-from app.models.goallog import GoalLog
-from app.models.goal import Goal
-from app.models.user import User
-from app.schemas.stats import DailyStatsOut, WeeklyDayStats, WeeklyStatsOut, YearlyMonthStats, YearlyStatsOut
-from app.services.auth import get_current_user
+from app.schemas.stats import (
+    DailyStatsOut,
+    RangeStatsOut,
+    WeeklyDayStats,
+    WeeklyStatsOut,
+    YearlyMonthStats,
+    YearlyStatsOut,
+)
+from app.services.auth import CurrentUser, get_current_user
+from app.services.stats import Bucket, bucket_count, goal_range_aggregates, range_aggregates
+from app.services.versioning import etag_guard
 
 
-router = APIRouter(prefix="/api/stats", tags=["stats"], dependencies=[Depends(get_current_user)])
+router = APIRouter(prefix="/api/stats", tags=["stats"], dependencies=[Depends(get_current_user)], route_class=SessionRoute)
 
 
-def _utc_today() -> date:
-    return datetime.now(timezone.utc).date()
+MAX_RANGE_BUCKETS = 2000
 
 
-def _daily_aggregates(db: Session, user_id: int, target_date: date) -> tuple[int, int, int, int]:
-    goal_value_sum = (
-        db.execute(
-            select(func.coalesce(func.sum(GoalLog.value), 0))
-            .join(Goal, GoalLog.goal_id == Goal.id)
-            .where(Goal.user_id == user_id)
-            .where(GoalLog.date == target_date)
-        )
-        .scalar_one()
-    )
-    goal_logs_count = (
-        db.execute(
-            select(func.count())
-            .select_from(GoalLog)
-            .join(Goal, GoalLog.goal_id == Goal.id)
-            .where(Goal.user_id == user_id)
-            .where(GoalLog.date == target_date)
-        )
-        .scalar_one()
-    )
-    focus_seconds = (
-        db.execute(
-            select(func.coalesce(func.sum(FocusSession.duration_seconds), 0))
-            .where(FocusSession.user_id == user_id)
-            .where(func.date(FocusSession.started_at) == target_date)
-        )
-        .scalar_one()
-    )
-    focus_sessions_count = (
-        db.execute(
-            select(func.count())
-            .select_from(FocusSession)
-            .where(FocusSession.user_id == user_id)
-            .where(func.date(FocusSession.started_at) == target_date)
-        )
-        .scalar_one()
-    )
-    return int(goal_value_sum), int(goal_logs_count), int(focus_seconds), int(focus_sessions_count)
+def _utc_today() -> date:
+    return datetime.now(timezone.utc).date()
 
 
 @router.get(
@@ -71,18 +41,23 @@ def _daily_aggregates(db: Session, user_id: int, target_date: date) -> tuple[int
 def daily_stats(
     date: date | None = Query(default=None, alias="date"),
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
+    data_version: int = Depends(etag_guard),
 ):
     target_date = date or _utc_today()
-    goal_value_sum, goal_logs_count, focus_seconds, focus_sessions_count = _daily_aggregates(
-        db, user.id, target_date
+    return stats_cache.get_or_set(
+        user.id, ("daily", data_version, target_date), lambda: _daily_stats(db, user.id, target_date)
     )
+
+
+def _daily_stats(db: Session, user_id: int, target_date: date) -> dict:
+    (day,) = range_aggregates(db, user_id, target_date, target_date, "day")
     return {
         "date": target_date,
-        "goal_value_sum": goal_value_sum,
-        "goal_logs_count": goal_logs_count,
-        "focus_seconds": focus_seconds,
-        "focus_sessions_count": focus_sessions_count,
+        "goal_value_sum": day.goal_value_sum,
+        "goal_logs_count": day.goal_logs_count,
+        "focus_seconds": day.focus_seconds,
+        "focus_sessions_count": day.focus_sessions_count,
     }
 
 
@@ -92,27 +67,31 @@ def daily_stats(
     summary="Weekly stats",
     description="Returns aggregated stats for the current week.",
 )
-def weekly_stats(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def weekly_stats(
+    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(get_current_user),
+    data_version: int = Depends(etag_guard),
+):
     today = _utc_today()
     start_date = today - timedelta(days=today.weekday())
+    return stats_cache.get_or_set(
+        user.id, ("weekly", data_version, start_date), lambda: _weekly_stats(db, user.id, start_date)
+    )
+
+
+def _weekly_stats(db: Session, user_id: int, start_date: date) -> dict:
     end_date = start_date + timedelta(days=6)
 
-    days: list[WeeklyDayStats] = []
-    total_goal_value = 0
-    total_focus_seconds = 0
-
-    for i in range(7):
-        day = start_date + timedelta(days=i)
-        goal_value_sum, _, focus_seconds, _ = _daily_aggregates(db, user.id, day)
-        total_goal_value += goal_value_sum
-        total_focus_seconds += focus_seconds
-        days.append(
-            WeeklyDayStats(
-                date=day,
-                goal_value_sum=goal_value_sum,
-                focus_seconds=focus_seconds,
-            )
+    days = [
+        WeeklyDayStats(
+            date=day.start,
+            goal_value_sum=day.goal_value_sum,
+            focus_seconds=day.focus_seconds,
         )
+        for day in range_aggregates(db, user_id, start_date, end_date, "day")
+    ]
+    total_goal_value = sum(day.goal_value_sum for day in days)
+    total_focus_seconds = sum(day.focus_seconds for day in days)
 
     return {
         "start_date": start_date,
@@ -129,48 +108,26 @@ def weekly_stats(db: Session = Depends(get_db), user: User = Depends(get_current
     summary="Yearly stats",
     description="Returns aggregated stats for the current year.",
 )
-def yearly_stats(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def yearly_stats(
+    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(get_current_user),
+    data_version: int = Depends(etag_guard),
+):
     year = _utc_today().year
-    months: list[YearlyMonthStats] = []
-    total_goal_value = 0
-    total_focus_seconds = 0
-
-    for month in range(1, 13):
-        start = date(year, month, 1)
-        if month == 12:
-            end = date(year + 1, 1, 1)
-        else:
-            end = date(year, month + 1, 1)
-
-        goal_value_sum = (
-            db.execute(
-                select(func.coalesce(func.sum(GoalLog.value), 0))
-                .join(Goal, GoalLog.goal_id == Goal.id)
-                .where(Goal.user_id == user.id)
-                .where(GoalLog.date >= start)
-                .where(GoalLog.date < end)
-            )
-            .scalar_one()
-        )
-        focus_seconds = (
-            db.execute(
-                select(func.coalesce(func.sum(FocusSession.duration_seconds), 0))
-                .where(FocusSession.user_id == user.id)
-                .where(FocusSession.started_at >= start)
-                .where(FocusSession.started_at < end)
-            )
-            .scalar_one()
-        )
+    return stats_cache.get_or_set(user.id, ("yearly", data_version, year), lambda: _yearly_stats(db, user.id, year))
+
 
-        total_goal_value += int(goal_value_sum)
-        total_focus_seconds += int(focus_seconds)
-        months.append(
-            YearlyMonthStats(
-                month=month,
-                goal_value_sum=int(goal_value_sum),
-                focus_seconds=int(focus_seconds),
-            )
+def _yearly_stats(db: Session, user_id: int, year: int) -> dict:
+    months = [
+        YearlyMonthStats(
+            month=month.start.month,
+            goal_value_sum=month.goal_value_sum,
+            focus_seconds=month.focus_seconds,
         )
+        for month in range_aggregates(db, user_id, date(year, 1, 1), date(year, 12, 31), "month")
+    ]
+    total_goal_value = sum(month.goal_value_sum for month in months)
+    total_focus_seconds = sum(month.focus_seconds for month in months)
 
     return {
         "year": year,
@@ -178,3 +135,60 @@ def yearly_stats(db: Session = Depends(get_db), user: User = Depends(get_current
         "focus_seconds": total_focus_seconds,
         "months": months,
     }
+
+
+@router.get(
+    "/range",
+    response_model=RangeStatsOut,
+    summary="Range stats",
+    description=(
+        "Returns goal value and focus seconds sums per goal and bucket "
+        "(day, week or month) for a date range."
+    ),
+    responses={400: {"description": "Invalid date range"}},
+)
+def range_stats(
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    bucket: Bucket = Query(default="day"),
+    goal_ids: list[int] | None = Query(default=None),
+    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(get_current_user),
+    data_version: int = Depends(etag_guard),
+):
+    if from_date > to_date:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="'from' must be <= 'to'")
+    if bucket_count(from_date, to_date, bucket) > MAX_RANGE_BUCKETS:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Range too large for bucket")
+
+    cache_key = ("range", data_version, from_date, to_date, bucket, tuple(sorted(set(goal_ids or []))))
+    return stats_cache.get_or_set(
+        user.id, cache_key, lambda: _range_stats(db, user.id, from_date, to_date, bucket, goal_ids)
+    )
+
+
+def _range_stats(
+    db: Session,
+    user_id: int,
+    from_date: date,
+    to_date: date,
+    bucket: Bucket,
+    goal_ids: list[int] | None,
+) -> RangeStatsOut:
+    buckets, series = goal_range_aggregates(db, user_id, from_date, to_date, bucket, goal_ids)
+    return RangeStatsOut(
+        **{
+            "from": from_date,
+            "to": to_date,
+        },
+        bucket=bucket,
+        buckets=buckets,
+        goals=[
+            {
+                "goal_id": item.goal_id,
+                "goal_value_sum": item.goal_value_sum,
+                "focus_seconds": item.focus_seconds,
+            }
+            for item in series
+        ],
+    )
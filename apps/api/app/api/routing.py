@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import functools
+import inspect
+from typing import Any, Callable
+
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import settings
+
+
+def _run_on_async_session(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(endpoint)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        db: AsyncSession = kwargs.pop("db")
+        return await db.run_sync(lambda session: endpoint(*args, db=session, **kwargs))
+
+    return wrapper
+
+
+class SessionRoute(APIRoute):
+    """Route class for endpoints written against a sync `db: Session`.
+
+    With DB_ASYNC the endpoint receives an AsyncSession from get_db; sync
+    endpoints are wrapped so their body runs on the event loop through
+    AsyncSession.run_sync instead of occupying a threadpool worker.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        if (
+            settings.db_async
+            and not inspect.iscoroutinefunction(endpoint)
+            and "db" in inspect.signature(endpoint).parameters
+        ):
+            endpoint = _run_on_async_session(endpoint)
+        super().__init__(path, endpoint, **kwargs)
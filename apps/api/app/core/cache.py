@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from app.core.settings import settings
+
+
+class UserTTLCache:
+    """Bounded LRU cache with per-entry TTL, keyed by (user_id, key).
+
+    Entries of a user can be dropped at once with invalidate_user, which is
+    what write endpoints call after committing.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[int, Hashable], tuple[float, Any]] = OrderedDict()
+        self._user_keys: dict[int, set[Hashable]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, user_id: int, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(user_id, key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end((user_id, key))
+            self.hits += 1
+            return value
+
+    def set(self, user_id: int, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[(user_id, key)] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end((user_id, key))
+            self._user_keys.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                (old_user_id, old_key), _ = self._entries.popitem(last=False)
+                self._discard_user_key(old_user_id, old_key)
+                self.evictions += 1
+
+    def get_or_set(self, user_id: int, key: Hashable, compute: Callable[[], Any]) -> Any:
+        value = self.get(user_id, key)
+        if value is None:
+            value = compute()
+            self.set(user_id, key, value)
+        return value
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            keys = self._user_keys.pop(user_id, set())
+            for key in keys:
+                self._entries.pop((user_id, key), None)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+
+    def counters(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, user_id: int, key: Hashable) -> None:
+        self._entries.pop((user_id, key), None)
+        self._discard_user_key(user_id, key)
+
+    def _discard_user_key(self, user_id: int, key: Hashable) -> None:
+        keys = self._user_keys.get(user_id)
+        if keys is None:
+            return
+        keys.discard(key)
+        if not keys:
+            del self._user_keys[user_id]
+
+
+def render_cache_metrics(caches: dict[str, UserTTLCache]) -> list[str]:
+    gauges = (
+        ("ethos_cache_entries", "Entries held.", "entries"),
+        ("ethos_cache_max_entries", "Configured entry limit.", "max_entries"),
+    )
+    counters = (
+        ("ethos_cache_hits_total", "Lookups served from the cache.", "hits"),
+        ("ethos_cache_misses_total", "Lookups that missed or found an expired entry.", "misses"),
+        ("ethos_cache_evictions_total", "Entries dropped to stay under the limit.", "evictions"),
+        ("ethos_cache_invalidations_total", "Per-user invalidations.", "invalidations"),
+    )
+    values = {name: cache.counters() for name, cache in caches.items()}
+
+    lines: list[str] = []
+    for kind, metrics in (("gauge", gauges), ("counter", counters)):
+        for metric, help_text, key in metrics:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for name, counts in values.items():
+                lines.append(f'{metric}{{cache="{name}"}} {counts[key]}')
+    return lines
+
+
+# Estado de autenticacion por usuario: (is_active, token_version)
+user_state_cache = UserTTLCache(
+    max_entries=settings.auth_user_cache_max_entries,
+    ttl_seconds=settings.auth_user_cache_ttl_seconds,
+)
+
+stats_cache = UserTTLCache(
+    max_entries=settings.stats_cache_max_entries,
+    ttl_seconds=settings.stats_cache_ttl_seconds,
+)
+
+# services.revisions: RevisionTimeline por meta, invalidada al crear revisiones o cambiar metas
+revision_cache = UserTTLCache(
+    max_entries=settings.revision_cache_max_entries,
+    ttl_seconds=settings.revision_cache_ttl_seconds,
+)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import contextmanager
+import threading
+from typing import Any, Iterator
+
+# Eventos pendientes por conexion; si un cliente no lee, se descartan los mas viejos
+QUEUE_SIZE = 16
+
+Event = tuple[str, Any]
+
+
+class UserEventHub:
+    """Fans out events to the open streams (e.g. SSE connections) of each user.
+
+    publish() may be called from threadpool workers: delivery is scheduled on
+    each subscriber's event loop. Only streams served by this process receive
+    events; the others catch up on their periodic resync.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: dict[int, set[tuple[asyncio.AbstractEventLoop, asyncio.Queue[Event]]]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def subscribe(self, user_id: int) -> Iterator[asyncio.Queue[Event]]:
+        queue: asyncio.Queue[Event] = asyncio.Queue(maxsize=QUEUE_SIZE)
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(entry)
+        try:
+            yield queue
+        finally:
+            with self._lock:
+                entries = self._subscribers.get(user_id)
+                if entries is not None:
+                    entries.discard(entry)
+                    if not entries:
+                        del self._subscribers[user_id]
+
+    def publish(self, user_id: int, event: str, payload: Any) -> None:
+        with self._lock:
+            targets = list(self._subscribers.get(user_id, ()))
+        for loop, queue in targets:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, (event, payload))
+            except RuntimeError:
+                # Loop cerrado: la suscripcion se limpia al terminar su stream
+                pass
+
+
+def _offer(queue: asyncio.Queue[Event], item: Event) -> None:
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(item)
+
+
+# Cambios de la sesion de focus activa (services.focus_events)
+focus_events = UserEventHub()
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Sequence
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Limites en segundos, alineados con los de los clientes de Prometheus
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Latency histogram with fixed upper bounds, reported as cumulative buckets."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = []
+        running = 0
+        for bound, count in zip(self.buckets, counts):
+            running += count
+            cumulative.append((bound, running))
+        return {"count": sum(counts), "sum": total, "buckets": cumulative}
+
+
+# Limites para el numero de sentencias SQL por peticion
+SQL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+@dataclass
+class RequestSQL:
+    statements: int = 0
+    seconds: float = 0.0
+    scope: Scope | None = field(default=None, repr=False)
+    # Ejecuciones por sentencia normalizada; solo se rellena con DB_QUERY_DEBUG
+    statement_counts: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def route(self) -> str | None:
+        if self.scope is None:
+            return None
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.scope.get("path")
+
+
+# Acumulador de la peticion en curso; lo rellenan los hooks de SQLAlchemy
+current_request_sql: ContextVar[RequestSQL | None] = ContextVar("current_request_sql", default=None)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+def render_histogram(name: str, labels: dict[str, str], snapshot: dict[str, Any]) -> list[str]:
+    lines = []
+    for bound, count in snapshot["buckets"]:
+        lines.append(f"{name}_bucket{_format_labels({**labels, 'le': repr(float(bound))})} {count}")
+    lines.append(f"{name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {snapshot['count']}")
+    lines.append(f"{name}_sum{_format_labels(labels)} {snapshot['sum']}")
+    lines.append(f"{name}_count{_format_labels(labels)} {snapshot['count']}")
+    return lines
+
+
+class RouteMetrics:
+    def __init__(self) -> None:
+        self.duration_seconds = Histogram()
+        self.sql_statements = Histogram(SQL_COUNT_BUCKETS)
+        self.sql_seconds = Histogram()
+
+
+class RequestMetrics:
+    """Per-route latency, status and SQL counters for the /metrics endpoint."""
+
+    def __init__(self) -> None:
+        self._routes: dict[tuple[str, str], RouteMetrics] = {}
+        self._statuses: dict[tuple[str, str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, route: str, status: int, seconds: float, sql: RequestSQL) -> None:
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[(method, route)] = RouteMetrics()
+            self._statuses[(method, route, status)] = self._statuses.get((method, route, status), 0) + 1
+        metrics.duration_seconds.observe(seconds)
+        metrics.sql_statements.observe(sql.statements)
+        metrics.sql_seconds.observe(sql.seconds)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            routes = sorted(self._routes.items())
+            statuses = sorted(self._statuses.items())
+
+        lines = [
+            "# HELP ethos_http_requests_total Requests by route and status code.",
+            "# TYPE ethos_http_requests_total counter",
+        ]
+        for (method, route, status), count in statuses:
+            labels = {"method": method, "route": route, "status": str(status)}
+            lines.append(f"ethos_http_requests_total{_format_labels(labels)} {count}")
+
+        histograms = (
+            ("ethos_http_request_duration_seconds", "Request latency in seconds.", "duration_seconds"),
+            ("ethos_http_request_sql_statements", "SQL statements executed per request.", "sql_statements"),
+            ("ethos_http_request_sql_seconds", "Time spent in SQL per request, in seconds.", "sql_seconds"),
+        )
+        for name, help_text, attribute in histograms:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (method, route), metrics in routes:
+                snapshot = getattr(metrics, attribute).snapshot()
+                lines.extend(render_histogram(name, {"method": method, "route": route}, snapshot))
+        return lines
+
+
+request_metrics = RequestMetrics()
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request and collecting its SQL counters."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        sql = RequestSQL(scope=scope)
+        token = current_request_sql.set(sql)
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request_sql.reset(token)
+            # La plantilla de la ruta evita una serie por cada id
+            route_path = getattr(scope.get("route"), "path", None) or "unmatched"
+            request_metrics.observe(scope["method"], route_path, status, elapsed, sql)
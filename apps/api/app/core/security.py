@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 import jwt
 from passlib.context import CryptContext
@@ -8,25 +9,43 @@ from app.core.settings import settings
 ALGORITHM = "HS256"
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+
+@dataclass(frozen=True)
+class AccessClaims:
+    user_id: int
+    token_version: int
+    is_active: bool
+
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(password: str, password_hash: str) -> bool:
     return pwd_context.verify(password, password_hash)
 
-def create_access_token(user_id: int) -> str:
+def create_access_token(user_id: int, token_version: int = 0, is_active: bool = True) -> str:
     now = datetime.now(timezone.utc)
     exp = now + timedelta(minutes=settings.auth_token_ttl_minutes)
-    payload = {"sub": str(user_id), "iat": int(now.timestamp()), "exp": exp}
+    payload = {
+        "sub": str(user_id),
+        "ver": token_version,
+        "act": is_active,
+        "iat": int(now.timestamp()),
+        "exp": exp,
+    }
     return jwt.encode(payload, settings.auth_secret, algorithm=ALGORITHM)
 
-def decode_access_token(token: str) -> int | None:
+def decode_access_token(token: str) -> AccessClaims | None:
     try:
         payload = jwt.decode(token, settings.auth_secret, algorithms=[ALGORITHM])
     except Exception:
         return None
-    sub = payload.get("sub")
     try:
-        return int(sub)
+        # Los tokens emitidos antes de la version de token equivalen a la version 0
+        return AccessClaims(
+            user_id=int(payload.get("sub")),
+            token_version=int(payload.get("ver", 0)),
+            is_active=bool(payload.get("act", True)),
+        )
     except (TypeError, ValueError):
         return None
@@ -18,6 +18,40 @@ class Settings(BaseSettings):
     database_url: str = Field(alias="DATABASE_URL")
     auth_secret: str = Field(alias="AUTH_SECRET")
 
+    # --- Database ---
+    # Motor asincrono (AsyncSession + psycopg async) en lugar del threadpool
+    db_async: bool = Field(default=False, alias="DB_ASYNC")
+    db_pool_size: int = Field(default=5, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout_seconds: float = Field(
+        default=30, alias="DB_POOL_TIMEOUT_SECONDS"
+    )
+    # -1 no recicla conexiones
+    db_pool_recycle_seconds: int = Field(
+        default=1800, alias="DB_POOL_RECYCLE_SECONDS"
+    )
+    # always: ping en cada checkout; idle: solo si la conexion estuvo inactiva; never: sin ping
+    db_pool_pre_ping: Literal["always", "idle", "never"] = Field(
+        default="idle", alias="DB_POOL_PRE_PING"
+    )
+    db_pool_ping_idle_seconds: float = Field(
+        default=30, alias="DB_POOL_PING_IDLE_SECONDS"
+    )
+    # 0 desactiva el limite (solo PostgreSQL)
+    db_statement_timeout_ms: int = Field(
+        default=0, alias="DB_STATEMENT_TIMEOUT_MS"
+    )
+    # Detector de consultas lentas y repetidas (N+1), pensado para desarrollo y tests
+    db_query_debug: bool = Field(default=False, alias="DB_QUERY_DEBUG")
+    db_slow_query_ms: float = Field(default=100, alias="DB_SLOW_QUERY_MS")
+    db_repeated_query_threshold: int = Field(
+        default=10, alias="DB_REPEATED_QUERY_THRESHOLD"
+    )
+    # Convierte las consultas repetidas en error: hace fallar la peticion (y el test)
+    db_query_debug_strict: bool = Field(
+        default=False, alias="DB_QUERY_DEBUG_STRICT"
+    )
+
     # --- API ---
     cors_origins: str = Field(default="", alias="CORS_ORIGINS")
     admin_secret: str = Field(alias="ADMIN_SECRET")
@@ -38,6 +72,48 @@ class Settings(BaseSettings):
     auth_token_ttl_minutes: int = Field(
         default=60 * 24 * 7, alias="AUTH_TOKEN_TTL_MINUTES"
     )
+    # Segundos que se confia en el estado (activo, version de token) cacheado por proceso
+    auth_user_cache_ttl_seconds: float = Field(
+        default=30, alias="AUTH_USER_CACHE_TTL_SECONDS"
+    )
+    auth_user_cache_max_entries: int = Field(
+        default=4096, alias="AUTH_USER_CACHE_MAX_ENTRIES"
+    )
+
+    # --- Stats cache ---
+    # 0 desactiva la cache
+    stats_cache_max_entries: int = Field(
+        default=2048, alias="STATS_CACHE_MAX_ENTRIES"
+    )
+    stats_cache_ttl_seconds: float = Field(
+        default=300, alias="STATS_CACHE_TTL_SECONDS"
+    )
+    # Lineas de tiempo de revisiones por usuario; solo cambian al crear revisiones o metas
+    revision_cache_max_entries: int = Field(
+        default=2048, alias="REVISION_CACHE_MAX_ENTRIES"
+    )
+    revision_cache_ttl_seconds: float = Field(
+        default=600, alias="REVISION_CACHE_TTL_SECONDS"
+    )
+
+    # --- Focus event stream (SSE) ---
+    # Comentario keep-alive para que proxies no corten la conexion inactiva
+    focus_stream_heartbeat_seconds: float = Field(
+        default=15, alias="FOCUS_STREAM_HEARTBEAT_SECONDS"
+    )
+    # Relectura periodica: cubre cambios hechos por otros procesos (varios workers)
+    focus_stream_resync_seconds: float = Field(
+        default=60, alias="FOCUS_STREAM_RESYNC_SECONDS"
+    )
+
+    # --- Focus expiry sweeper ---
+    # Cada cuanto se completan en lote las sesiones vencidas; 0 desactiva la tarea en este proceso
+    focus_sweep_interval_seconds: float = Field(
+        default=30, alias="FOCUS_SWEEP_INTERVAL_SECONDS"
+    )
+    focus_sweep_batch_size: int = Field(
+        default=500, alias="FOCUS_SWEEP_BATCH_SIZE"
+    )
 
     @cached_property
     def cors_list(self) -> list[str]:
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import logging
+import re
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.metrics import current_request_sql
+from app.core.settings import settings
+
+logger = logging.getLogger("app.db.queries")
+
+_installed = False
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER = re.compile(r"%\(\w+\)s|%s|\?|:\w+|\$\d+")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+
+class RepeatedQueryError(RuntimeError):
+    """Raised in strict query-debug mode when one request repeats a statement too often."""
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapses literals, bind parameters and IN lists so repeated shapes compare equal."""
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _PARAMETER.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _PARAMETER_LIST.sub("(?)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    # En el contexto de la sentencia y no en la conexion: si falla, after no se llama y no queda nada
+    if context is not None:
+        context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started_at = getattr(context, "_query_started_at", None)
+    elapsed = time.perf_counter() - started_at if started_at is not None else 0.0
+    sql = current_request_sql.get()
+    if sql is not None:
+        sql.statements += 1
+        sql.seconds += elapsed
+    if settings.db_query_debug:
+        _inspect_query(statement, elapsed, sql)
+
+
+def _inspect_query(statement: str, elapsed: float, sql) -> None:
+    normalized = normalize_sql(statement)
+    route = sql.route if sql is not None else None
+
+    elapsed_ms = elapsed * 1000
+    if elapsed_ms >= settings.db_slow_query_ms:
+        logger.warning(
+            "Slow query",
+            extra={"fields": {"route": route, "duration_ms": round(elapsed_ms, 2), "sql": normalized}},
+        )
+
+    if sql is None:
+        return
+    count = sql.statement_counts.get(normalized, 0) + 1
+    sql.statement_counts[normalized] = count
+    # Se avisa una sola vez por sentencia y peticion, al superar el umbral
+    if count == settings.db_repeated_query_threshold + 1:
+        logger.warning(
+            "Repeated query",
+            extra={"fields": {"route": route, "count": count, "sql": normalized}},
+        )
+        if settings.db_query_debug_strict:
+            raise RepeatedQueryError(f"{route}: statement ran more than {count - 1} times: {normalized}")
+
+
+def install_query_hooks() -> None:
+    """Registers cursor hooks on every Engine, sync or async, once per process."""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _installed = True
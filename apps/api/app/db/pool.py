@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.metrics import Histogram, render_histogram
+
+
+class PoolMetrics:
+    """Checkout counters for one engine pool."""
+
+    def __init__(self) -> None:
+        self.checkout_seconds = Histogram()
+        self.wait_seconds = Histogram()
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.pings = 0
+        self.disconnects = 0
+
+    def count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+
+class _TimedPoolMixin:
+    """Times Pool.connect(); a checkout that finds the pool exhausted counts as a wait."""
+
+    metrics: PoolMetrics
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.max_overflow_limit = kwargs.get("max_overflow", 10)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        saturated = (
+            self.max_overflow_limit >= 0
+            and self.checkedin() == 0
+            and self.overflow() >= self.max_overflow_limit
+        )
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.count("timeouts")
+            raise
+        elapsed = time.perf_counter() - started
+        self.metrics.checkout_seconds.observe(elapsed)
+        self.metrics.count("checkouts")
+        if saturated:
+            self.metrics.wait_seconds.observe(elapsed)
+            self.metrics.count("waits")
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def install_idle_ping(engine: Engine, idle_seconds: float) -> None:
+    """Pings only connections that sat idle in the pool longer than idle_seconds.
+
+    Raising DisconnectionError from a checkout listener makes the pool discard
+    the connection and retry with a fresh one.
+    """
+
+    @event.listens_for(engine, "checkin")
+    def _mark_idle(dbapi_connection, connection_record) -> None:
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy) -> None:
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        metrics = getattr(engine.pool, "metrics", None)
+        if metrics:
+            metrics.count("pings")
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception as error:
+            if metrics:
+                metrics.count("disconnects")
+            raise exc.DisconnectionError() from error
+        finally:
+            cursor.close()
+
+
+def pool_status(engine: Engine | None) -> dict[str, Any] | None:
+    if engine is None:
+        return None
+    pool = engine.pool
+    metrics: PoolMetrics | None = getattr(pool, "metrics", None)
+    status: dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            in_use=pool.checkedout(),
+            overflow=pool.overflow(),
+            # -1: sin limite de conexiones extra
+            max_overflow=getattr(pool, "max_overflow_limit", 0),
+        )
+    if metrics:
+        status.update(
+            checkouts=metrics.checkouts,
+            waits=metrics.waits,
+            timeouts=metrics.timeouts,
+            pings=metrics.pings,
+            disconnects=metrics.disconnects,
+            checkout_seconds=metrics.checkout_seconds.snapshot(),
+            wait_seconds=metrics.wait_seconds.snapshot(),
+        )
+    return status
+
+
+def render_pool_metrics(engines: dict[str, Engine | None]) -> list[str]:
+    gauges = (
+        ("ethos_db_pool_size", "Configured pool size.", "size"),
+        ("ethos_db_pool_in_use", "Connections checked out.", "in_use"),
+        ("ethos_db_pool_overflow", "Overflow connections open.", "overflow"),
+        ("ethos_db_pool_max_overflow", "Configured overflow limit, -1 when unlimited.", "max_overflow"),
+    )
+    counters = (
+        ("ethos_db_pool_checkouts_total", "Connection checkouts.", "checkouts"),
+        ("ethos_db_pool_waits_total", "Checkouts that found the pool exhausted.", "waits"),
+        ("ethos_db_pool_timeouts_total", "Checkouts that timed out.", "timeouts"),
+    )
+    histograms = (
+        ("ethos_db_pool_checkout_seconds", "Checkout latency in seconds.", "checkout_seconds"),
+        ("ethos_db_pool_wait_seconds", "Checkout latency when the pool was exhausted.", "wait_seconds"),
+    )
+    statuses = {name: pool_status(engine) for name, engine in engines.items()}
+    statuses = {name: status for name, status in statuses.items() if status}
+
+    lines: list[str] = []
+    for kind, metrics in (("gauge", gauges), ("counter", counters)):
+        for metric, help_text, key in metrics:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for name, status in statuses.items():
+                if key in status:
+                    lines.append(f'{metric}{{engine="{name}"}} {status[key]}')
+    for metric, help_text, key in histograms:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} histogram")
+        for name, status in statuses.items():
+            if key in status:
+                lines.extend(render_histogram(metric, {"engine": name}, status[key]))
+    return lines
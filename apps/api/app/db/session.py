@@ -1,29 +1,175 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Any, Callable, Optional, TypeVar
 
-from sqlalchemy import create_engine
+import anyio
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import URL, create_engine, make_url, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from app.core.settings import settings
+from app.db.pool import TimedAsyncQueuePool, TimedQueuePool, install_idle_ping
+
+T = TypeVar("T")
 
 engine = None
 SessionLocal: Optional[sessionmaker[Session]] = None
 
+async_engine: Optional[AsyncEngine] = None
+AsyncSessionLocal: Optional[async_sessionmaker[AsyncSession]] = None
+
+# Drivers asincronos equivalentes a los de DATABASE_URL
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+psycopg",
+    "postgresql+psycopg": "postgresql+psycopg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def _engine_options(url: URL, pool_class: type) -> dict[str, Any]:
+    options: dict[str, Any] = {"pool_pre_ping": settings.db_pool_pre_ping == "always"}
+    # SQLite en memoria usa su propio pool de una conexion
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+    options.update(
+        poolclass=pool_class,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+    )
+    if url.get_backend_name() == "postgresql" and settings.db_statement_timeout_ms > 0:
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
+    return options
+
+
+def _configure_engine(sync_engine) -> None:
+    if settings.db_pool_pre_ping == "idle":
+        install_idle_ping(sync_engine, settings.db_pool_ping_idle_seconds)
+
 
 def init_engine() -> None:
     global engine, SessionLocal
-    engine = create_engine(settings.database_url, pool_pre_ping=True)
+    url = make_url(settings.database_url)
+    engine = create_engine(url, **_engine_options(url, TimedQueuePool))
+    _configure_engine(engine)
     SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
 
-def get_db():
+def async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    return parsed.set(drivername=_ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)).render_as_string(
+        hide_password=False
+    )
+
+
+def init_async_engine() -> None:
+    global async_engine, AsyncSessionLocal
+    url = make_url(async_database_url(settings.database_url))
+    async_engine = create_async_engine(url, **_engine_options(url, TimedAsyncQueuePool))
+    _configure_engine(async_engine.sync_engine)
+    # Sin expirar al hacer commit: la respuesta se serializa fuera del contexto de la sesion
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+def open_session() -> Session:
     if SessionLocal is None:
         init_engine()
     if SessionLocal is None:
         raise RuntimeError("SessionLocal is not initialized")
-    db = SessionLocal()
+    return SessionLocal()
+
+
+def open_async_session() -> AsyncSession:
+    if AsyncSessionLocal is None:
+        init_async_engine()
+    if AsyncSessionLocal is None:
+        raise RuntimeError("AsyncSessionLocal is not initialized")
+    return AsyncSessionLocal()
+
+
+# Hilos propios para cerrar sesiones, uno por conexion que el pool puede prestar: con el
+# threadpool lleno de peticiones esperando conexion, cerrar con el limitador comun las
+# dejaria bloqueadas
+_close_limiter = anyio.CapacityLimiter(settings.db_pool_size + settings.db_max_overflow)
+
+
+async def _close_in_thread(db: Session) -> None:
+    await anyio.to_thread.run_sync(db.close, limiter=_close_limiter)
+
+
+async def get_sync_db():
+    # La sesion solo toma conexion en la primera consulta; si no se uso, cerrarla no hace IO
+    # y se evita el salto al threadpool
+    db = open_session()
     try:
         yield db
     finally:
-        db.close()
+        if db.in_transaction():
+            await _close_in_thread(db)
+        else:
+            db.close()
+
+
+async def _get_async_db():
+    db = open_async_session()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+# Con DB_ASYNC las dependencias reciben una AsyncSession en lugar de una Session
+get_db = _get_async_db if settings.db_async else get_sync_db
+
+
+async def run_db(db: Session | AsyncSession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Runs sync ORM code fn(session, ...) from async code without blocking the event loop.
+
+    AsyncSession runs it on the event loop through run_sync; a plain Session
+    runs it on the threadpool.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+async def run_in_session(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Like run_db, but on a short-lived session of its own instead of the request's get_db."""
+    if settings.db_async:
+        async with open_async_session() as db:
+            return await run_db(db, fn, *args, **kwargs)
+    db = open_session()
+    try:
+        return await run_db(db, fn, *args, **kwargs)
+    finally:
+        if db.in_transaction():
+            await _close_in_thread(db)
+        else:
+            db.close()
+
+
+def _ping(db: Session) -> None:
+    db.execute(text("SELECT 1"))
+
+
+async def check_database() -> dict[str, Any]:
+    """Readiness probe: fails fast when the pool is exhausted, otherwise runs SELECT 1."""
+    if settings.db_async:
+        if async_engine is None:
+            init_async_engine()
+        pool = async_engine.pool
+    else:
+        if engine is None:
+            init_engine()
+        pool = engine.pool
+
+    if isinstance(pool, QueuePool):
+        limit = pool.size() + max(getattr(pool, "max_overflow_limit", 0), 0)
+        if pool.checkedin() == 0 and pool.checkedout() >= limit:
+            raise RuntimeError("Connection pool exhausted")
+
+    await run_in_session(_ping)
+    return {"pool": type(pool).__name__, "in_use": pool.checkedout() if isinstance(pool, QueuePool) else None}
@@ -1,20 +1,51 @@
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager, suppress
+import logging
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
 
 from app.api.auth import router as auth_router
+from app.api.routers.export import router as export_router
 from app.api.routers.focus_sessions import router as focus_sessions_router
 from app.api.routers.goal_logs import router as goal_logs_router
 from app.api.routers.goal_revisions import router as goal_revisions_router
 from app.api.routers.goals import router as goals_router
 from app.api.routers.stats import router as stats_router
+from app.core.cache import render_cache_metrics, revision_cache, stats_cache, user_state_cache
 from app.core.settings import settings
 from app.core.logging import setup_logging
+from app.core.metrics import MetricsMiddleware, request_metrics
+from app.db import session as db_session
+from app.db.session import check_database
+from app.db.instrumentation import install_query_hooks
+from app.db.pool import pool_status, render_pool_metrics
+from app.services.focus_sweeper import run_focus_sweeper
 
 setup_logging()
+logger = logging.getLogger(__name__)
+install_query_hooks()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    sweeper = None
+    if settings.focus_sweep_interval_seconds > 0:
+        sweeper = asyncio.create_task(run_focus_sweeper(settings.focus_sweep_interval_seconds))
+    try:
+        yield
+    finally:
+        if sweeper is not None:
+            sweeper.cancel()
+            with suppress(asyncio.CancelledError):
+                await sweeper
+
 
-app = FastAPI(title=settings.app_name, version=settings.api_version)
+app = FastAPI(title=settings.app_name, version=settings.api_version, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,7 +53,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"] ,
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
+# Ultimo en registrarse: envuelve a CORS y mide la peticion completa
+app.add_middleware(MetricsMiddleware)
 
 
 app.include_router(auth_router)
@@ -31,8 +65,53 @@ app.include_router(goal_revisions_router)
 app.include_router(goal_logs_router)
 app.include_router(focus_sessions_router)
 app.include_router(stats_router)
+app.include_router(export_router)
 
 
 @app.get("/api/health", summary="Health check")
-def health_check():
+async def health_check():
     return {"status": "ok"}
+
+
+@app.get("/api/health/live", summary="Liveness probe", description="Answers without touching the database.")
+async def health_live():
+    return {"status": "ok"}
+
+
+@app.get(
+    "/api/health/ready",
+    summary="Readiness probe",
+    description="Checks that a pooled database connection can be obtained and used.",
+    responses={503: {"description": "Database unavailable or pool exhausted"}},
+)
+async def health_ready():
+    try:
+        database = await check_database()
+    except Exception as error:
+        logger.warning("Readiness check failed: %s", error)
+        return JSONResponse(status_code=HTTP_503_SERVICE_UNAVAILABLE, content={"status": "unavailable"})
+    return {"status": "ok", "database": database}
+
+
+@app.get("/api/health/pool", summary="Connection pool metrics")
+async def pool_health():
+    return {
+        "sync": pool_status(db_session.engine),
+        "async": pool_status(db_session.async_engine),
+    }
+
+
+@app.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Prometheus metrics",
+    description=(
+        "Prometheus text exposition: per-route latency histograms, status counts, SQL statements "
+        "and SQL time per request, pool gauges and cache counters. Not authenticated; keep it off the public proxy."
+    ),
+)
+async def metrics():
+    lines = request_metrics.render()
+    lines += render_pool_metrics({"sync": db_session.engine, "async": db_session.async_engine})
+    lines += render_cache_metrics({"stats": stats_cache, "revisions": revision_cache, "user_state": user_state_cache})
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
@@ -1,3 +1,4 @@
+from app.models.dailyrollup import DailyRollup
 from app.models.focussession import FocusSession
 from app.models.goal import Goal
 from app.models.goallog import GoalLog
@@ -14,4 +15,5 @@ __all__ = [
     "GoalLog",
     "GoalRevision",
     "SystemSetting",
+    "DailyRollup",
 ]
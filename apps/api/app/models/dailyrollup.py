@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import Date, ForeignKey, Index, Integer, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+# Agregado diario por usuario y meta, mantenido en cada escritura de logs y sesiones
+class DailyRollup(Base):
+    __tablename__ = "daily_rollups"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    # NULL para sesiones de focus sin meta
+    goal_id: Mapped[int | None] = mapped_column(
+        ForeignKey("goals.id", ondelete="CASCADE")
+    )
+    date: Mapped[date] = mapped_column(Date, nullable=False)
+
+    value_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    log_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    focus_seconds: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    session_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id",
+            "goal_id",
+            "date",
+            name="uq_daily_rollups_user_id_goal_id_date",
+            postgresql_nulls_not_distinct=True,
+        ),
+        Index("ix_daily_rollups_user_id_date", "user_id", "date"),
+        Index("ix_daily_rollups_goal_id_date", "goal_id", "date"),
+    )
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -23,4 +23,36 @@ class FocusSession(Base):
     status: Mapped[str] = mapped_column(String(20), nullable=False)
 
     started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # dia (UTC) al que se atribuye la sesion; mismo dia que su GoalLog de focus
+    started_on: Mapped[date] = mapped_column(Date, nullable=False)
     ended_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    # started_at + duration_seconds + paused_seconds: momento en que vence mientras corre
+    expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+    __table_args__ = (
+        Index(
+            "ix_focus_sessions_user_id_started_at",
+            "user_id",
+            "started_at",
+            postgresql_include=["duration_seconds"],
+        ),
+        Index(
+            "ix_focus_sessions_user_id_started_on",
+            "user_id",
+            "started_on",
+            postgresql_include=["goal_id", "duration_seconds"],
+        ),
+        # Solo sesiones activas: sirve a services.focus.active_session
+        Index(
+            "ix_focus_sessions_active",
+            "user_id",
+            "started_at",
+            postgresql_where=text("status IN ('running', 'paused')"),
+        ),
+        # Barrido de sesiones vencidas (services.focus.complete_expired_sessions)
+        Index(
+            "ix_focus_sessions_active_expires_at",
+            "expires_at",
+            postgresql_where=text("status IN ('running', 'paused')"),
+        ),
+    )
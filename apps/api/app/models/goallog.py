@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import date, datetime
 
-from sqlalchemy import Date, DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, String, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -33,4 +33,10 @@ class GoalLog(Base):
 
     __table_args__ = (
         UniqueConstraint("goal_id", "date", "focus_session_id"),
+        Index("ix_goal_logs_date", "date", postgresql_include=["goal_id", "value"]),
+        Index(
+            "ix_goal_logs_focus_session_id",
+            "focus_session_id",
+            postgresql_where=text("focus_session_id IS NOT NULL"),
+        ),
     )
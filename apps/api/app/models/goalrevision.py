@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import date, datetime
 
-from sqlalchemy import Date, DateTime, ForeignKey, Integer
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -29,3 +29,13 @@ class GoalRevision(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=datetime.utcnow
     )
+
+    __table_args__ = (
+        Index("ix_goal_revisions_goal_id_valid_from", "goal_id", "valid_from"),
+        # Revision vigente (valid_to abierto) por meta
+        Index(
+            "ix_goal_revisions_open",
+            "goal_id",
+            postgresql_where=text("valid_to IS NULL"),
+        ),
+    )
@@ -16,6 +16,12 @@ class User(Base):
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
     is_admin: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    # Se incrementa con cada escritura de metas, logs, revisiones o sesiones (ETags)
+    data_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # Solo cambia con metas y revisiones: clave de las lineas de objetivos en cache
+    revision_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # Se incrementa para revocar todos los tokens emitidos al usuario
+    token_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
@@ -25,4 +25,5 @@ class FocusSessionOut(BaseModel):
 
 class FocusSessionsOut(BaseModel):
     items: list[FocusSessionOut]
-    total: int
+    total: int | None
+    next_cursor: str | None = None
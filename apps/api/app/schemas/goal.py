@@ -37,7 +37,8 @@ class GoalOut(BaseModel):
 
 class GoalsOut(BaseModel):
     items: list[GoalOut]
-    total: int
+    total: int | None
+    next_cursor: str | None = None
 
 
 
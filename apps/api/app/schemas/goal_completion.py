@@ -0,0 +1,40 @@
+from datetime import date
+from pydantic import BaseModel, Field
+
+from app.models.goaltype import GoalType
+
+
+class GoalCompletionSeries(BaseModel):
+    goal_id: int
+    # Un valor por dia desde "from" hasta "to"
+    met: list[bool]
+
+
+class GoalCompletionOut(BaseModel):
+    from_date: date = Field(..., alias="from")
+    to_date: date = Field(..., alias="to")
+    goals: list[GoalCompletionSeries]
+
+    model_config = {
+        "populate_by_name": True
+    }
+
+
+class GoalMatrixRow(BaseModel):
+    goal_id: int
+    name: str
+    goal_type: GoalType
+    # Un valor por dia desde "from" hasta "to"
+    target: list[int]
+    value: list[int]
+    met: list[bool]
+
+
+class GoalMatrixOut(BaseModel):
+    from_date: date = Field(..., alias="from")
+    to_date: date = Field(..., alias="to")
+    goals: list[GoalMatrixRow]
+
+    model_config = {
+        "populate_by_name": True
+    }
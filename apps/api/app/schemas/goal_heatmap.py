@@ -18,3 +18,36 @@ class GoalHeatmapOut(BaseModel):
     model_config = {
         "populate_by_name": True
     }
+
+
+# dense: lista de enteros; packed: base64 de uint16 little-endian
+HeatmapFormat = Literal["values", "dense", "packed"]
+
+
+class GoalHeatmapSeries(BaseModel):
+    goal_id: int
+    # counts[i] corresponde al dia "from" + i
+    counts: list[int] | str
+
+
+class GoalHeatmapDenseOut(GoalHeatmapSeries):
+    from_date: date = Field(..., alias="from")
+    to_date: date = Field(..., alias="to")
+    unit: Literal["day"]
+    format: Literal["dense", "packed"]
+
+    model_config = {
+        "populate_by_name": True
+    }
+
+
+class GoalsHeatmapOut(BaseModel):
+    from_date: date = Field(..., alias="from")
+    to_date: date = Field(..., alias="to")
+    unit: Literal["day"]
+    format: Literal["dense", "packed"]
+    goals: list[GoalHeatmapSeries]
+
+    model_config = {
+        "populate_by_name": True
+    }
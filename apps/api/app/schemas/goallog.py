@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from datetime import date, datetime
+from typing import Annotated, Literal, Union
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -28,4 +29,51 @@ class GoalLogOut(BaseModel):
 
 class GoalLogsOut(BaseModel):
     items: list[GoalLogOut]
-    total: int
+    total: int | None
+    next_cursor: str | None = None
+
+
+class GoalLogImportError(BaseModel):
+    line: int
+    error: str
+
+
+class GoalLogImportOut(BaseModel):
+    inserted: int
+    skipped: int
+    errors: list[GoalLogImportError]
+
+
+class GoalLogBatchCreate(BaseModel):
+    op: Literal["create"]
+    goal_id: int
+    date: date
+    value: int = Field(..., ge=1)
+
+
+class GoalLogBatchUpdate(BaseModel):
+    op: Literal["update"]
+    goal_id: int
+    log_id: int
+    value: int = Field(..., ge=1)
+
+
+class GoalLogBatchDelete(BaseModel):
+    op: Literal["delete"]
+    goal_id: int
+    log_id: int
+
+
+GoalLogBatchOperation = Annotated[
+    Union[GoalLogBatchCreate, GoalLogBatchUpdate, GoalLogBatchDelete],
+    Field(discriminator="op"),
+]
+
+
+class GoalLogBatchIn(BaseModel):
+    operations: list[GoalLogBatchOperation] = Field(..., min_length=1, max_length=500)
+
+
+class GoalLogBatchOut(BaseModel):
+    items: list[GoalLogOut]
+    deleted_ids: list[int]
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from datetime import date
+from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class DailyStatsOut(BaseModel):
@@ -38,3 +39,21 @@ class YearlyStatsOut(BaseModel):
     goal_value_sum: int
     focus_seconds: int
     months: list[YearlyMonthStats]
+
+
+class RangeGoalSeries(BaseModel):
+    goal_id: int
+    goal_value_sum: list[int]
+    focus_seconds: list[int]
+
+
+class RangeStatsOut(BaseModel):
+    from_date: date = Field(..., alias="from")
+    to_date: date = Field(..., alias="to")
+    bucket: Literal["day", "week", "month"]
+    buckets: list[date]
+    goals: list[RangeGoalSeries]
+
+    model_config = {
+        "populate_by_name": True
+    }
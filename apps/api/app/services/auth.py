@@ -1,26 +1,73 @@
 from __future__ import annotations
 
-from fastapi import Depends, HTTPException, Request
+from dataclasses import dataclass
+
+from fastapi import HTTPException, Request
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from starlette.status import HTTP_401_UNAUTHORIZED
 
+from app.core.cache import user_state_cache
 from app.core.settings import settings
 from app.core.security import decode_access_token
-from app.db.session import get_db
+from app.db.session import run_in_session
 from app.models.user import User
 
-# Dependencia para obtener el usuario actual autenticado a partir de la cookie de sesion
-def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Authenticated principal built from verified token claims, without a users-table row."""
+
+    id: int
+    token_version: int
+
+
+def _select_user_state(db: Session, user_id: int):
+    return db.execute(
+        select(User.is_active, User.token_version).where(User.id == user_id)
+    ).one_or_none()
+
+
+async def _load_user_state(user_id: int) -> tuple[bool, int] | None:
+    # Solo en fallo de cache: sesion propia y corta en lugar de depender de get_db
+    row = await run_in_session(_select_user_state, user_id)
+    if row is None:
+        return None
+    state = (bool(row[0]), int(row[1]))
+    user_state_cache.set(user_id, "state", state)
+    return state
+
+
+def revoke_user_tokens(db: Session, user_id: int) -> None:
+    """Invalidates every token issued to the user. Does not commit.
+
+    Other processes notice within AUTH_USER_CACHE_TTL_SECONDS.
+    """
+    db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(token_version=User.token_version + 1)
+    )
+    user_state_cache.invalidate_user(user_id)
+
+
+# Dependencia para obtener el usuario actual autenticado a partir de la cookie de sesion.
+# FastAPI la ejecuta una sola vez por peticion aunque se declare en el router y como parametro.
+async def get_current_user(request: Request) -> CurrentUser:
     token = request.cookies.get(settings.auth_cookie_name)
     if not token:
         raise HTTPException(status_code=HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
-    user_id = decode_access_token(token)
-    if not user_id:
+    claims = decode_access_token(token)
+    if not claims:
         raise HTTPException(status_code=HTTP_401_UNAUTHORIZED, detail="Invalid session")
+    if not claims.is_active:
+        raise HTTPException(status_code=HTTP_401_UNAUTHORIZED, detail="User inactive")
 
-    user = db.get(User, user_id)
-    if not user or not user.is_active:
+    state = user_state_cache.get(claims.user_id, "state") or await _load_user_state(claims.user_id)
+    if not state or not state[0]:
         raise HTTPException(status_code=HTTP_401_UNAUTHORIZED, detail="User inactive")
+    if state[1] != claims.token_version:
+        raise HTTPException(status_code=HTTP_401_UNAUTHORIZED, detail="Invalid session")
 
-    return user
+    return CurrentUser(id=claims.user_id, token_version=claims.token_version)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import csv
+import io
+import zlib
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Iterator, Literal
+
+import orjson
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from app.db.session import open_session
+from app.models.focussession import FocusSession
+from app.models.goal import Goal
+from app.models.goallog import GoalLog
+from app.models.goalrevision import GoalRevision
+
+ExportEntity = Literal["goals", "revisions", "logs", "sessions"]
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_ENTITIES: tuple[ExportEntity, ...] = ("goals", "revisions", "logs", "sessions")
+
+# Filas leidas por viaje al cursor del servidor
+YIELD_PER = 1000
+CHUNK_BYTES = 64 * 1024
+
+_RECORD_TYPES = {
+    "goals": "goal",
+    "revisions": "revision",
+    "logs": "log",
+    "sessions": "session",
+}
+
+
+def _entity_query(entity: ExportEntity, user_id: int) -> Select:
+    if entity == "goals":
+        return (
+            select(Goal.id, Goal.name, Goal.goal_type, Goal.is_active, Goal.created_at)
+            .where(Goal.user_id == user_id)
+            .order_by(Goal.id)
+        )
+    if entity == "revisions":
+        return (
+            select(
+                GoalRevision.id,
+                GoalRevision.goal_id,
+                GoalRevision.target_value,
+                GoalRevision.valid_from,
+                GoalRevision.valid_to,
+                GoalRevision.created_at,
+            )
+            .join(Goal, GoalRevision.goal_id == Goal.id)
+            .where(Goal.user_id == user_id)
+            .order_by(GoalRevision.id)
+        )
+    if entity == "logs":
+        return (
+            select(
+                GoalLog.id,
+                GoalLog.goal_id,
+                GoalLog.focus_session_id,
+                GoalLog.date,
+                GoalLog.value,
+                GoalLog.source,
+                GoalLog.created_at,
+            )
+            .join(Goal, GoalLog.goal_id == Goal.id)
+            .where(Goal.user_id == user_id)
+            .order_by(GoalLog.id)
+        )
+    return (
+        select(
+            FocusSession.id,
+            FocusSession.goal_id,
+            FocusSession.duration_seconds,
+            FocusSession.paused_seconds,
+            FocusSession.status,
+            FocusSession.started_at,
+            FocusSession.started_on,
+            FocusSession.ended_at,
+        )
+        .where(FocusSession.user_id == user_id)
+        .order_by(FocusSession.id)
+    )
+
+
+def _execute(db: Session, entity: ExportEntity, user_id: int):
+    # yield_per activa stream_results: el driver usa un cursor del servidor
+    result = db.execute(_entity_query(entity, user_id).execution_options(yield_per=YIELD_PER))
+    return list(result.keys()), result
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _ndjson_lines(db: Session, entities: tuple[ExportEntity, ...], user_id: int) -> Iterator[bytes]:
+    for entity in entities:
+        record_type = _RECORD_TYPES[entity]
+        columns, rows = _execute(db, entity, user_id)
+        for row in rows:
+            yield orjson.dumps({"type": record_type, **dict(zip(columns, row))}) + b"\n"
+
+
+def _csv_lines(db: Session, entity: ExportEntity, user_id: int) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    columns, rows = _execute(db, entity, user_id)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _chunked(lines: Iterator[bytes], compress: bool) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    pending = bytearray()
+    for line in lines:
+        pending += line
+        if len(pending) >= CHUNK_BYTES:
+            yield compressor.compress(bytes(pending)) if compressor else bytes(pending)
+            pending.clear()
+    if compressor:
+        yield compressor.compress(bytes(pending)) + compressor.flush()
+    elif pending:
+        yield bytes(pending)
+
+
+def stream_export(
+    user_id: int,
+    export_format: ExportFormat,
+    entities: tuple[ExportEntity, ...],
+    compress: bool = False,
+) -> Iterator[bytes]:
+    """Yields the export body in chunks; opens its own session because it runs after the endpoint returns."""
+    db = open_session()
+    try:
+        if export_format == "csv":
+            lines = _csv_lines(db, entities[0], user_id)
+        else:
+            lines = _ndjson_lines(db, entities, user_id)
+        yield from _chunked(lines, compress)
+    finally:
+        db.close()
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import and_, insert, or_, select, update
 from sqlalchemy.orm import Session
 from app.models.focussession import FocusSession
 from app.models.goallog import GoalLog
+from app.services.rollups import record_log, record_log_totals
+from app.services.versioning import bump_data_versions
+
+ACTIVE_STATUSES = ("running", "paused")
+
 
 def utcnow() -> datetime:
     return datetime.now(timezone.utc)
@@ -29,22 +35,96 @@ def active_session(db: Session, user_id: int) -> FocusSession | None:
         db.execute(
             select(FocusSession)
             .where(FocusSession.user_id == user_id)
-            .where(FocusSession.status.in_(["running", "paused"]))
+            .where(FocusSession.status.in_(ACTIVE_STATUSES))
             .order_by(FocusSession.started_at.desc())
         )
         .scalars()
         .first()
     )
 
-def create_focus_log(db: Session, session: FocusSession) -> None:
+def session_expires_at(session: FocusSession) -> datetime:
+    return session.started_at + timedelta(seconds=session.duration_seconds + (session.paused_seconds or 0))
+
+
+def _focus_log_values(session: FocusSession) -> dict[str, Any] | None:
     if not session.goal_id:
+        return None
+    return {
+        "goal_id": session.goal_id,
+        "focus_session_id": session.id,
+        "date": session.started_on,
+        "value": max(1, session.duration_seconds // 60),
+        "source": "focus",
+    }
+
+
+def create_focus_log(db: Session, session: FocusSession) -> None:
+    values = _focus_log_values(session)
+    if values is None:
         return
-    minutes = max(1, session.duration_seconds // 60)
-    log = GoalLog(
-        goal_id=session.goal_id,
-        focus_session_id=session.id,
-        date=session.started_at.date(),
-        value=minutes,
-        source="focus",
-    )
+    log = GoalLog(**values)
     db.add(log)
+    record_log(db, session.user_id, log)
+
+
+def complete_expired_sessions(
+    db: Session,
+    now: datetime,
+    user_id: int | None = None,
+    limit: int = 500,
+) -> list[FocusSession]:
+    """Completes active sessions whose time is up, with their focus logs. Does not commit.
+
+    Same rule as is_expired: a running session expires at expires_at, a paused
+    one only if it was paused after that. One UPDATE ... RETURNING completes
+    the batch; rows locked by a concurrent sweep are skipped and the status
+    guard keeps a session from being logged twice. Also bumps data_version.
+    """
+    expired = (
+        select(FocusSession.id)
+        .where(
+            or_(
+                and_(FocusSession.status == "running", FocusSession.expires_at <= now),
+                and_(FocusSession.status == "paused", FocusSession.expires_at <= FocusSession.ended_at),
+            )
+        )
+        .order_by(FocusSession.expires_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    if user_id is not None:
+        expired = expired.where(FocusSession.user_id == user_id)
+
+    sessions = (
+        db.execute(
+            update(FocusSession)
+            .where(FocusSession.id.in_(expired))
+            .where(FocusSession.status.in_(ACTIVE_STATUSES))
+            .values(status="completed", ended_at=now)
+            .returning(FocusSession)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        .scalars()
+        .all()
+    )
+    if not sessions:
+        return []
+
+    logs: list[dict[str, Any]] = []
+    totals: dict[int, dict[tuple[int, date], tuple[int, int]]] = {}
+    for session in sessions:
+        values = _focus_log_values(session)
+        if values is None:
+            continue
+        logs.append(values)
+        user_totals = totals.setdefault(session.user_id, {})
+        key = (values["goal_id"], values["date"])
+        value_sum, count = user_totals.get(key, (0, 0))
+        user_totals[key] = (value_sum + values["value"], count + 1)
+    if logs:
+        db.execute(insert(GoalLog), logs)
+    for owner_id, user_totals in totals.items():
+        record_log_totals(db, owner_id, user_totals)
+
+    bump_data_versions(db, {session.user_id for session in sessions})
+    return sessions
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import AsyncIterator
+
+from sqlalchemy.orm import Session
+
+from app.core.events import focus_events
+from app.core.settings import settings
+from app.db.session import run_in_session
+from app.models.focussession import FocusSession
+from app.schemas.focus_session import FocusSessionOut
+from app.services.focus import ACTIVE_STATUSES, active_session, elapsed_seconds, utcnow
+from app.services.focus_sweeper import sweep_and_publish
+
+
+def publish_session(session: FocusSession, event: str = "session") -> None:
+    """Pushes the session's committed state to the owner's streams."""
+    focus_events.publish(session.user_id, event, FocusSessionOut.model_validate(session))
+
+
+def format_event(event: str, session: FocusSessionOut | None) -> str:
+    data = session.model_dump_json() if session is not None else json.dumps(None)
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+def _current_state(db: Session, user_id: int) -> FocusSessionOut | None:
+    session = active_session(db, user_id)
+    return FocusSessionOut.model_validate(session) if session else None
+
+
+def _seconds_left(session: FocusSessionOut | None) -> float | None:
+    if session is None or session.status != "running":
+        return None
+    return session.duration_seconds - elapsed_seconds(session, utcnow())
+
+
+async def focus_event_stream(user_id: int) -> AsyncIterator[str]:
+    """Server-sent events with the user's active focus session.
+
+    Sends `session` with the current state on connect and on every change
+    (null when nothing is active), and `completed` when a running session
+    reaches its duration: the stream completes it right away through the
+    sweeper instead of waiting for the next sweep. No database connection is
+    held between events.
+    """
+    with focus_events.subscribe(user_id) as queue:
+        state = await run_in_session(_current_state, user_id)
+        synced_at = time.monotonic()
+        yield format_event("session", state)
+        retry_seconds = 0.0
+        while True:
+            timeout = settings.focus_stream_heartbeat_seconds
+            seconds_left = _seconds_left(state)
+            if seconds_left is not None:
+                timeout = min(timeout, max(seconds_left, retry_seconds))
+            try:
+                event, session = await asyncio.wait_for(queue.get(), timeout)
+            except TimeoutError:
+                seconds_left = _seconds_left(state)
+                if seconds_left is not None and seconds_left <= 0:
+                    # Sin esperar al barrido periodico; el evento llega por la cola a todas las pestanas
+                    completed = await sweep_and_publish(user_id)
+                    if completed:
+                        state = completed[-1]
+                        continue
+                    # Fila bloqueada por otra peticion: se reintenta sin girar en vacio
+                    retry_seconds = 1.0
+                elif time.monotonic() - synced_at < settings.focus_stream_resync_seconds:
+                    yield ": keep-alive\n\n"
+                    continue
+                # Otro proceso pudo cambiar la sesion: se relee en lugar de confiar en el estado local
+                state = await run_in_session(_current_state, user_id)
+                synced_at = time.monotonic()
+                yield format_event("session", state)
+                continue
+            state = session if session is not None and session.status in ACTIVE_STATUSES else None
+            retry_seconds = 0.0
+            yield format_event(event, session)
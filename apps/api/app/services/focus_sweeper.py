@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import stats_cache
+from app.core.events import focus_events
+from app.core.settings import settings
+from app.db.session import run_in_session
+from app.schemas.focus_session import FocusSessionOut
+from app.services.focus import complete_expired_sessions, utcnow
+
+logger = logging.getLogger(__name__)
+
+
+def sweep_expired_sessions(db: Session, user_id: int | None = None) -> list[FocusSessionOut]:
+    """Completes one batch of expired sessions and commits. Returns them as sent to clients."""
+    sessions = complete_expired_sessions(db, utcnow(), user_id=user_id, limit=settings.focus_sweep_batch_size)
+    if not sessions:
+        db.rollback()
+        return []
+    completed = [FocusSessionOut.model_validate(session) for session in sessions]
+    db.commit()
+    for owner_id in {session.user_id for session in completed}:
+        stats_cache.invalidate_user(owner_id)
+    return completed
+
+
+async def sweep_and_publish(user_id: int | None = None) -> list[FocusSessionOut]:
+    completed = await run_in_session(sweep_expired_sessions, user_id)
+    for session in completed:
+        focus_events.publish(session.user_id, "completed", session)
+    return completed
+
+
+async def run_focus_sweeper(interval_seconds: float) -> None:
+    """Background task: completes sessions abandoned or left running past their duration.
+
+    Every API process may run it; SKIP LOCKED splits the work between them.
+    """
+    while True:
+        try:
+            completed = await sweep_and_publish()
+        except Exception:
+            logger.exception("Focus session sweep failed")
+            completed = []
+        if completed:
+            logger.info("Completed %s expired focus sessions", len(completed))
+        # Lote lleno: probablemente quedan mas, se sigue sin esperar
+        if len(completed) < settings.focus_sweep_batch_size:
+            await asyncio.sleep(interval_seconds)
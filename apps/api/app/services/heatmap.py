@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from array import array
+import base64
+from datetime import date
+import sys
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.dailyrollup import DailyRollup
+
+UINT16_MAX = 0xFFFF
+
+
+def heatmap_counts(
+    db: Session,
+    user_id: int,
+    goal_ids: list[int],
+    start_date: date,
+    end_date: date,
+) -> dict[int, list[int]]:
+    """Logs per day for each goal, counts[i] being the day start_date + i.
+
+    One query over the rollups for every goal; each series is preallocated
+    with zeros and only days with activity are written.
+    """
+    days = (end_date - start_date).days + 1
+    series = {goal_id: [0] * days for goal_id in goal_ids}
+    if not goal_ids:
+        return series
+    rows = db.execute(
+        select(DailyRollup.goal_id, DailyRollup.date, DailyRollup.log_count)
+        .where(DailyRollup.user_id == user_id)
+        .where(DailyRollup.goal_id.in_(goal_ids))
+        .where(DailyRollup.date >= start_date)
+        .where(DailyRollup.date <= end_date)
+        .where(DailyRollup.log_count > 0)
+    )
+    for goal_id, day, log_count in rows:
+        series[goal_id][(day - start_date).days] = int(log_count)
+    return series
+
+
+def pack_counts(counts: list[int]) -> str:
+    """Base64 of the counts as little-endian uint16, saturated at 65535."""
+    packed = array("H", (min(count, UINT16_MAX) for count in counts))
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return base64.b64encode(packed.tobytes()).decode("ascii")
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import csv
+import io
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Literal
+
+import orjson
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.goal import Goal
+from app.models.goallog import GoalLog
+from app.services.rollups import record_log_totals
+
+ImportFormat = Literal["csv", "ndjson"]
+
+IMPORT_COLUMNS = ("goal_id", "date", "value")
+INSERT_CHUNK = 1000
+MAX_IMPORT_ROWS = 100_000
+MAX_IMPORT_BODY_BYTES = 16 * 1024 * 1024
+# Solo se guardan los primeros errores; el resto solo cuenta en skipped
+MAX_IMPORT_ERRORS = 500
+# Columnas integer (int4) en PostgreSQL: fuera de rango el INSERT por lotes fallaria entero
+MAX_INT4 = 2_147_483_647
+# Tope de una linea NDJSON o de un registro CSV, aunque tenga comillas abiertas
+MAX_RECORD_BYTES = 64 * 1024
+
+
+class ImportLimitError(Exception):
+    """The body is over a size limit; the import is aborted before touching the database."""
+
+
+@dataclass
+class ImportRow:
+    line: int
+    goal_id: int
+    date: date
+    value: int
+
+
+@dataclass
+class ImportRowError:
+    line: int
+    error: str
+
+
+@dataclass
+class ImportResult:
+    inserted: int = 0
+    skipped: int = 0
+    errors: list[ImportRowError] = field(default_factory=list)
+
+    def add_error(self, line: int, error: str) -> None:
+        self.skipped += 1
+        if len(self.errors) < MAX_IMPORT_ERRORS:
+            self.errors.append(ImportRowError(line=line, error=error))
+
+
+def _parse_record(line: int, record: dict[str, Any]) -> ImportRow:
+    try:
+        goal_id = int(record["goal_id"])
+        day = record["date"]
+        day = day if isinstance(day, date) else date.fromisoformat(str(day).strip())
+        value = int(record["value"])
+    except KeyError as exc:
+        raise ValueError(f"Missing field {exc.args[0]}")
+    except (TypeError, ValueError):
+        raise ValueError("Invalid goal_id, date or value")
+    if not 1 <= goal_id <= MAX_INT4:
+        raise ValueError("Invalid goal_id")
+    if value < 1:
+        raise ValueError("Value must be >= 1")
+    if value > MAX_INT4:
+        raise ValueError(f"Value must be <= {MAX_INT4}")
+    return ImportRow(line=line, goal_id=goal_id, date=day, value=value)
+
+
+class RowParser:
+    """Incremental CSV/NDJSON parser fed with raw body chunks.
+
+    Parse errors are collected per line instead of aborting the import. A CSV
+    record whose quoted fields span several physical lines is parsed as one
+    and reported by its first line. A body, line or row count over its limit
+    raises ImportLimitError as soon as it is seen.
+    """
+
+    def __init__(self, import_format: ImportFormat) -> None:
+        self.import_format = import_format
+        self.rows: list[ImportRow] = []
+        self.result = ImportResult()
+        self._size = 0
+        self._pending = b""
+        self._line = 0
+        self._header: list[str] | None = None
+        # Lineas de un registro CSV con un campo entre comillas aun abierto
+        self._record: list[bytes] = []
+        self._record_line = 0
+
+    def feed(self, chunk: bytes) -> None:
+        self._size += len(chunk)
+        if self._size > MAX_IMPORT_BODY_BYTES:
+            raise ImportLimitError(f"Body larger than {MAX_IMPORT_BODY_BYTES} bytes")
+        data = self._pending + chunk
+        *lines, self._pending = data.split(b"\n")
+        for raw in lines:
+            self._feed_line(raw)
+        # Una linea sin salto no se acumula entera
+        if len(self._pending) > MAX_RECORD_BYTES:
+            self._record_too_long(self._line + 1)
+
+    def close(self) -> None:
+        if self._pending:
+            self._feed_line(self._pending)
+            self._pending = b""
+        if self._record:
+            self.result.add_error(self._record_line, "Unterminated quoted field")
+            self._record = []
+
+    def _record_too_long(self, line: int) -> None:
+        raise ImportLimitError(f"Line {line}: record longer than {MAX_RECORD_BYTES} bytes")
+
+    def _feed_line(self, raw: bytes) -> None:
+        self._line += 1
+        if len(raw) > MAX_RECORD_BYTES:
+            self._record_too_long(self._line)
+        if self.import_format != "csv":
+            self._parse(self._line, raw)
+            return
+        if not self._record:
+            self._record_line = self._line
+        self._record.append(raw)
+        record = b"\n".join(self._record)
+        # Con un numero impar de comillas el campo sigue abierto en la linea siguiente
+        if record.count(b'"') % 2:
+            if len(record) > MAX_RECORD_BYTES:
+                self._record_too_long(self._record_line)
+            return
+        self._record = []
+        self._parse(self._record_line, record)
+
+    def _parse(self, line: int, raw: bytes) -> None:
+        text = raw.decode("utf-8", errors="replace").strip()
+        if not text:
+            return
+        if len(self.rows) >= MAX_IMPORT_ROWS:
+            raise ImportLimitError(f"More than {MAX_IMPORT_ROWS} rows")
+        try:
+            if self.import_format == "ndjson":
+                record = orjson.loads(text)
+                if not isinstance(record, dict):
+                    raise ValueError("Expected a JSON object")
+            else:
+                values = next(csv.reader(io.StringIO(text)))
+                if self._header is None:
+                    self._header = [name.strip() for name in values]
+                    missing = [name for name in IMPORT_COLUMNS if name not in self._header]
+                    if missing:
+                        raise ValueError(f"Missing columns: {', '.join(missing)}")
+                    return
+                record = dict(zip(self._header, values))
+            self.rows.append(_parse_record(line, record))
+        except orjson.JSONDecodeError:
+            self.result.add_error(line, "Invalid JSON")
+        except ValueError as exc:
+            self.result.add_error(line, str(exc))
+
+
+def import_goal_logs(db: Session, user_id: int, rows: list[ImportRow]) -> ImportResult:
+    """Inserts parsed rows as source='import' logs in batches. Does not commit.
+
+    Rows for goals the user does not own, and rows whose (goal_id, date) already
+    has a manual or imported log, are reported as errors and skipped.
+    """
+    result = ImportResult()
+    if not rows:
+        return result
+
+    goal_ids = {row.goal_id for row in rows}
+    owned = set(
+        db.execute(select(Goal.id).where(Goal.user_id == user_id).where(Goal.id.in_(goal_ids))).scalars()
+    )
+
+    # La restriccion unica no cubre focus_session_id NULL: se deduplica aqui
+    existing: set[tuple[int, date]] = set()
+    if owned:
+        existing = {
+            (goal_id, day)
+            for goal_id, day in db.execute(
+                select(GoalLog.goal_id, GoalLog.date)
+                .where(GoalLog.goal_id.in_(owned))
+                .where(GoalLog.focus_session_id.is_(None))
+                .where(GoalLog.date >= min(row.date for row in rows))
+                .where(GoalLog.date <= max(row.date for row in rows))
+            )
+        }
+
+    to_insert: list[dict[str, Any]] = []
+    totals: dict[tuple[int, date], tuple[int, int]] = defaultdict(lambda: (0, 0))
+    for row in rows:
+        key = (row.goal_id, row.date)
+        if row.goal_id not in owned:
+            result.add_error(row.line, "Goal not found")
+            continue
+        if key in existing:
+            result.add_error(row.line, "Log already exists for goal and date")
+            continue
+        existing.add(key)
+        to_insert.append(
+            {
+                "goal_id": row.goal_id,
+                "focus_session_id": None,
+                "date": row.date,
+                "value": row.value,
+                "source": "import",
+            }
+        )
+        value_sum, count = totals[key]
+        totals[key] = (value_sum + row.value, count + 1)
+
+    for start in range(0, len(to_insert), INSERT_CHUNK):
+        db.execute(insert(GoalLog), to_insert[start:start + INSERT_CHUNK])
+    record_log_totals(db, user_id, dict(totals))
+
+    result.inserted = len(to_insert)
+    return result
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.orm import Session
+from starlette.status import HTTP_400_BAD_REQUEST
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(raw: Any, python_type: type) -> Any:
+    if python_type is datetime:
+        return datetime.fromisoformat(raw)
+    if python_type is date:
+        return date.fromisoformat(raw)
+    return python_type(raw)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> list[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(raw, list) or len(raw) != len(columns):
+            raise ValueError("cursor length mismatch")
+        return [_decode_value(item, column.type.python_type) for item, column in zip(raw, columns)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def keyset_page(
+    db: Session,
+    query: Select,
+    order_columns: Sequence[Any],
+    limit: int,
+    offset: int = 0,
+    cursor: str | None = None,
+) -> tuple[list[Any], str | None]:
+    """Returns one page ordered by order_columns descending and the cursor of the next one.
+
+    order_columns must end with a unique column. With a cursor, rows strictly
+    after it are returned and offset is ignored. A query selecting one entity
+    returns its objects; one selecting several columns returns the rows.
+    """
+    if cursor:
+        after = decode_cursor(cursor, order_columns)
+        query = query.where(tuple_(*order_columns) < tuple_(*after))
+    else:
+        query = query.offset(offset)
+
+    result = db.execute(query.order_by(*(column.desc() for column in order_columns)).limit(limit + 1))
+    rows = (result.scalars() if len(query.column_descriptions) == 1 else result).all()
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in order_columns])
+    return items, next_cursor
+
+
+def count_rows(db: Session, query: Select) -> int:
+    return db.execute(select(func.count()).select_from(query.order_by(None).subquery())).scalar_one()
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Iterable
+
+from sqlalchemy import and_, exists, func, or_, select
+from sqlalchemy.orm import Session, aliased
+
+from app.core.cache import revision_cache
+from app.models.dailyrollup import DailyRollup
+from app.models.goal import Goal
+from app.models.goallog import GoalLog
+from app.models.goalrevision import GoalRevision
+from app.models.goaltype import GoalType
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class RevisionTimeline:
+    """Targets of one goal as disjoint segments sorted by start.
+
+    targets[i] applies from starts[i] until the day before starts[i + 1]; 0
+    means no revision covers those days.
+    """
+
+    starts: tuple[date, ...]
+    targets: tuple[int, ...]
+
+    def target_on(self, day: date) -> int:
+        index = bisect_right(self.starts, day) - 1
+        return self.targets[index] if index >= 0 else 0
+
+
+# Las metas booleanas se cumplen con un registro, sin mirar revisiones
+BOOLEAN_TIMELINE = RevisionTimeline(starts=(date.min,), targets=(1,))
+
+
+def build_timeline(revisions: Iterable[tuple[date, date | None, int]]) -> RevisionTimeline:
+    """Builds the timeline from (valid_from, valid_to, target_value) rows, valid_to inclusive.
+
+    Same rule as the web client: when revisions overlap, the one with the
+    latest valid_from wins. Goals have a handful of revisions, so each
+    boundary is resolved with a plain scan.
+    """
+    revisions = sorted(revisions, key=lambda item: item[0])
+    boundaries = sorted(
+        {valid_from for valid_from, _, _ in revisions}
+        | {valid_to + timedelta(days=1) for _, valid_to, _ in revisions if valid_to is not None and valid_to < date.max}
+    )
+    starts: list[date] = []
+    targets: list[int] = []
+    for boundary in boundaries:
+        target = 0
+        for valid_from, valid_to, target_value in revisions:
+            if valid_from > boundary:
+                break
+            if valid_to is None or valid_to >= boundary:
+                target = target_value
+        if targets and targets[-1] == target:
+            continue
+        starts.append(boundary)
+        targets.append(target)
+    return RevisionTimeline(starts=tuple(starts), targets=tuple(targets))
+
+
+def _load_timelines(db: Session, user_id: int) -> dict[int, RevisionTimeline]:
+    rows = db.execute(
+        select(Goal.id, Goal.goal_type, GoalRevision.valid_from, GoalRevision.valid_to, GoalRevision.target_value)
+        .outerjoin(GoalRevision, GoalRevision.goal_id == Goal.id)
+        .where(Goal.user_id == user_id)
+        # Empates de valid_from: gana la revision mas nueva, como en completion_matrix
+        .order_by(GoalRevision.valid_from, GoalRevision.id)
+    ).all()
+    goal_types: dict[int, GoalType] = {}
+    revisions: dict[int, list[tuple[date, date | None, int]]] = {}
+    for goal_id, goal_type, valid_from, valid_to, target_value in rows:
+        goal_types[goal_id] = goal_type
+        items = revisions.setdefault(goal_id, [])
+        if valid_from is not None:
+            items.append((valid_from, valid_to, target_value))
+    return {
+        goal_id: BOOLEAN_TIMELINE if goal_type == GoalType.boolean else build_timeline(revisions[goal_id])
+        for goal_id, goal_type in goal_types.items()
+    }
+
+
+def revision_timelines(db: Session, user_id: int) -> dict[int, RevisionTimeline]:
+    """Timelines of every goal of the user, cached per revision version.
+
+    Only goal and revision writes bump revision_version, so logs and focus
+    sessions keep the cached timelines, while a revision written in another
+    worker is never served stale.
+    """
+    version = db.execute(select(User.revision_version).where(User.id == user_id)).scalar_one()
+    return revision_cache.get_or_set(user_id, ("timelines", version), lambda: _load_timelines(db, user_id))
+
+
+def goal_completion(
+    db: Session,
+    user_id: int,
+    start_date: date,
+    end_date: date,
+    goal_ids: list[int] | None = None,
+) -> list[tuple[int, list[bool]]]:
+    """Per goal, whether each day from start_date to end_date met its target.
+
+    Only active goals unless goal_ids is given. Daily totals come from the
+    rollups; targets from the cached timelines.
+    """
+    goals = select(Goal.id).where(Goal.user_id == user_id).order_by(Goal.created_at, Goal.id)
+    goals = goals.where(Goal.id.in_(goal_ids)) if goal_ids else goals.where(Goal.is_active.is_(True))
+    ids = list(db.execute(goals).scalars())
+    if not ids:
+        return []
+
+    totals = {
+        (goal_id, day): int(value_sum)
+        for goal_id, day, value_sum in db.execute(
+            select(DailyRollup.goal_id, DailyRollup.date, DailyRollup.value_sum)
+            .where(DailyRollup.user_id == user_id)
+            .where(DailyRollup.goal_id.in_(ids))
+            .where(DailyRollup.date >= start_date)
+            .where(DailyRollup.date <= end_date)
+            .where(DailyRollup.value_sum > 0)
+        )
+    }
+    timelines = revision_timelines(db, user_id)
+    days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+
+    series = []
+    for goal_id in ids:
+        timeline = timelines.get(goal_id)
+        met = []
+        for day in days:
+            target = timeline.target_on(day) if timeline else 0
+            met.append(target > 0 and totals.get((goal_id, day), 0) >= target)
+        series.append((goal_id, met))
+    return series
+
+
+def _active_revision_on(day):
+    """Join condition: the GoalRevision in force on `day` (a column), without overlap duplicates."""
+    newer = aliased(GoalRevision)
+    superseded = exists().where(
+        newer.goal_id == GoalRevision.goal_id,
+        or_(
+            newer.valid_from > GoalRevision.valid_from,
+            and_(newer.valid_from == GoalRevision.valid_from, newer.id > GoalRevision.id),
+        ),
+        newer.valid_from <= day,
+        or_(newer.valid_to.is_(None), newer.valid_to >= day),
+    )
+    return and_(
+        GoalRevision.goal_id == Goal.id,
+        GoalRevision.valid_from <= day,
+        or_(GoalRevision.valid_to.is_(None), GoalRevision.valid_to >= day),
+        ~superseded,
+    )
+
+
+def completion_matrix(
+    db: Session,
+    user_id: int,
+    start_date: date,
+    end_date: date,
+    goal_ids: list[int] | None = None,
+    include_inactive: bool = False,
+) -> list[dict]:
+    """Goals x days matrix with target, achieved value and met flag per cell.
+
+    One grouped query joins Goal, its GoalLog rows in the range and the
+    revision in force on each log's day (range join), so it returns the goal
+    list and every day with activity. Days without logs take their target
+    from the cached revision timeline instead of another query.
+    """
+    stmt = (
+        select(
+            Goal.id,
+            Goal.name,
+            Goal.goal_type,
+            GoalLog.date,
+            func.sum(GoalLog.value),
+            func.max(GoalRevision.target_value),
+        )
+        .outerjoin(
+            GoalLog,
+            and_(GoalLog.goal_id == Goal.id, GoalLog.date >= start_date, GoalLog.date <= end_date),
+        )
+        .outerjoin(GoalRevision, _active_revision_on(GoalLog.date))
+        .where(Goal.user_id == user_id)
+        .group_by(Goal.id, Goal.name, Goal.goal_type, GoalLog.date)
+        .order_by(Goal.created_at, Goal.id)
+    )
+    if goal_ids:
+        stmt = stmt.where(Goal.id.in_(goal_ids))
+    elif not include_inactive:
+        stmt = stmt.where(Goal.is_active.is_(True))
+
+    goals: dict[int, dict] = {}
+    cells: dict[tuple[int, date], tuple[int, int]] = {}
+    for goal_id, name, goal_type, day, value_sum, target in db.execute(stmt):
+        goals.setdefault(goal_id, {"goal_id": goal_id, "name": name, "goal_type": goal_type})
+        if day is not None:
+            cells[(goal_id, day)] = (int(value_sum or 0), int(target or 0))
+    if not goals:
+        return []
+
+    timelines = revision_timelines(db, user_id)
+    days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    for goal_id, row in goals.items():
+        timeline = timelines.get(goal_id)
+        boolean = row["goal_type"] == GoalType.boolean
+        targets, values, met = [], [], []
+        for day in days:
+            cell = cells.get((goal_id, day))
+            if cell is not None:
+                value, target = cell
+            else:
+                value, target = 0, timeline.target_on(day) if timeline else 0
+            if boolean:
+                target = 1
+            targets.append(target)
+            values.append(value)
+            met.append(target > 0 and value >= target)
+        row.update(target=targets, value=values, met=met)
+    return list(goals.values())
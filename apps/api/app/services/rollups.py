@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.dailyrollup import DailyRollup
+from app.models.focussession import FocusSession
+from app.models.goal import Goal
+from app.models.goallog import GoalLog
+
+ROLLUP_FIELDS = ("value_sum", "log_count", "focus_seconds", "session_count")
+
+RollupKey = tuple[int, int | None, date]
+
+
+def _bump_many(db: Session, user_id: int, deltas: dict[tuple[int | None, date], dict[str, int]]) -> None:
+    # Upsert atomico en PostgreSQL; en otros dialectos update y, si no existe, insert
+    rows = [
+        {"user_id": user_id, "goal_id": goal_id, "date": day, **{f: values.get(f, 0) for f in ROLLUP_FIELDS}}
+        for (goal_id, day), values in deltas.items()
+    ]
+    if not rows:
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        stmt = pg_insert(DailyRollup).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailyRollup.user_id, DailyRollup.goal_id, DailyRollup.date],
+            set_={field: getattr(DailyRollup, field) + stmt.excluded[field] for field in ROLLUP_FIELDS},
+        )
+        db.execute(stmt)
+        return
+
+    for row in rows:
+        result = db.execute(
+            update(DailyRollup)
+            .where(DailyRollup.user_id == user_id)
+            .where(DailyRollup.goal_id.is_not_distinct_from(row["goal_id"]))
+            .where(DailyRollup.date == row["date"])
+            .values({field: getattr(DailyRollup, field) + row[field] for field in ROLLUP_FIELDS})
+        )
+        if result.rowcount == 0:
+            db.execute(insert(DailyRollup).values(**row))
+
+
+def _bump(db: Session, user_id: int, goal_id: int | None, day: date, **deltas: int) -> None:
+    _bump_many(db, user_id, {(goal_id, day): deltas})
+
+
+def record_log(db: Session, user_id: int, log: GoalLog, sign: int = 1) -> None:
+    _bump(db, user_id, log.goal_id, log.date, value_sum=sign * log.value, log_count=sign)
+
+
+def record_log_value_change(db: Session, user_id: int, log: GoalLog, old_value: int) -> None:
+    _bump(db, user_id, log.goal_id, log.date, value_sum=log.value - old_value)
+
+
+def record_log_totals(db: Session, user_id: int, totals: dict[tuple[int, date], tuple[int, int]]) -> None:
+    """Adds (value_sum, log_count) per (goal_id, date), e.g. after a bulk import."""
+    _bump_many(
+        db,
+        user_id,
+        {key: {"value_sum": value_sum, "log_count": count} for key, (value_sum, count) in totals.items()},
+    )
+
+
+def record_session(db: Session, session: FocusSession) -> None:
+    _bump(
+        db,
+        session.user_id,
+        session.goal_id,
+        session.started_on,
+        focus_seconds=session.duration_seconds,
+        session_count=1,
+    )
+
+
+def release_goal_rollups(db: Session, user_id: int, goal_id: int) -> None:
+    """Removes a goal's rollups before the goal is deleted. Does not commit.
+
+    Its logs go with the goal, but its focus sessions stay with goal_id NULL,
+    so their seconds and counts move to the rollups without goal.
+    """
+    released = db.execute(
+        delete(DailyRollup)
+        .where(DailyRollup.user_id == user_id)
+        .where(DailyRollup.goal_id == goal_id)
+        .returning(DailyRollup.date, DailyRollup.focus_seconds, DailyRollup.session_count)
+    ).all()
+    _bump_many(
+        db,
+        user_id,
+        {
+            (None, day): {"focus_seconds": seconds, "session_count": count}
+            for day, seconds, count in released
+            if seconds or count
+        },
+    )
+
+
+def compute_rollups(db: Session, user_id: int | None = None) -> dict[RollupKey, dict[str, int]]:
+    """Recomputes rollups from raw goal_logs and focus_sessions rows."""
+    log_query = (
+        select(Goal.user_id, GoalLog.goal_id, GoalLog.date, func.sum(GoalLog.value), func.count())
+        .join(Goal, GoalLog.goal_id == Goal.id)
+        .group_by(Goal.user_id, GoalLog.goal_id, GoalLog.date)
+    )
+    session_query = select(
+        FocusSession.user_id,
+        FocusSession.goal_id,
+        FocusSession.started_on,
+        func.sum(FocusSession.duration_seconds),
+        func.count(),
+    ).group_by(FocusSession.user_id, FocusSession.goal_id, FocusSession.started_on)
+    if user_id is not None:
+        log_query = log_query.where(Goal.user_id == user_id)
+        session_query = session_query.where(FocusSession.user_id == user_id)
+
+    rollups: dict[RollupKey, dict[str, int]] = {}
+
+    def _row(key: RollupKey) -> dict[str, int]:
+        return rollups.setdefault(key, {field: 0 for field in ROLLUP_FIELDS})
+
+    for row_user_id, goal_id, day, value_sum, count in db.execute(log_query):
+        row = _row((row_user_id, goal_id, day))
+        row["value_sum"] = int(value_sum)
+        row["log_count"] = int(count)
+    for row_user_id, goal_id, day, seconds, count in db.execute(session_query):
+        row = _row((row_user_id, goal_id, day))
+        row["focus_seconds"] = int(seconds)
+        row["session_count"] = int(count)
+    return rollups
+
+
+def rebuild_rollups(db: Session, user_id: int | None = None) -> int:
+    """Replaces stored rollups with values recomputed from raw rows. Does not commit."""
+    expected = compute_rollups(db, user_id)
+    clear = delete(DailyRollup)
+    if user_id is not None:
+        clear = clear.where(DailyRollup.user_id == user_id)
+    db.execute(clear)
+    if expected:
+        db.execute(
+            insert(DailyRollup),
+            [
+                {"user_id": key[0], "goal_id": key[1], "date": key[2], **values}
+                for key, values in expected.items()
+            ],
+        )
+    return len(expected)
+
+
+@dataclass
+class RollupMismatch:
+    user_id: int
+    goal_id: int | None
+    date: date
+    expected: dict[str, int]
+    stored: dict[str, int]
+
+
+def check_rollups(db: Session, user_id: int | None = None) -> list[RollupMismatch]:
+    """Compares stored rollups against raw rows; missing rows count as zeros."""
+    expected = compute_rollups(db, user_id)
+    stored_query = select(DailyRollup)
+    if user_id is not None:
+        stored_query = stored_query.where(DailyRollup.user_id == user_id)
+    stored = {
+        (row.user_id, row.goal_id, row.date): {field: getattr(row, field) for field in ROLLUP_FIELDS}
+        for row in db.execute(stored_query).scalars()
+    }
+
+    zeros = {field: 0 for field in ROLLUP_FIELDS}
+    mismatches = []
+    for key in sorted(expected.keys() | stored.keys(), key=lambda k: (k[0], k[1] or 0, k[2])):
+        want = expected.get(key, zeros)
+        have = stored.get(key, zeros)
+        if want != have:
+            mismatches.append(
+                RollupMismatch(user_id=key[0], goal_id=key[1], date=key[2], expected=want, stored=have)
+            )
+    return mismatches
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Literal
+
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.orm import Session
+
+from app.models.dailyrollup import DailyRollup
+from app.models.goal import Goal
+
+Bucket = Literal["day", "week", "month"]
+
+
+@dataclass
+class BucketAggregate:
+    start: date
+    goal_value_sum: int = 0
+    goal_logs_count: int = 0
+    focus_seconds: int = 0
+    focus_sessions_count: int = 0
+
+
+def bucket_start(day: date, bucket: Bucket) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(start: date, bucket: Bucket) -> date | None:
+    """Start of the following bucket, or None when it would fall past date.max."""
+    try:
+        if bucket == "week":
+            return start + timedelta(days=7)
+        if bucket == "month":
+            if start.month == 12:
+                return date(start.year + 1, 1, 1)
+            return date(start.year, start.month + 1, 1)
+        return start + timedelta(days=1)
+    except (OverflowError, ValueError):
+        return None
+
+
+def iter_buckets(start_date: date, end_date: date, bucket: Bucket) -> list[date]:
+    starts = []
+    current = bucket_start(start_date, bucket)
+    while current is not None and current <= end_date:
+        starts.append(current)
+        current = next_bucket(current, bucket)
+    return starts
+
+
+def bucket_count(start_date: date, end_date: date, bucket: Bucket) -> int:
+    """len(iter_buckets(...)) without building the list, to validate ranges cheaply."""
+    if end_date < start_date:
+        return 0
+    if bucket == "week":
+        return (bucket_start(end_date, bucket) - bucket_start(start_date, bucket)).days // 7 + 1
+    if bucket == "month":
+        return (end_date.year * 12 + end_date.month) - (start_date.year * 12 + start_date.month) + 1
+    return (end_date - start_date).days + 1
+
+
+def _bucket_expr(column, bucket: Bucket):
+    # date_trunc devuelve timestamp; se normaliza a date para usarlo como clave
+    if bucket == "day":
+        return column
+    return cast(func.date_trunc(bucket, column), Date)
+
+
+def range_aggregates(
+    db: Session,
+    user_id: int,
+    start_date: date,
+    end_date: date,
+    bucket: Bucket = "day",
+) -> list[BucketAggregate]:
+    """Aggregates goal logs and focus sessions for [start_date, end_date].
+
+    Reads the daily rollups with one grouped query and returns one entry per
+    bucket, including empty ones, ordered by bucket start.
+    """
+    rollup_bucket = _bucket_expr(DailyRollup.date, bucket)
+    rows = db.execute(
+        select(
+            rollup_bucket,
+            func.sum(DailyRollup.value_sum),
+            func.sum(DailyRollup.log_count),
+            func.sum(DailyRollup.focus_seconds),
+            func.sum(DailyRollup.session_count),
+        )
+        .where(DailyRollup.user_id == user_id)
+        .where(DailyRollup.date >= start_date)
+        .where(DailyRollup.date <= end_date)
+        .group_by(rollup_bucket)
+    ).all()
+
+    aggregates = {start: BucketAggregate(start=start) for start in iter_buckets(start_date, end_date, bucket)}
+    for key, value_sum, log_count, seconds, session_count in rows:
+        item = aggregates.get(key)
+        if item:
+            item.goal_value_sum = int(value_sum)
+            item.goal_logs_count = int(log_count)
+            item.focus_seconds = int(seconds)
+            item.focus_sessions_count = int(session_count)
+
+    return list(aggregates.values())
+
+
+@dataclass
+class GoalSeries:
+    goal_id: int
+    goal_value_sum: list[int]
+    focus_seconds: list[int]
+
+
+def goal_range_aggregates(
+    db: Session,
+    user_id: int,
+    start_date: date,
+    end_date: date,
+    bucket: Bucket = "day",
+    goal_ids: list[int] | None = None,
+) -> tuple[list[date], list[GoalSeries]]:
+    """Per-goal sums for [start_date, end_date] as dense series aligned to the buckets."""
+    goals_query = select(Goal.id).where(Goal.user_id == user_id).order_by(Goal.id)
+    if goal_ids:
+        goals_query = goals_query.where(Goal.id.in_(goal_ids))
+    owned_ids = list(db.execute(goals_query).scalars())
+
+    buckets = iter_buckets(start_date, end_date, bucket)
+    if not owned_ids:
+        return buckets, []
+
+    positions = {start: index for index, start in enumerate(buckets)}
+    series = {
+        goal_id: GoalSeries(goal_id=goal_id, goal_value_sum=[0] * len(buckets), focus_seconds=[0] * len(buckets))
+        for goal_id in owned_ids
+    }
+
+    rollup_bucket = _bucket_expr(DailyRollup.date, bucket)
+    rows = db.execute(
+        select(
+            DailyRollup.goal_id,
+            rollup_bucket,
+            func.sum(DailyRollup.value_sum),
+            func.sum(DailyRollup.focus_seconds),
+        )
+        .where(DailyRollup.user_id == user_id)
+        .where(DailyRollup.goal_id.in_(owned_ids))
+        .where(DailyRollup.date >= start_date)
+        .where(DailyRollup.date <= end_date)
+        .group_by(DailyRollup.goal_id, rollup_bucket)
+    ).all()
+    for goal_id, key, value_sum, seconds in rows:
+        index = positions.get(key)
+        if index is not None:
+            series[goal_id].goal_value_sum[index] = int(value_sum)
+            series[goal_id].focus_seconds[index] = int(seconds)
+
+    return buckets, list(series.values())
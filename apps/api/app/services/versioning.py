@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timezone
+from typing import Collection
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from starlette.status import HTTP_304_NOT_MODIFIED
+
+from app.db.session import get_db, run_db
+from app.models.user import User
+from app.services.auth import CurrentUser, get_current_user
+
+
+def bump_data_version(db: Session, user_id: int, revisions: bool = False) -> None:
+    # Se ejecuta en la misma transaccion que la escritura; revisions=True si cambian metas o revisiones
+    values = {"data_version": User.data_version + 1}
+    if revisions:
+        values["revision_version"] = User.revision_version + 1
+    db.execute(update(User).where(User.id == user_id).values(values))
+
+
+def bump_data_versions(db: Session, user_ids: Collection[int]) -> None:
+    # Escrituras en lote que tocan a varios usuarios (barrido de sesiones vencidas)
+    if not user_ids:
+        return
+    db.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(data_version=User.data_version + 1)
+    )
+
+
+def compute_etag(user_id: int, data_version: int, request: Request) -> str:
+    # La fecha UTC entra en la clave porque varios endpoints resuelven "hoy" por defecto
+    today = datetime.now(timezone.utc).date().isoformat()
+    raw = f"{user_id}:{data_version}:{today}:{request.url.path}?{request.url.query}"
+    return '"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    # "*" no cuenta: el 304 sale antes de comprobar la propiedad y confirmaria ids ajenos
+    candidates = [item.strip() for item in if_none_match.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def _data_version(db: Session, user_id: int) -> int:
+    return db.execute(select(User.data_version).where(User.id == user_id)).scalar_one()
+
+
+async def etag_guard(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(get_current_user),
+) -> int:
+    """Answers 304 before the endpoint runs when the client already has this version.
+
+    Returns the data version the ETag was built from. Endpoints that cache
+    their body put it in the cache key, so a body is never served under an
+    ETag of a later version (writes from another worker, or a compute that
+    started before an invalidation).
+    """
+    data_version = await run_db(db, _data_version, user.id)
+    etag = compute_etag(user.id, data_version, request)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        raise HTTPException(status_code=HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return data_version
@@ -0,0 +1,226 @@
+"""Synthetic data for benchmarks and load tests.
+
+Imported by scripts/benchmark.py and scripts/loadtest.py. DATABASE_URL must be
+set before importing anything from app. SQLite works as a stand-in for
+PostgreSQL once install_sqlite_shims() has been called.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+import sys
+from typing import Any
+
+API_ROOT = Path(__file__).resolve().parents[1]
+if str(API_ROOT) not in sys.path:
+    sys.path.insert(0, str(API_ROOT))
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.security import hash_password
+from app.db.base import Base
+from app.models import FocusSession, Goal, GoalLog, GoalRevision, GoalType, User
+from app.services.rollups import rebuild_rollups
+
+BENCH_PASSWORD = "bench-password"
+INSERT_CHUNK = 5000
+
+
+@dataclass
+class SeedConfig:
+    users: int = 5
+    goals_per_user: int = 6
+    years: int = 2
+    log_probability: float = 0.7
+    sessions_per_day: int = 2
+    seed: int = 1234
+
+
+def install_sqlite_shims() -> None:
+    """Makes SQLite answer the PostgreSQL-only bits the API relies on.
+
+    Registers date_trunc, enforces foreign keys (ON DELETE CASCADE / SET NULL),
+    compiles CAST(... AS DATE) as date() and returns timezone-aware datetimes
+    for DateTime(timezone=True) columns.
+    """
+    from sqlalchemy import Date
+    from sqlalchemy.dialects.sqlite.base import DATETIME
+    from sqlalchemy.ext.compiler import compiles
+    from sqlalchemy.sql.elements import Cast
+
+    def _date_trunc(unit: str, value: Any) -> str | None:
+        if value is None:
+            return None
+        day = date.fromisoformat(str(value)[:10])
+        if unit == "week":
+            day -= timedelta(days=day.weekday())
+        elif unit == "month":
+            day = day.replace(day=1)
+        elif unit == "year":
+            day = day.replace(month=1, day=1)
+        return f"{day.isoformat()} 00:00:00"
+
+    @event.listens_for(Engine, "connect")
+    def _register_functions(dbapi_connection, connection_record) -> None:
+        if hasattr(dbapi_connection, "create_function"):
+            dbapi_connection.create_function("date_trunc", 2, _date_trunc)
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+
+    @compiles(Cast, "sqlite")
+    def _cast_date(element, compiler, **kw):
+        if isinstance(element.type, Date):
+            return f"date({compiler.process(element.clause, **kw)})"
+        return compiler.visit_cast(element, **kw)
+
+    original = DATETIME.result_processor
+
+    def _aware_result_processor(self, dialect, coltype):
+        process = original(self, dialect, coltype)
+        if not getattr(self, "timezone", False):
+            return process
+
+        def _process(value):
+            value = process(value) if process else value
+            if isinstance(value, datetime) and value.tzinfo is None:
+                return value.replace(tzinfo=timezone.utc)
+            return value
+
+        return _process
+
+    DATETIME.result_processor = _aware_result_processor
+
+
+def create_schema(engine: Engine) -> None:
+    # En PostgreSQL lo habitual es migrar con alembic; create_all no toca tablas existentes
+    Base.metadata.create_all(engine)
+
+
+def drop_schema(engine: Engine) -> None:
+    Base.metadata.drop_all(engine)
+
+
+def _bulk_insert(db: Session, model, rows: list[dict[str, Any]]) -> None:
+    for start in range(0, len(rows), INSERT_CHUNK):
+        db.execute(insert(model), rows[start:start + INSERT_CHUNK])
+
+
+def seed(db: Session, config: SeedConfig) -> dict[str, int]:
+    """Inserts users bench_0..bench_{n-1} with goals, revisions, logs and sessions.
+
+    Data is deterministic for a given config. Rollups are rebuilt at the end.
+    """
+    rng = random.Random(config.seed)
+    today = datetime.now(timezone.utc).date()
+    first_day = today - timedelta(days=365 * config.years)
+    days = [first_day + timedelta(days=offset) for offset in range((today - first_day).days + 1)]
+    password_hash = hash_password(BENCH_PASSWORD)
+    goal_types = [GoalType.time, GoalType.count, GoalType.boolean]
+
+    counts = {"users": 0, "goals": 0, "revisions": 0, "logs": 0, "sessions": 0}
+    for user_index in range(config.users):
+        user = User(username=f"bench_{user_index}", password_hash=password_hash)
+        db.add(user)
+        db.flush()
+        counts["users"] += 1
+
+        goals = []
+        for goal_index in range(config.goals_per_user):
+            goal = Goal(
+                user_id=user.id,
+                name=f"Goal {goal_index}",
+                goal_type=goal_types[goal_index % len(goal_types)],
+                is_active=True,
+                created_at=datetime.combine(first_day, time(), tzinfo=timezone.utc),
+            )
+            db.add(goal)
+            goals.append(goal)
+        db.flush()
+        counts["goals"] += len(goals)
+
+        revisions = []
+        for goal in goals:
+            # Una revision por semestre, la ultima abierta
+            starts = days[::182]
+            for position, valid_from in enumerate(starts):
+                valid_to = starts[position + 1] - timedelta(days=1) if position + 1 < len(starts) else None
+                revisions.append(
+                    {
+                        "goal_id": goal.id,
+                        "target_value": rng.randint(1, 60),
+                        "valid_from": valid_from,
+                        "valid_to": valid_to,
+                    }
+                )
+        _bulk_insert(db, GoalRevision, revisions)
+        counts["revisions"] += len(revisions)
+
+        logs = [
+            {
+                "goal_id": goal.id,
+                "focus_session_id": None,
+                "date": day,
+                "value": rng.randint(1, 60),
+                "source": "manual",
+            }
+            for goal in goals
+            for day in days
+            if rng.random() < config.log_probability
+        ]
+        _bulk_insert(db, GoalLog, logs)
+        counts["logs"] += len(logs)
+
+        time_goals = [goal for goal in goals if goal.goal_type == GoalType.time] or goals
+        sessions = []
+        for day in days[:-1]:
+            for _ in range(rng.randint(0, config.sessions_per_day)):
+                started_at = datetime.combine(day, time(rng.randint(6, 22), rng.randint(0, 59)), tzinfo=timezone.utc)
+                duration = rng.choice([900, 1500, 1800, 3000])
+                sessions.append(
+                    {
+                        "user_id": user.id,
+                        "goal_id": rng.choice(time_goals).id,
+                        "duration_seconds": duration,
+                        "paused_seconds": 0,
+                        "status": "completed",
+                        "started_at": started_at,
+                        "started_on": day,
+                        "ended_at": started_at + timedelta(seconds=duration),
+                    }
+                )
+        _bulk_insert(db, FocusSession, sessions)
+        counts["sessions"] += len(sessions)
+
+        focus_logs = [
+            {
+                "goal_id": row.goal_id,
+                "focus_session_id": row.id,
+                "date": row.started_on,
+                "value": max(1, row.duration_seconds // 60),
+                "source": "focus",
+            }
+            for row in db.execute(
+                select(FocusSession.id, FocusSession.goal_id, FocusSession.started_on, FocusSession.duration_seconds)
+                .where(FocusSession.user_id == user.id)
+            )
+        ]
+        _bulk_insert(db, GoalLog, focus_logs)
+        counts["logs"] += len(focus_logs)
+
+    counts["rollups"] = rebuild_rollups(db)
+    return counts
+
+
+def is_seeded(db: Session, config: SeedConfig) -> bool:
+    username = f"bench_{config.users - 1}"
+    return db.execute(select(User.id).where(User.username == username)).first() is not None
+
+
+def describe(config: SeedConfig) -> dict[str, Any]:
+    return asdict(config)
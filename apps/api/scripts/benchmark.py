@@ -0,0 +1,329 @@
+"""Benchmark the API hot paths in-process against seeded synthetic data.
+
+Usage:
+    python scripts/benchmark.py run [--database-url URL] [--output bench.json] [--requests 50]
+    python scripts/benchmark.py compare BASELINE.json CANDIDATE.json
+    python scripts/benchmark.py serialize [--rows 500] [--iterations 200]
+
+Without --database-url a SQLite file (bench.db) stands in for PostgreSQL. The
+database is seeded on first use and reused afterwards; pass --reseed after
+changing the seed options (it drops every table, so only point it at a
+throwaway database). Results hold p50/p95 latency and SQL statements per
+request for each case. `serialize` times only the JSON rendering of a log
+list, without database or HTTP, for the paths a list endpoint can take.
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timedelta, timezone
+import json
+import os
+from pathlib import Path
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable
+
+API_ROOT = Path(__file__).resolve().parents[1]
+if str(API_ROOT) not in sys.path:
+    sys.path.insert(0, str(API_ROOT))
+
+DEFAULT_DATABASE_URL = f"sqlite:///{API_ROOT / 'bench.db'}"
+
+
+class QueryCounter:
+    def __init__(self) -> None:
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, *args: Any) -> None:
+        with self._lock:
+            self.count += 1
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summarize(durations: list[float], queries: list[int], statuses: list[int]) -> dict[str, Any]:
+    codes: dict[str, int] = {}
+    for status in statuses:
+        codes[str(status)] = codes.get(str(status), 0) + 1
+    return {
+        "requests": len(durations),
+        "p50_ms": round(_percentile(durations, 0.50) * 1000, 3),
+        "p95_ms": round(_percentile(durations, 0.95) * 1000, 3),
+        "mean_ms": round(statistics.fmean(durations) * 1000, 3),
+        "queries_per_request": round(statistics.fmean(queries), 2),
+        "status_codes": codes,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=API_ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace) -> int:
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("AUTH_SECRET", "bench-secret-bench-secret-bench-secret")
+    os.environ.setdefault("ADMIN_SECRET", "bench-admin")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if not args.stats_cache:
+        os.environ["STATS_CACHE_MAX_ENTRIES"] = "0"
+
+    import benchdata
+    from sqlalchemy import event, make_url
+    from sqlalchemy.engine import Engine
+
+    if make_url(args.database_url).get_backend_name() == "sqlite":
+        benchdata.install_sqlite_shims()
+
+    from fastapi.testclient import TestClient
+
+    from app.core.settings import settings
+    from app.db import session as db_session
+    from app.main import app
+
+    config = benchdata.SeedConfig(
+        users=args.users,
+        goals_per_user=args.goals,
+        years=args.years,
+        sessions_per_day=args.sessions_per_day,
+        seed=args.seed,
+    )
+    db_session.init_engine()
+    if args.reseed:
+        benchdata.drop_schema(db_session.engine)
+    benchdata.create_schema(db_session.engine)
+    db = db_session.SessionLocal()
+    try:
+        if not benchdata.is_seeded(db, config):
+            started = time.perf_counter()
+            counts = benchdata.seed(db, config)
+            db.commit()
+            print(f"Seeded {counts} in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+    counter = QueryCounter()
+    event.listen(Engine, "after_cursor_execute", counter)
+
+    client = TestClient(app)
+    response = client.post("/api/auth/login", json={"username": "bench_0", "password": benchdata.BENCH_PASSWORD})
+    response.raise_for_status()
+    goal_id = client.get("/api/goals", params={"limit": 1}).json()["items"][0]["id"]
+
+    today = datetime.now(timezone.utc).date()
+    year_ago = today - timedelta(days=365)
+    quarter_ago = today - timedelta(days=90)
+
+    def _get(path: str, params: dict[str, Any] | None = None) -> Callable[[], int]:
+        return lambda: client.get(path, params=params).status_code
+
+    def _focus_lifecycle() -> int:
+        current = client.get("/api/focus/sessions/current")
+        if current.status_code == 200:
+            client.post(f"/api/focus/sessions/{current.json()['id']}/cancel")
+        created = client.post("/api/focus/sessions", json={"duration_seconds": 1500, "goal_id": goal_id})
+        session_id = created.json()["id"]
+        client.post(f"/api/focus/sessions/{session_id}/pause")
+        client.post(f"/api/focus/sessions/{session_id}/resume")
+        client.get("/api/focus/sessions/current")
+        return client.post(f"/api/focus/sessions/{session_id}/complete").status_code
+
+    cases: dict[str, Callable[[], int]] = {
+        "stats_daily": _get("/api/stats/daily"),
+        "stats_weekly": _get("/api/stats/weekly"),
+        "stats_yearly": _get("/api/stats/yearly"),
+        "stats_range_day_90d": _get("/api/stats/range", {"from": quarter_ago.isoformat(), "to": today.isoformat()}),
+        "stats_range_week_1y": _get(
+            "/api/stats/range", {"from": year_ago.isoformat(), "to": today.isoformat(), "bucket": "week"}
+        ),
+        "stats_range_month_1y": _get(
+            "/api/stats/range", {"from": year_ago.isoformat(), "to": today.isoformat(), "bucket": "month"}
+        ),
+        "goal_heatmap_1y": _get(
+            f"/api/goals/{goal_id}/heatmap", {"from": year_ago.isoformat(), "to": today.isoformat()}
+        ),
+        "goal_heatmap_1y_dense": _get(
+            f"/api/goals/{goal_id}/heatmap",
+            {"from": year_ago.isoformat(), "to": today.isoformat(), "format": "dense"},
+        ),
+        "goals_heatmap_1y": _get("/api/goals/heatmap", {"from": year_ago.isoformat(), "to": today.isoformat()}),
+        "logs_90d": _get("/api/logs", {"start_date": quarter_ago.isoformat(), "end_date": today.isoformat()}),
+        "logs_90d_no_total": _get(
+            "/api/logs",
+            {"start_date": quarter_ago.isoformat(), "end_date": today.isoformat(), "include_total": "false"},
+        ),
+        "logs_1y_500": _get(
+            "/api/logs",
+            {"start_date": year_ago.isoformat(), "end_date": today.isoformat(), "limit": 500, "include_total": "false"},
+        ),
+        "goal_logs_500": _get(f"/api/goals/{goal_id}/logs", {"limit": 500, "include_total": "false"}),
+        "focus_sessions_200": _get("/api/focus/sessions", {"limit": 200, "include_total": "false"}),
+        "focus_current": _get("/api/focus/sessions/current"),
+        "focus_lifecycle": _focus_lifecycle,
+    }
+    selected = {name: case for name, case in cases.items() if not args.only or name in args.only}
+
+    results = {}
+    for name, case in selected.items():
+        for _ in range(args.warmup):
+            case()
+        durations: list[float] = []
+        queries: list[int] = []
+        statuses: list[int] = []
+        for _ in range(args.requests):
+            before = counter.count
+            started = time.perf_counter()
+            statuses.append(case())
+            durations.append(time.perf_counter() - started)
+            queries.append(counter.count - before)
+        results[name] = _summarize(durations, queries, statuses)
+        print(
+            f"{name:24} p50={results[name]['p50_ms']:8.2f}ms p95={results[name]['p95_ms']:8.2f}ms "
+            f"queries={results[name]['queries_per_request']}"
+        )
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "database": make_url(args.database_url).get_backend_name(),
+            "db_async": settings.db_async,
+            "stats_cache": args.stats_cache,
+            "python": platform.python_version(),
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "seed": benchdata.describe(config),
+        },
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Wrote {args.output}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    baseline = json.loads(Path(args.baseline).read_text())
+    candidate = json.loads(Path(args.candidate).read_text())
+    print(f"{'case':24} {'p50 base':>10} {'p50 new':>10} {'p95 base':>10} {'p95 new':>10} {'q base':>7} {'q new':>7}")
+    for name, new in candidate["results"].items():
+        old = baseline["results"].get(name)
+        if not old:
+            print(f"{name:24} (new case)")
+            continue
+        print(
+            f"{name:24} {old['p50_ms']:10.2f} {new['p50_ms']:10.2f} {old['p95_ms']:10.2f} {new['p95_ms']:10.2f} "
+            f"{old['queries_per_request']:7} {new['queries_per_request']:7}"
+        )
+    return 0
+
+
+def serialize(args: argparse.Namespace) -> int:
+    os.environ.setdefault("AUTH_SECRET", "bench-secret-bench-secret-bench-secret")
+    os.environ.setdefault("ADMIN_SECRET", "bench-admin")
+
+    import orjson
+    from pydantic import TypeAdapter
+
+    from app.api.responses import ORJSONResponse, schema_rows
+    from app.models import GoalLog
+    from app.schemas.goallog import GoalLogOut, GoalLogsOut
+
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    keys = tuple(GoalLogOut.model_fields)
+    rows = [
+        (i, 1 + i % 6, None if i % 3 else i, created_at.date() - timedelta(days=i), 25, "manual", created_at)
+        for i in range(1, args.rows + 1)
+    ]
+    # Instancias sin sesion: mide la lectura de atributos instrumentados, no la carga
+    objects = [GoalLog(**dict(zip(keys, row))) for row in rows]
+    adapter = TypeAdapter(GoalLogsOut)
+
+    def pydantic_dump_json() -> bytes:
+        # Lo que hace FastAPI con response_model y la clase de respuesta por defecto
+        return adapter.dump_json(GoalLogsOut.model_validate({"items": objects, "total": None}))
+
+    def orjson_response_class() -> bytes:
+        # default_response_class=ORJSONResponse: valida, pasa a dicts y renderiza con orjson
+        validated = GoalLogsOut.model_validate({"items": objects, "total": None})
+        return ORJSONResponse(validated.model_dump()).body
+
+    def rows_to_orjson() -> bytes:
+        return ORJSONResponse({"items": schema_rows(rows, GoalLogOut), "total": None, "next_cursor": None}).body
+
+    cases = {
+        "orm_validate_dump_json": pydantic_dump_json,
+        "orm_validate_orjson": orjson_response_class,
+        "rows_dicts_orjson": rows_to_orjson,
+    }
+    expected = orjson.loads(pydantic_dump_json())
+    for name, case in cases.items():
+        if orjson.loads(case()) != expected:
+            raise SystemExit(f"{name} renders a different payload")
+
+    print(f"{args.rows} logs, {args.iterations} iterations")
+    for name, case in cases.items():
+        for _ in range(args.warmup):
+            case()
+        durations = []
+        for _ in range(args.iterations):
+            started = time.perf_counter()
+            case()
+            durations.append(time.perf_counter() - started)
+        print(
+            f"{name:24} p50={_percentile(durations, 0.50) * 1000:8.3f}ms "
+            f"p95={_percentile(durations, 0.95) * 1000:8.3f}ms"
+        )
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    run_parser.add_argument("--output", default="bench.json")
+    run_parser.add_argument("--requests", type=int, default=50)
+    run_parser.add_argument("--warmup", type=int, default=5)
+    run_parser.add_argument("--users", type=int, default=5)
+    run_parser.add_argument("--goals", type=int, default=6)
+    run_parser.add_argument("--years", type=int, default=2)
+    run_parser.add_argument("--sessions-per-day", type=int, default=2)
+    run_parser.add_argument("--seed", type=int, default=1234)
+    run_parser.add_argument("--reseed", action="store_true", help="drop all tables and seed again")
+    run_parser.add_argument("--stats-cache", action="store_true", help="keep the stats response cache enabled")
+    run_parser.add_argument("--only", nargs="*", help="case names to run")
+
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+
+    serialize_parser = commands.add_parser("serialize")
+    serialize_parser.add_argument("--rows", type=int, default=500)
+    serialize_parser.add_argument("--iterations", type=int, default=200)
+    serialize_parser.add_argument("--warmup", type=int, default=20)
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        return compare(args)
+    if args.command == "serialize":
+        return serialize(args)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,395 @@
+"""Replay the web client's request mix against a running API to find its ceiling.
+
+Usage:
+    uvicorn app.main:app --port 8000            # in another shell
+    python scripts/loadtest.py --users 50 --duration 60 [--speed 5] [--output load.json]
+
+Each virtual user logs in as one of the bench_N users seeded by
+scripts/benchmark.py (or pass --seed-database-url to seed the server's
+database first). It then follows the SPA's timers: habit grid and focus view
+loads, the 5 s poll of /api/focus/sessions/current while a session runs, the
+10 s sync of today's logs, stats views and start/pause/resume/complete cycles.
+--speed divides every interval. The report covers throughput, per-route tail
+latency and DB pool saturation sampled from /api/health/pool.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+import json
+import os
+from pathlib import Path
+import random
+import sys
+import time
+from typing import Any
+
+import httpx
+
+API_ROOT = Path(__file__).resolve().parents[1]
+if str(API_ROOT) not in sys.path:
+    sys.path.insert(0, str(API_ROOT))
+
+# Intervalos del cliente web en segundos, antes de aplicar --speed
+FOCUS_POLL_SECONDS = 5
+TODAY_LOGS_SYNC_SECONDS = 10
+STATS_VIEW_SECONDS = 30
+FOCUS_STEP_SECONDS = 45
+
+
+@dataclass
+class RouteStats:
+    durations: list[float] = field(default_factory=list)
+    statuses: dict[int, int] = field(default_factory=dict)
+    errors: int = 0
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.routes: dict[str, RouteStats] = {}
+
+    async def request(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs: Any):
+        stats = self.routes.setdefault(label, RouteStats())
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            stats.errors += 1
+            return None
+        stats.durations.append(time.perf_counter() - started)
+        stats.statuses[response.status_code] = stats.statuses.get(response.status_code, 0) + 1
+        return response
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class VirtualUser:
+    def __init__(self, index: int, args: argparse.Namespace, recorder: Recorder) -> None:
+        self.username = f"bench_{index % args.bench_users}"
+        self.args = args
+        self.recorder = recorder
+        self.rng = random.Random(args.seed + index)
+        self.goal_ids: list[int] = []
+        self.session_id: int | None = None
+        self.session_status: str | None = None
+
+    async def run(self, client: httpx.AsyncClient, deadline: float) -> None:
+        response = await self.recorder.request(
+            client, "POST /api/auth/login", "POST", "/api/auth/login",
+            json={"username": self.username, "password": self.args.password},
+        )
+        if response is None or response.status_code != 200:
+            return
+
+        await self.load_habits(client)
+        await self.load_focus(client)
+
+        speed = self.args.speed
+        # Arranque escalonado para no sincronizar a todos los usuarios
+        now = time.monotonic()
+        due = {
+            "poll": now + self.rng.uniform(0, FOCUS_POLL_SECONDS / speed),
+            "today": now + self.rng.uniform(0, TODAY_LOGS_SYNC_SECONDS / speed),
+            "stats": now + self.rng.uniform(0, STATS_VIEW_SECONDS / speed),
+            "focus": now + self.rng.uniform(0, FOCUS_STEP_SECONDS / speed),
+        }
+        intervals = {
+            "poll": FOCUS_POLL_SECONDS / speed,
+            "today": TODAY_LOGS_SYNC_SECONDS / speed,
+            "stats": STATS_VIEW_SECONDS / speed,
+            "focus": FOCUS_STEP_SECONDS / speed,
+        }
+        while True:
+            action = min(due, key=due.get)
+            wait = due[action] - time.monotonic()
+            if due[action] >= deadline:
+                return
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if action == "poll":
+                # El cliente solo consulta mientras hay una sesion en marcha
+                if self.session_status == "running":
+                    await self.poll_focus(client)
+            elif action == "today":
+                await self.sync_today(client)
+            elif action == "stats":
+                await self.view_stats(client)
+            else:
+                await self.focus_step(client)
+            due[action] = time.monotonic() + intervals[action]
+
+    async def load_habits(self, client: httpx.AsyncClient) -> None:
+        response = await self.recorder.request(client, "GET /api/goals", "GET", "/api/goals", params={"limit": 200})
+        if response is not None and response.status_code == 200:
+            self.goal_ids = [item["id"] for item in response.json()["items"]]
+        await self.sync_today(client)
+        await asyncio.gather(
+            *(
+                self.recorder.request(
+                    client, "GET /api/goals/{goal_id}/revisions", "GET", f"/api/goals/{goal_id}/revisions"
+                )
+                for goal_id in self.goal_ids
+            )
+        )
+
+    async def load_focus(self, client: httpx.AsyncClient) -> None:
+        await asyncio.gather(
+            self.poll_focus(client),
+            self.recorder.request(
+                client, "GET /api/focus/sessions", "GET", "/api/focus/sessions", params={"limit": 20}
+            ),
+            self.recorder.request(client, "GET /api/goals", "GET", "/api/goals", params={"limit": 200}),
+        )
+
+    async def poll_focus(self, client: httpx.AsyncClient) -> None:
+        response = await self.recorder.request(
+            client, "GET /api/focus/sessions/current", "GET", "/api/focus/sessions/current"
+        )
+        if response is None:
+            return
+        if response.status_code == 200:
+            body = response.json()
+            self.session_id, self.session_status = body["id"], body["status"]
+        elif response.status_code == 204:
+            self.session_id, self.session_status = None, None
+
+    async def sync_today(self, client: httpx.AsyncClient) -> None:
+        today = datetime.now(timezone.utc).date().isoformat()
+        await self.recorder.request(
+            client, "GET /api/logs", "GET", "/api/logs",
+            params={"start_date": today, "end_date": today, "limit": 500},
+        )
+
+    async def view_stats(self, client: httpx.AsyncClient) -> None:
+        today = datetime.now(timezone.utc).date()
+        view = self.rng.choice(["daily", "weekly", "yearly", "heatmap", "month"])
+        if view in ("daily", "weekly", "yearly"):
+            await self.recorder.request(client, f"GET /api/stats/{view}", "GET", f"/api/stats/{view}")
+            return
+        if not self.goal_ids:
+            return
+        goal_id = self.rng.choice(self.goal_ids)
+        if view == "heatmap":
+            await self.recorder.request(
+                client, "GET /api/goals/{goal_id}/heatmap", "GET", f"/api/goals/{goal_id}/heatmap",
+                params={"from": (today - timedelta(days=365)).isoformat(), "to": today.isoformat()},
+            )
+            return
+        await self.recorder.request(
+            client, "GET /api/stats/range", "GET", "/api/stats/range",
+            params={"from": today.replace(day=1).isoformat(), "to": today.isoformat(), "goal_ids": goal_id},
+        )
+
+    async def focus_step(self, client: httpx.AsyncClient) -> None:
+        # Ciclo: crear -> pausar -> reanudar -> completar
+        if self.session_id is None:
+            payload: dict[str, Any] = {"duration_seconds": 1500}
+            if self.goal_ids:
+                payload["goal_id"] = self.rng.choice(self.goal_ids)
+            response = await self.recorder.request(
+                client, "POST /api/focus/sessions", "POST", "/api/focus/sessions", json=payload
+            )
+            if response is not None and response.status_code == 201:
+                body = response.json()
+                self.session_id, self.session_status = body["id"], body["status"]
+            elif response is not None and response.status_code == 409:
+                await self.poll_focus(client)
+            return
+
+        if self.session_status == "running" and self.rng.random() < 0.5:
+            action = "pause"
+        elif self.session_status == "paused":
+            action = "resume"
+        else:
+            action = "complete"
+        response = await self.recorder.request(
+            client, f"POST /api/focus/sessions/{{session_id}}/{action}", "POST",
+            f"/api/focus/sessions/{self.session_id}/{action}",
+        )
+        if response is not None and response.status_code == 200:
+            body = response.json()
+            self.session_status = body["status"]
+            if self.session_status in ("completed", "canceled"):
+                self.session_id, self.session_status = None, None
+        elif response is not None:
+            await self.poll_focus(client)
+
+
+class PoolSampler:
+    def __init__(self) -> None:
+        self.samples: list[dict[str, Any]] = []
+
+    async def run(self, client: httpx.AsyncClient, deadline: float, interval: float) -> None:
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get("/api/health/pool")
+                if response.status_code == 200:
+                    self.samples.append(response.json())
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(interval)
+
+    def summary(self) -> dict[str, Any] | None:
+        if not self.samples:
+            return None
+        # El motor activo es el que acumula checkouts (sync o async segun DB_ASYNC)
+        last = self.samples[-1]
+        engine = max(
+            (name for name in ("sync", "async") if last.get(name)),
+            key=lambda name: last[name].get("checkouts", 0),
+            default=None,
+        )
+        if engine is None:
+            return None
+        series = [sample[engine] for sample in self.samples if sample.get(engine)]
+        first, last_status = series[0], series[-1]
+        in_use = [status.get("in_use", 0) for status in series]
+        size = last_status.get("size", 0)
+        max_overflow = last_status.get("max_overflow", 0)
+        # Saturado es sin conexiones libres, overflow incluido; con overflow ilimitado nunca
+        limit = size + max_overflow if max_overflow >= 0 else None
+        return {
+            "engine": engine,
+            "size": size,
+            "max_overflow": max_overflow,
+            "max_in_use": max(in_use),
+            "mean_in_use": round(sum(in_use) / len(in_use), 2),
+            "saturated_samples": sum(1 for value in in_use if limit is not None and value >= limit),
+            "samples": len(series),
+            "checkouts": last_status.get("checkouts", 0) - first.get("checkouts", 0),
+            "waits": last_status.get("waits", 0) - first.get("waits", 0),
+            "timeouts": last_status.get("timeouts", 0) - first.get("timeouts", 0),
+        }
+
+
+def seed_database(database_url: str, users: int) -> None:
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("AUTH_SECRET", "unused-for-seeding")
+    os.environ.setdefault("ADMIN_SECRET", "unused-for-seeding")
+
+    import benchdata
+    from sqlalchemy import make_url
+
+    if make_url(database_url).get_backend_name() == "sqlite":
+        benchdata.install_sqlite_shims()
+    from app.db import session as db_session
+
+    config = benchdata.SeedConfig(users=users)
+    db_session.init_engine()
+    benchdata.create_schema(db_session.engine)
+    db = db_session.SessionLocal()
+    try:
+        if not benchdata.is_seeded(db, config):
+            print(f"Seeded {benchdata.seed(db, config)}")
+            db.commit()
+    finally:
+        db.close()
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    recorder = Recorder()
+    sampler = PoolSampler()
+    limits = httpx.Limits(max_connections=args.users + 1, max_keepalive_connections=args.users + 1)
+    started_wall = datetime.now(timezone.utc)
+    started = time.monotonic()
+    deadline = started + args.duration
+
+    async def _user(index: int) -> None:
+        # Un cliente por usuario: cada uno tiene su cookie de sesion
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+            if args.ramp_up:
+                await asyncio.sleep(args.ramp_up * index / max(args.users, 1))
+            await VirtualUser(index, args, recorder).run(client, deadline)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as monitor:
+        await asyncio.gather(
+            sampler.run(monitor, deadline, args.sample_interval),
+            *(_user(index) for index in range(args.users)),
+        )
+    elapsed = time.monotonic() - started
+
+    routes = {}
+    total = 0
+    for label, stats in sorted(recorder.routes.items()):
+        total += len(stats.durations) + stats.errors
+        routes[label] = {
+            "requests": len(stats.durations),
+            "errors": stats.errors,
+            "statuses": {str(code): count for code, count in sorted(stats.statuses.items())},
+            "p50_ms": round(_percentile(stats.durations, 0.50) * 1000, 2) if stats.durations else None,
+            "p95_ms": round(_percentile(stats.durations, 0.95) * 1000, 2) if stats.durations else None,
+            "p99_ms": round(_percentile(stats.durations, 0.99) * 1000, 2) if stats.durations else None,
+            "max_ms": round(max(stats.durations) * 1000, 2) if stats.durations else None,
+        }
+    all_durations = [value for stats in recorder.routes.values() for value in stats.durations]
+    return {
+        "meta": {
+            "started_at": started_wall.isoformat(),
+            "base_url": args.base_url,
+            "users": args.users,
+            "duration_seconds": round(elapsed, 2),
+            "speed": args.speed,
+        },
+        "throughput_rps": round(total / elapsed, 2) if elapsed else None,
+        "requests": total,
+        "errors": sum(stats.errors for stats in recorder.routes.values()),
+        "server_errors": sum(
+            count for stats in recorder.routes.values() for code, count in stats.statuses.items() if code >= 500
+        ),
+        "p50_ms": round(_percentile(all_durations, 0.50) * 1000, 2) if all_durations else None,
+        "p95_ms": round(_percentile(all_durations, 0.95) * 1000, 2) if all_durations else None,
+        "p99_ms": round(_percentile(all_durations, 0.99) * 1000, 2) if all_durations else None,
+        "pool": sampler.summary(),
+        "routes": routes,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--bench-users", type=int, default=5, help="distinct bench_N accounts to log in as")
+    parser.add_argument("--password", default="bench-password")
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--speed", type=float, default=1, help="divides the client's timer intervals")
+    parser.add_argument("--ramp-up", type=float, default=5, help="seconds to start all users")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--sample-interval", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--seed-database-url", help="seed bench users into this database before starting")
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args()
+
+    if args.seed_database_url:
+        seed_database(args.seed_database_url, args.bench_users)
+
+    report = asyncio.run(run(args))
+    print(
+        f"{report['requests']} requests in {report['meta']['duration_seconds']}s: "
+        f"{report['throughput_rps']} req/s, p50={report['p50_ms']}ms p95={report['p95_ms']}ms "
+        f"p99={report['p99_ms']}ms, errors={report['errors']} 5xx={report['server_errors']}"
+    )
+    for label, route in report["routes"].items():
+        print(f"  {label:48} n={route['requests']:6} p95={route['p95_ms']}ms p99={route['p99_ms']}ms")
+    if report["pool"]:
+        pool = report["pool"]
+        print(
+            f"pool[{pool['engine']}]: size={pool['size']} max_overflow={pool['max_overflow']} "
+            f"max_in_use={pool['max_in_use']} mean_in_use={pool['mean_in_use']} "
+            f"saturated_samples={pool['saturated_samples']} waits={pool['waits']} timeouts={pool['timeouts']}"
+        )
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Wrote {args.output}")
+    return 1 if report["server_errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
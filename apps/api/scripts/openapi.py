@@ -0,0 +1,53 @@
+"""Write the OpenAPI schema of the API to docs/openapi.json.
+
+Usage:
+    python scripts/openapi.py [--output PATH] [--check]
+
+--check exits with 1 instead of writing when the file is out of date.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import sys
+
+API_ROOT = Path(__file__).resolve().parents[1]
+if str(API_ROOT) not in sys.path:
+    sys.path.insert(0, str(API_ROOT))
+
+DEFAULT_OUTPUT = API_ROOT.parents[1] / "docs" / "openapi.json"
+
+
+def render() -> str:
+    # El esquema no depende de la base ni de los secretos, pero los settings los exigen
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ.setdefault("AUTH_SECRET", "openapi-secret-openapi-secret-openapi")
+    os.environ.setdefault("ADMIN_SECRET", "openapi-admin")
+
+    from app.main import app
+
+    return json.dumps(app.openapi(), indent=2, ensure_ascii=False) + "\n"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--check", action="store_true")
+    args = parser.parse_args()
+
+    schema = render()
+    if args.check:
+        if not args.output.exists() or args.output.read_text() != schema:
+            print(f"{args.output} is out of date; run scripts/openapi.py")
+            return 1
+        return 0
+    args.output.write_text(schema)
+    print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
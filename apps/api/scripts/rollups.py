@@ -0,0 +1,50 @@
+"""Rebuild or verify the daily_rollups table from raw goal logs and focus sessions.
+
+Usage:
+    python scripts/rollups.py rebuild [--user-id ID]
+    python scripts/rollups.py check [--user-id ID]
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+
+API_ROOT = Path(__file__).resolve().parents[1]
+if str(API_ROOT) not in sys.path:
+    sys.path.insert(0, str(API_ROOT))
+
+from app.db import session as db_session
+from app.services.rollups import check_rollups, rebuild_rollups
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--user-id", type=int, default=None)
+    args = parser.parse_args()
+
+    db_session.init_engine()
+    db = db_session.SessionLocal()
+    try:
+        if args.command == "rebuild":
+            count = rebuild_rollups(db, args.user_id)
+            db.commit()
+            print(f"Rebuilt {count} rollup rows")
+            return 0
+
+        mismatches = check_rollups(db, args.user_id)
+        for item in mismatches:
+            print(
+                f"user={item.user_id} goal={item.goal_id} date={item.date} "
+                f"expected={item.expected} stored={item.stored}"
+            )
+        print(f"{len(mismatches)} mismatched rollup rows")
+        return 1 if mismatches else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Deactivate, reactivate or sign out a user everywhere by bumping its token version.
+
+Usage:
+    python scripts/users.py revoke USERNAME
+    python scripts/users.py deactivate USERNAME
+    python scripts/users.py activate USERNAME
+
+Running API processes cache user state for AUTH_USER_CACHE_TTL_SECONDS, so the
+change reaches them within that window.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+
+API_ROOT = Path(__file__).resolve().parents[1]
+if str(API_ROOT) not in sys.path:
+    sys.path.insert(0, str(API_ROOT))
+
+from sqlalchemy import select
+
+from app.db import session as db_session
+from app.models.user import User
+from app.services.auth import revoke_user_tokens
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["revoke", "deactivate", "activate"])
+    parser.add_argument("username")
+    args = parser.parse_args()
+
+    db_session.init_engine()
+    db = db_session.SessionLocal()
+    try:
+        username = args.username.lower().strip()
+        user = db.execute(select(User).where(User.username == username)).scalar_one_or_none()
+        if not user:
+            print(f"User {username} not found")
+            return 1
+
+        if args.command != "revoke":
+            user.is_active = args.command == "activate"
+        revoke_user_tokens(db, user.id)
+        db.commit()
+        print(f"{args.command}: {username}")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Shared fixtures.
+
+Tests run against TEST_DATABASE_URL when set (a throwaway database: the
+schema is dropped and recreated) and against a fresh SQLite file otherwise,
+with the same PostgreSQL shims the benchmarks use. Tests marked `postgres`
+are skipped on SQLite. Query debugging runs in strict mode, so a request that
+repeats a statement past DB_REPEATED_QUERY_THRESHOLD fails its test.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import sys
+import tempfile
+import uuid
+
+API_ROOT = Path(__file__).resolve().parents[1]
+for path in (API_ROOT, API_ROOT / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+# Antes de importar app: los settings se leen al importar
+os.environ["DATABASE_URL"] = os.environ.get(
+    "TEST_DATABASE_URL", f"sqlite:///{Path(tempfile.mkdtemp(prefix='ethos-tests-')) / 'test.db'}"
+)
+os.environ.setdefault("AUTH_SECRET", "test-secret-test-secret-test-secret-test")
+os.environ.setdefault("ADMIN_SECRET", "test-admin")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ["FOCUS_SWEEP_INTERVAL_SECONDS"] = "0"
+# Un N+1 en cualquier endpoint hace fallar el test que lo recorre
+os.environ.setdefault("DB_QUERY_DEBUG", "true")
+os.environ.setdefault("DB_QUERY_DEBUG_STRICT", "true")
+
+import pytest
+from sqlalchemy import make_url
+
+import benchdata
+
+if make_url(os.environ["DATABASE_URL"]).get_backend_name() == "sqlite":
+    benchdata.install_sqlite_shims()
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.security import hash_password
+from app.db import session as db_session
+from app.main import app
+from app.models.user import User
+
+PASSWORD = "test-password"
+
+
+def pytest_collection_modifyitems(config, items):
+    if make_url(os.environ["DATABASE_URL"]).get_backend_name() == "postgresql":
+        return
+    skip = pytest.mark.skip(reason="needs TEST_DATABASE_URL pointing at PostgreSQL")
+    for item in items:
+        if "postgres" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def engine():
+    db_session.init_engine()
+    benchdata.drop_schema(db_session.engine)
+    benchdata.create_schema(db_session.engine)
+    yield db_session.engine
+    db_session.engine.dispose()
+
+
+@pytest.fixture
+def db(engine) -> Session:
+    session = db_session.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user(db: Session) -> User:
+    # Un usuario nuevo por test: los datos y las caches van por usuario
+    user = User(username=f"user_{uuid.uuid4().hex[:12]}", password_hash=hash_password(PASSWORD))
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def client(user: User) -> TestClient:
+    with TestClient(app) as client:
+        response = client.post("/api/auth/login", json={"username": user.username, "password": PASSWORD})
+        response.raise_for_status()
+        yield client
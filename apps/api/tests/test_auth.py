@@ -0,0 +1,59 @@
+"""Token revocation and deactivation through the cached per-user state."""
+
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import update
+
+from app.core.cache import user_state_cache
+from app.models import User
+from app.services import auth
+from app.services.auth import revoke_user_tokens
+
+
+@pytest.fixture
+def state_loads(monkeypatch) -> list[int]:
+    loads: list[int] = []
+    load = auth._load_user_state
+
+    async def _counting(user_id):
+        loads.append(user_id)
+        return await load(user_id)
+
+    monkeypatch.setattr(auth, "_load_user_state", _counting)
+    return loads
+
+
+def test_token_issued_before_revocation_is_rejected(client, db, user):
+    assert client.get("/api/goals").status_code == 200
+
+    revoke_user_tokens(db, user.id)
+    db.commit()
+
+    response = client.get("/api/goals")
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Invalid session"
+
+
+def test_deactivated_user_is_rejected_once_cached_state_is_invalidated(client, db, user):
+    assert client.get("/api/goals").status_code == 200
+
+    # Como otro proceso: solo cambia la fila, la cache de este sigue vigente hasta su TTL
+    db.execute(update(User).where(User.id == user.id).values(is_active=False))
+    db.commit()
+    assert client.get("/api/goals").status_code == 200
+
+    user_state_cache.invalidate_user(user.id)
+    response = client.get("/api/goals")
+    assert response.status_code == 401
+    assert response.json()["detail"] == "User inactive"
+
+
+def test_cached_state_skips_the_database(client, user, state_loads):
+    user_state_cache.invalidate_user(user.id)
+    assert client.get("/api/goals").status_code == 200
+    assert state_loads == [user.id]
+
+    for _ in range(3):
+        assert client.get("/api/goals").status_code == 200
+    assert state_loads == [user.id]
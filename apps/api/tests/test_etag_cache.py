@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from datetime import date
+import uuid
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.cache import stats_cache
+from app.models import DailyRollup, Goal, User
+from app.services.versioning import bump_data_version
+
+DAY = date(2026, 3, 2)
+
+
+def _write_from_other_worker(db: Session, user: User, focus_seconds: int) -> None:
+    # Sin pasar por este proceso: su cache no se invalida, solo cambia data_version
+    db.add(DailyRollup(user_id=user.id, goal_id=None, date=DAY, focus_seconds=focus_seconds, session_count=1))
+    bump_data_version(db, user.id)
+    db.commit()
+
+
+def test_unchanged_data_is_served_from_cache_and_revalidates(client):
+    first = client.get("/api/stats/daily", params={"date": DAY.isoformat()})
+    hits = stats_cache.hits
+    second = client.get("/api/stats/daily", params={"date": DAY.isoformat()})
+    assert stats_cache.hits == hits + 1
+    assert second.json() == first.json()
+    assert second.headers["etag"] == first.headers["etag"]
+    revalidated = client.get(
+        "/api/stats/daily", params={"date": DAY.isoformat()}, headers={"If-None-Match": first.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+
+
+def test_write_in_other_worker_is_not_served_from_stale_cache(client, db, user):
+    before = client.get("/api/stats/daily", params={"date": DAY.isoformat()})
+    assert before.json()["focus_seconds"] == 0
+
+    _write_from_other_worker(db, user, 600)
+
+    after = client.get(
+        "/api/stats/daily", params={"date": DAY.isoformat()}, headers={"If-None-Match": before.headers["etag"]}
+    )
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert after.json()["focus_seconds"] == 600
+
+
+def test_late_set_of_an_old_version_is_not_served(client, db, user):
+    old_version = user.data_version
+    _write_from_other_worker(db, user, 300)
+    # Un calculo empezado antes de la escritura guarda su resultado despues de invalidar
+    stats_cache.invalidate_user(user.id)
+    stale = {"date": DAY, "goal_value_sum": 0, "goal_logs_count": 0, "focus_seconds": 0, "focus_sessions_count": 0}
+    stats_cache.set(user.id, ("daily", old_version, DAY), stale)
+
+    response = client.get("/api/stats/daily", params={"date": DAY.isoformat()})
+    assert response.json()["focus_seconds"] == 300
+
+
+def test_cache_counters_are_exported_on_metrics_only(client):
+    client.get("/api/stats/daily", params={"date": DAY.isoformat()})
+    assert client.get("/api/stats/cache").status_code == 404
+
+    metrics = client.get("/metrics").text
+    assert f'ethos_cache_hits_total{{cache="stats"}} {stats_cache.hits}' in metrics
+    assert 'ethos_cache_entries{cache="revisions"}' in metrics
+
+
+@pytest.mark.parametrize("path", ["/api/goals/{goal_id}", "/api/goals/{goal_id}/heatmap?from=2026-03-01&to=2026-03-02"])
+def test_wildcard_if_none_match_does_not_reveal_other_users_goals(client, db, path):
+    other = User(username=f"other_{uuid.uuid4().hex[:12]}", password_hash="-")
+    db.add(other)
+    db.flush()
+    goal = Goal(user_id=other.id, name="Private", goal_type="count")
+    db.add(goal)
+    db.commit()
+    own_id = client.post("/api/goals", json={"name": "Mine", "goal_type": "count"}).json()["id"]
+
+    assert client.get(path.format(goal_id=goal.id), headers={"If-None-Match": "*"}).status_code == 404
+    assert client.get(path.format(goal_id=own_id), headers={"If-None-Match": "*"}).status_code == 200
@@ -0,0 +1,70 @@
+"""Streamed NDJSON and CSV exports, plain and gzip."""
+
+from __future__ import annotations
+
+import csv
+from datetime import date, timedelta
+import gzip
+import io
+
+import orjson
+import pytest
+from sqlalchemy import insert
+
+from app.models import GoalLog
+from app.services import export
+
+LOGS = 23
+
+
+@pytest.fixture
+def goal_id(client, db, monkeypatch) -> int:
+    # Varios viajes al cursor y varios trozos por respuesta
+    monkeypatch.setattr(export, "YIELD_PER", 5)
+    monkeypatch.setattr(export, "CHUNK_BYTES", 256)
+    goal_id = client.post("/api/goals", json={"name": "Read", "goal_type": "count"}).json()["id"]
+    db.execute(
+        insert(GoalLog),
+        [
+            {"goal_id": goal_id, "date": date(2026, 1, 1) + timedelta(days=day), "value": day + 1, "source": "manual"}
+            for day in range(LOGS)
+        ],
+    )
+    db.commit()
+    return goal_id
+
+
+def test_ndjson_exports_every_entity(client, goal_id):
+    response = client.get("/api/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [orjson.loads(line) for line in response.content.splitlines()]
+    logs = [record for record in records if record["type"] == "log"]
+    assert [record["type"] for record in records] == ["goal"] + ["log"] * LOGS
+    assert [log["value"] for log in logs] == list(range(1, LOGS + 1))
+    assert {log["goal_id"] for log in logs} == {goal_id}
+
+
+def test_csv_exports_one_entity(client, goal_id):
+    response = client.get("/api/export", params={"format": "csv", "entity": "logs"})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == LOGS
+    assert [int(row["value"]) for row in rows] == list(range(1, LOGS + 1))
+    assert rows[0]["date"] == "2026-01-01"
+    assert rows[0]["focus_session_id"] == ""
+
+
+@pytest.mark.parametrize("params", [{}, {"format": "csv", "entity": "logs"}], ids=["ndjson", "csv"])
+def test_gzip_decompresses_to_the_plain_export(client, goal_id, params):
+    plain = client.get("/api/export", params=params)
+    compressed = client.get("/api/export", params={**params, "gzip": "true"})
+    assert compressed.headers["content-type"] == "application/gzip"
+    assert compressed.headers["content-disposition"].endswith('.gz"')
+    assert gzip.decompress(compressed.content) == plain.content
+
+
+def test_csv_of_every_entity_is_rejected(client):
+    response = client.get("/api/export", params={"format": "csv"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "CSV export requires a single entity"
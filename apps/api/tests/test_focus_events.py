@@ -0,0 +1,76 @@
+"""Per-user fan-out of focus session events to open streams."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from app.core.events import QUEUE_SIZE, UserEventHub, focus_events
+from app.services.focus_events import focus_event_stream
+
+
+async def _drain(queue: asyncio.Queue) -> list:
+    # Las entregas se programan en el loop: una vuelta para que lleguen
+    await asyncio.sleep(0)
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+def test_events_reach_only_the_users_own_streams():
+    hub = UserEventHub()
+
+    async def scenario():
+        with hub.subscribe(1) as first, hub.subscribe(1) as second, hub.subscribe(2) as other:
+            hub.publish(1, "session", {"id": 10})
+            # Desde un hilo del threadpool, como los endpoints sincronos
+            thread = threading.Thread(target=hub.publish, args=(2, "completed", {"id": 20}))
+            thread.start()
+            thread.join()
+            await asyncio.sleep(0.01)
+            return await _drain(first), await _drain(second), await _drain(other)
+
+    first, second, other = asyncio.run(scenario())
+    assert first == second == [("session", {"id": 10})]
+    assert other == [("completed", {"id": 20})]
+
+
+def test_slow_stream_keeps_the_newest_events():
+    hub = UserEventHub()
+
+    async def scenario():
+        with hub.subscribe(1) as queue:
+            for index in range(QUEUE_SIZE + 3):
+                hub.publish(1, "session", index)
+            return await _drain(queue)
+
+    events = asyncio.run(scenario())
+    assert [payload for _, payload in events] == list(range(3, QUEUE_SIZE + 3))
+
+
+def test_subscribers_are_removed_on_disconnect():
+    hub = UserEventHub()
+
+    async def scenario():
+        with hub.subscribe(1), hub.subscribe(1):
+            assert len(hub._subscribers[1]) == 2
+        hub.publish(1, "session", None)
+
+    asyncio.run(scenario())
+    assert hub._subscribers == {}
+
+
+def test_closing_the_event_stream_unsubscribes(user):
+    async def scenario():
+        stream = focus_event_stream(user.id)
+        first = await anext(stream)
+        subscribed = user.id in focus_events._subscribers
+        # Lo que hace Starlette cuando el cliente se desconecta
+        await stream.aclose()
+        return first, subscribed
+
+    first, subscribed = asyncio.run(scenario())
+    assert first == "event: session\ndata: null\n\n"
+    assert subscribed
+    assert user.id not in focus_events._subscribers
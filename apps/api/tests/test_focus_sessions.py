@@ -0,0 +1,89 @@
+"""Completion of expired focus sessions by the sweep, and the read-only current session."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models import DailyRollup, FocusSession, GoalLog, User
+from app.services.focus import complete_expired_sessions, utcnow
+from app.services.focus_sweeper import sweep_expired_sessions
+from test_rollups import expire_session
+
+DURATION = 600
+
+
+def _start(client) -> tuple[int, int]:
+    goal_id = client.post("/api/goals", json={"name": "Deep work", "goal_type": "time"}).json()["id"]
+    response = client.post("/api/focus/sessions", json={"duration_seconds": DURATION, "goal_id": goal_id})
+    assert response.status_code == 201
+    return goal_id, response.json()["id"]
+
+
+def _focus_logs(db: Session, session_id: int) -> list[GoalLog]:
+    db.rollback()
+    return list(db.execute(select(GoalLog).where(GoalLog.focus_session_id == session_id)).scalars())
+
+
+def test_expired_session_is_completed_with_one_focus_log(client, db, user):
+    goal_id, session_id = _start(client)
+    expire_session(db, session_id)
+
+    assert [session.id for session in sweep_expired_sessions(db, user.id)] == [session_id]
+
+    (log,) = _focus_logs(db, session_id)
+    assert (log.goal_id, log.value, log.source) == (goal_id, DURATION // 60, "focus")
+    assert db.get(FocusSession, session_id).status == "completed"
+    rollup = db.execute(select(DailyRollup).where(DailyRollup.goal_id == goal_id)).scalar_one()
+    assert (rollup.focus_seconds, rollup.session_count) == (DURATION, 1)
+    assert (rollup.value_sum, rollup.log_count) == (DURATION // 60, 1)
+
+
+def test_second_sweep_does_not_log_twice(client, db, user):
+    _, session_id = _start(client)
+    expire_session(db, session_id)
+
+    assert len(sweep_expired_sessions(db, user.id)) == 1
+    assert sweep_expired_sessions(db, user.id) == []
+    # Ni con el reloj adelantado: la sesion ya completada no pasa el filtro de estado
+    assert complete_expired_sessions(db, utcnow() + timedelta(days=1), user_id=user.id) == []
+    db.rollback()
+    assert len(_focus_logs(db, session_id)) == 1
+
+
+def test_paused_session_does_not_expire(client, db, user):
+    _, session_id = _start(client)
+    assert client.post(f"/api/focus/sessions/{session_id}/pause").status_code == 200
+
+    # Pausada antes de acabar su tiempo: no vence aunque pase un dia
+    assert complete_expired_sessions(db, utcnow() + timedelta(days=1), user_id=user.id) == []
+    db.rollback()
+    assert db.get(FocusSession, session_id).status == "paused"
+    assert _focus_logs(db, session_id) == []
+
+
+def test_current_session_read_does_not_complete_expired_session(client, db, user):
+    _, session_id = _start(client)
+    expire_session(db, session_id)
+    version = db.execute(select(User.data_version).where(User.id == user.id)).scalar_one()
+
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.lstrip().split()[0].upper())
+
+    event.listen(Engine, "before_cursor_execute", _record)
+    try:
+        response = client.get("/api/focus/sessions/current")
+    finally:
+        event.remove(Engine, "before_cursor_execute", _record)
+
+    assert response.status_code == 204
+    assert set(statements) <= {"SELECT", "BEGIN", "ROLLBACK", "COMMIT"}
+    db.rollback()
+    assert db.get(FocusSession, session_id).status == "running"
+    assert db.execute(select(User.data_version).where(User.id == user.id)).scalar_one() == version
+    assert _focus_logs(db, session_id) == []
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services import importer
+
+
+def _goal(client, name: str = "Read") -> int:
+    response = client.post("/api/goals", json={"name": name, "goal_type": "count"})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_batch_returns_committed_rows_like_single_create(client):
+    goal_id = _goal(client)
+    single = client.post(f"/api/goals/{goal_id}/logs", json={"date": "2026-03-01", "value": 2}).json()
+    response = client.post(
+        "/api/logs/batch",
+        json={
+            "operations": [
+                {"op": "create", "goal_id": goal_id, "date": "2026-03-02", "value": 3},
+                {"op": "update", "goal_id": goal_id, "log_id": single["id"], "value": 5},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["value"] for item in items] == [3, 5]
+    # Con zona horaria, igual que el alta individual y el listado
+    assert single["created_at"].endswith("Z")
+    assert all(item["created_at"].endswith("Z") for item in items)
+    listed = {item["id"]: item for item in client.get(f"/api/goals/{goal_id}/logs").json()["items"]}
+    assert all(listed[item["id"]] == item for item in items)
+
+
+def test_import_reports_out_of_range_numbers_per_row(client):
+    goal_id = _goal(client)
+    body = (
+        "goal_id,date,value\n"
+        f"{goal_id},2026-01-01,4\n"
+        f"{goal_id},2026-01-02,99999999999\n"
+        "99999999999,2026-01-03,1\n"
+        f"{goal_id},2026-01-04,2147483647\n"
+    )
+    response = client.post("/api/logs/import", params={"format": "csv"}, content=body)
+    assert response.status_code == 200
+    result = response.json()
+    assert result["inserted"] == 2
+    assert [error["line"] for error in result["errors"]] == [3, 4]
+
+
+def test_import_csv_quoted_field_spanning_lines(client):
+    goal_id = _goal(client)
+    body = (
+        "goal_id,date,value,note\n"
+        f'{goal_id},2026-02-01,1,"first line\nsecond ""quoted"" line"\n'
+        f"{goal_id},2026-02-02,2,plain\n"
+        f'{goal_id},2026-02-03,3,"never closed\n'
+    )
+    # Trozos que cortan el registro de varias lineas por la mitad
+    chunks = [body[:40], body[40:55], body[55:]]
+    response = client.post(
+        "/api/logs/import", params={"format": "csv"}, content=iter(chunk.encode() for chunk in chunks)
+    )
+    result = response.json()
+    assert result["inserted"] == 2
+    assert result["errors"] == [{"line": 5, "error": "Unterminated quoted field"}]
+    logs = client.get(f"/api/goals/{goal_id}/logs").json()["items"]
+    assert sorted(log["value"] for log in logs) == [1, 2]
+
+
+def test_import_over_row_limit_is_rejected_whole(client, monkeypatch):
+    monkeypatch.setattr(importer, "MAX_IMPORT_ROWS", 3)
+    goal_id = _goal(client)
+    body = "goal_id,date,value\n" + "".join(f"{goal_id},2026-04-0{day},1\n" for day in range(1, 6))
+    response = client.post("/api/logs/import", params={"format": "csv"}, content=body)
+    assert response.status_code == 413
+    assert client.get(f"/api/goals/{goal_id}/logs").json()["items"] == []
+
+
+def test_import_keeps_only_the_first_errors(client):
+    body = "".join("not json\n" for _ in range(importer.MAX_IMPORT_ERRORS + 100))
+    result = client.post("/api/logs/import", params={"format": "ndjson"}, content=body).json()
+    assert result["skipped"] == importer.MAX_IMPORT_ERRORS + 100
+    assert len(result["errors"]) == importer.MAX_IMPORT_ERRORS
+    assert result["errors"][-1]["line"] == importer.MAX_IMPORT_ERRORS
+
+
+@pytest.mark.parametrize(
+    ("import_format", "body"),
+    [
+        ("ndjson", b'{"goal_id": 1, "date": "2026-01-01", "value": 1, "note": "' + b"x" * 300),
+        ("csv", b"goal_id,date,value\n1,2026-01-01," + b"9" * 300 + b"\n"),
+        ("csv", b'goal_id,date,value,note\n1,2026-01-01,1,"' + b"x\n" * 150),
+    ],
+    ids=["ndjson_without_newline", "csv_line", "csv_open_quote"],
+)
+def test_import_rejects_long_records(client, monkeypatch, import_format, body):
+    monkeypatch.setattr(importer, "MAX_RECORD_BYTES", 200)
+    chunks = [body[start:start + 64] for start in range(0, len(body), 64)]
+    response = client.post("/api/logs/import", params={"format": import_format}, content=iter(chunks))
+    assert response.status_code == 413
+    assert "longer than 200 bytes" in response.json()["detail"]
+
+
+def test_import_rejects_large_body(client, monkeypatch):
+    monkeypatch.setattr(importer, "MAX_IMPORT_BODY_BYTES", 1000)
+    goal_id = _goal(client)
+    line = f'{{"goal_id": {goal_id}, "date": "2026-05-01", "value": 1}}\n'.encode()
+    response = client.post("/api/logs/import", params={"format": "ndjson"}, content=iter([line * 20] * 5))
+    assert response.status_code == 413
+    assert client.get(f"/api/goals/{goal_id}/logs").json()["items"] == []
+
+
+def test_parser_stops_at_the_chunk_over_the_body_limit(monkeypatch):
+    monkeypatch.setattr(importer, "MAX_IMPORT_BODY_BYTES", 100)
+    parser = importer.RowParser("ndjson")
+    parser.feed(b"x" * 60)
+    with pytest.raises(importer.ImportLimitError):
+        parser.feed(b"x" * 60)
@@ -0,0 +1,63 @@
+"""Per-day heatmap counts in the values, dense and packed formats."""
+
+from __future__ import annotations
+
+import base64
+from datetime import date, timedelta
+import struct
+
+import pytest
+
+from app.api.routers.goals import MAX_HEATMAP_DAYS
+from app.models import DailyRollup
+from app.services.heatmap import UINT16_MAX
+
+RANGE = {"from": "2026-03-01", "to": "2026-03-05"}
+
+
+def _unpack(payload: str) -> list[int]:
+    raw = base64.b64decode(payload)
+    return list(struct.unpack(f"<{len(raw) // 2}H", raw))
+
+
+@pytest.fixture
+def goal_id(client, db, user) -> int:
+    goal_id = client.post("/api/goals", json={"name": "Read", "goal_type": "count"}).json()["id"]
+    client.post(f"/api/goals/{goal_id}/logs", json={"date": "2026-03-01", "value": 1})
+    client.post(f"/api/goals/{goal_id}/logs", json={"date": "2026-03-04", "value": 1})
+    # Mas logs en un dia de los que caben en uint16: se satura en 65535
+    db.add(DailyRollup(user_id=user.id, goal_id=goal_id, date=date(2026, 3, 3), log_count=70_000))
+    db.commit()
+    return goal_id
+
+
+def test_packed_and_dense_round_trip_to_values(client, goal_id):
+    values = client.get(f"/api/goals/{goal_id}/heatmap", params=RANGE).json()["values"]
+    counts = [item["count"] for item in values]
+    assert [item["date"] for item in values] == [f"2026-03-0{day}" for day in range(1, 6)]
+    assert counts == [1, 0, 70_000, 1, 0]
+
+    dense = client.get(f"/api/goals/{goal_id}/heatmap", params={**RANGE, "format": "dense"}).json()
+    assert dense["counts"] == counts
+
+    packed = client.get(f"/api/goals/{goal_id}/heatmap", params={**RANGE, "format": "packed"}).json()
+    assert _unpack(packed["counts"]) == [min(count, UINT16_MAX) for count in counts]
+
+    many = client.get("/api/goals/heatmap", params={**RANGE, "goal_ids": goal_id, "format": "packed"}).json()
+    assert [(item["goal_id"], _unpack(item["counts"])) for item in many["goals"]] == [
+        (goal_id, [1, 0, UINT16_MAX, 1, 0])
+    ]
+
+
+@pytest.mark.parametrize("path", ["/api/goals/{goal_id}/heatmap", "/api/goals/heatmap"])
+def test_range_limit(client, goal_id, path):
+    start = date(2016, 1, 1)
+    url = path.format(goal_id=goal_id)
+    too_long = {"from": start.isoformat(), "to": (start + timedelta(days=MAX_HEATMAP_DAYS)).isoformat()}
+    response = client.get(url, params={**too_long, "format": "dense"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Range too large"
+
+    longest = {"from": start.isoformat(), "to": (start + timedelta(days=MAX_HEATMAP_DAYS - 1)).isoformat()}
+    response = client.get(url, params={**longest, "format": "dense"})
+    assert response.status_code == 200
@@ -0,0 +1,149 @@
+"""The hot stats, logs and sessions filters are served by their indexes.
+
+On PostgreSQL the plans come from EXPLAIN (FORMAT JSON) with sequential
+scans disabled: the seeded tables are small enough that the planner would
+otherwise scan them, and what matters is that the index can serve the
+filter. Partial indexes only exist as such on PostgreSQL, so their cases
+(and the ones a non-partial copy would shadow on SQLite) are marked postgres.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+import re
+from typing import Any, Iterator
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+import benchdata
+from app.db import session as db_session
+from app.models import DailyRollup, FocusSession, Goal, GoalLog, GoalRevision, User
+from app.services.focus import ACTIVE_STATUSES
+
+SEED = benchdata.SeedConfig(users=2, goals_per_user=3, years=1, sessions_per_day=2, seed=7)
+TODAY = datetime.now(timezone.utc).date()
+MONTH_AGO = TODAY - timedelta(days=30)
+
+
+@pytest.fixture(scope="module")
+def seeded(engine) -> dict[str, int]:
+    db = db_session.SessionLocal()
+    try:
+        if not benchdata.is_seeded(db, SEED):
+            benchdata.seed(db, SEED)
+            db.commit()
+        db.execute(text("ANALYZE"))
+        db.commit()
+        user_id = db.execute(select(User.id).where(User.username == "bench_0")).scalar_one()
+        goal_id = db.execute(select(Goal.id).where(Goal.user_id == user_id).limit(1)).scalar_one()
+        session_id = db.execute(
+            select(GoalLog.focus_session_id).where(GoalLog.focus_session_id.is_not(None)).limit(1)
+        ).scalar_one()
+        return {"user_id": user_id, "goal_id": goal_id, "session_id": session_id}
+    finally:
+        db.close()
+
+
+def _plan_indexes(node: dict[str, Any]) -> Iterator[str]:
+    if node["Node Type"] in ("Index Scan", "Index Only Scan", "Bitmap Index Scan"):
+        yield node["Index Name"]
+    for child in node.get("Plans", []):
+        yield from _plan_indexes(child)
+
+
+def used_indexes(db: Session, stmt) -> set[str]:
+    sql = str(stmt.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}))
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SET LOCAL enable_seqscan = off"))
+        (plan,) = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar_one()
+        return set(_plan_indexes(plan["Plan"]))
+    details = [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    return {name for detail in details for name in re.findall(r"INDEX (\w+)", detail)}
+
+
+CASES = [
+    pytest.param(
+        lambda ids: select(Goal.id).where(Goal.user_id == ids["user_id"]).order_by(Goal.created_at, Goal.id),
+        "ix_goals_user_id_created_at",
+        id="goals_list",
+    ),
+    pytest.param(
+        lambda ids: select(FocusSession.id)
+        .where(FocusSession.user_id == ids["user_id"])
+        .order_by(FocusSession.started_at.desc(), FocusSession.id.desc())
+        .limit(50),
+        "ix_focus_sessions_user_id_started_at",
+        id="sessions_list",
+        # En SQLite ix_focus_sessions_active no es parcial y cubre las mismas columnas
+        marks=pytest.mark.postgres,
+    ),
+    pytest.param(
+        lambda ids: select(func.sum(FocusSession.duration_seconds))
+        .where(FocusSession.user_id == ids["user_id"])
+        .where(FocusSession.started_on >= MONTH_AGO)
+        .where(FocusSession.started_on <= TODAY),
+        "ix_focus_sessions_user_id_started_on",
+        id="sessions_by_day",
+    ),
+    pytest.param(
+        lambda ids: select(FocusSession.id)
+        .where(FocusSession.user_id == ids["user_id"])
+        .where(FocusSession.status.in_(ACTIVE_STATUSES)),
+        "ix_focus_sessions_active",
+        id="active_session",
+        marks=pytest.mark.postgres,
+    ),
+    pytest.param(
+        lambda ids: select(FocusSession.id)
+        .where(FocusSession.status.in_(ACTIVE_STATUSES))
+        .where(FocusSession.expires_at <= datetime.now(timezone.utc)),
+        "ix_focus_sessions_active_expires_at",
+        id="expired_sweep",
+        marks=pytest.mark.postgres,
+    ),
+    pytest.param(
+        lambda ids: select(GoalLog.goal_id, GoalLog.value)
+        .where(GoalLog.date >= MONTH_AGO)
+        .where(GoalLog.date <= TODAY),
+        "ix_goal_logs_date",
+        id="logs_by_date",
+    ),
+    pytest.param(
+        lambda ids: select(GoalLog.id).where(GoalLog.focus_session_id == ids["session_id"]),
+        "ix_goal_logs_focus_session_id",
+        id="logs_of_session",
+    ),
+    pytest.param(
+        lambda ids: select(GoalRevision.target_value)
+        .where(GoalRevision.goal_id == ids["goal_id"])
+        .where(GoalRevision.valid_from <= TODAY)
+        .order_by(GoalRevision.valid_from.desc())
+        .limit(1),
+        "ix_goal_revisions_goal_id_valid_from",
+        id="revision_on_day",
+    ),
+    pytest.param(
+        lambda ids: select(GoalRevision.target_value)
+        .where(GoalRevision.goal_id == ids["goal_id"])
+        .where(GoalRevision.valid_to.is_(None)),
+        "ix_goal_revisions_open",
+        id="open_revision",
+        marks=pytest.mark.postgres,
+    ),
+    pytest.param(
+        lambda ids: select(DailyRollup.date, func.sum(DailyRollup.value_sum))
+        .where(DailyRollup.user_id == ids["user_id"])
+        .where(DailyRollup.date >= date(TODAY.year, 1, 1))
+        .where(DailyRollup.date <= TODAY)
+        .group_by(DailyRollup.date),
+        "ix_daily_rollups_user_id_date",
+        id="stats_rollups",
+    ),
+]
+
+
+@pytest.mark.parametrize(("build", "index"), CASES)
+def test_filter_uses_index(db: Session, seeded: dict[str, int], build, index: str):
+    assert index in used_indexes(db, build(seeded))
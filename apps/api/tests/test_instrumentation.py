@@ -0,0 +1,56 @@
+"""Per-request SQL timing and the strict N+1 detector."""
+
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.orm import Session
+
+from app.core.metrics import RequestSQL, current_request_sql
+from app.core.settings import settings
+from app.db.instrumentation import RepeatedQueryError
+from app.models import Goal
+
+
+@pytest.fixture
+def request_sql():
+    sql = RequestSQL(scope={"type": "http", "path": "/test"})
+    token = current_request_sql.set(sql)
+    yield sql
+    current_request_sql.reset(token)
+
+
+def test_failed_statement_does_not_skew_timings(db: Session, request_sql: RequestSQL):
+    with pytest.raises((OperationalError, ProgrammingError)):
+        db.execute(text("SELECT * FROM no_such_table"))
+    db.rollback()
+    db.execute(text("SELECT 1"))
+
+    # Solo la sentencia correcta cuenta, y su tiempo es el suyo
+    assert request_sql.statements == 1
+    assert 0 <= request_sql.seconds < 1
+    assert "query_started_at" not in db.connection().info
+
+
+def test_strict_mode_raises_on_repeated_statement(
+    db: Session, request_sql: RequestSQL, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(settings, "db_query_debug", True)
+    monkeypatch.setattr(settings, "db_query_debug_strict", True)
+    monkeypatch.setattr(settings, "db_repeated_query_threshold", 3)
+
+    for goal_id in range(3):
+        db.execute(select(Goal.id).where(Goal.id == goal_id))
+    with pytest.raises(RepeatedQueryError, match="/test"):
+        db.execute(select(Goal.id).where(Goal.id == 99))
+
+
+def test_lenient_mode_only_counts(db: Session, request_sql: RequestSQL, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "db_query_debug", True)
+    monkeypatch.setattr(settings, "db_query_debug_strict", False)
+    monkeypatch.setattr(settings, "db_repeated_query_threshold", 3)
+
+    for goal_id in range(5):
+        db.execute(select(Goal.id).where(Goal.id == goal_id))
+    assert list(request_sql.statement_counts.values()) == [5]
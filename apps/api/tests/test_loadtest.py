@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from app.core.settings import settings
+from loadtest import PoolSampler
+
+
+def _sample(in_use: int, max_overflow: int = 10) -> dict:
+    return {"sync": {"size": 5, "max_overflow": max_overflow, "in_use": in_use, "checkouts": in_use}, "async": None}
+
+
+def test_overflow_connections_are_not_saturation():
+    sampler = PoolSampler()
+    sampler.samples = [_sample(in_use) for in_use in (3, 5, 9, 15, 15)]
+    summary = sampler.summary()
+    assert (summary["size"], summary["max_overflow"], summary["max_in_use"]) == (5, 10, 15)
+    assert summary["saturated_samples"] == 2
+
+
+def test_unlimited_overflow_never_saturates():
+    sampler = PoolSampler()
+    sampler.samples = [_sample(in_use, max_overflow=-1) for in_use in (5, 40)]
+    assert sampler.summary()["saturated_samples"] == 0
+
+
+def test_pool_health_reports_the_overflow_limit(client):
+    status = client.get("/api/health/pool").json()
+    active = status["async"] or status["sync"]
+    assert active["max_overflow"] == settings.db_max_overflow
@@ -0,0 +1,8 @@
+from __future__ import annotations
+
+import openapi
+
+
+def test_committed_schema_is_up_to_date():
+    # Si falla: python scripts/openapi.py
+    assert openapi.DEFAULT_OUTPUT.read_text() == openapi.render()
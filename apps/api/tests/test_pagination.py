@@ -0,0 +1,76 @@
+"""Keyset and offset pagination of the log lists."""
+
+from __future__ import annotations
+
+import base64
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import insert
+
+from app.models import GoalLog
+
+CREATED_AT = datetime(2026, 3, 1, 10, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def goal_logs(client, db) -> tuple[int, list[int]]:
+    """Seven logs of one goal; four share date and created_at, so only the id orders them."""
+    goal_id = client.post("/api/goals", json={"name": "Read", "goal_type": "count"}).json()["id"]
+    rows = [{"date": date(2026, 3, 1)} for _ in range(4)] + [{"date": date(2026, 3, day)} for day in (2, 3, 4)]
+    db.execute(
+        insert(GoalLog),
+        [{"goal_id": goal_id, "value": 1, "source": "manual", "created_at": CREATED_AT, **row} for row in rows],
+    )
+    db.commit()
+    ids = client.get(f"/api/goals/{goal_id}/logs", params={"limit": 100}).json()
+    return goal_id, [item["id"] for item in ids["items"]]
+
+
+def test_cursor_pages_cover_every_row_once(client, goal_logs):
+    goal_id, expected = goal_logs
+    seen: list[int] = []
+    cursor = None
+    while True:
+        params = {"limit": 2, "include_total": "false"}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get(f"/api/goals/{goal_id}/logs", params=params).json()
+        assert page["total"] is None
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert len(expected) == 7
+    assert seen == expected
+    # Los empates de fecha y created_at salen por id descendente
+    assert seen[3:] == sorted(seen[3:], reverse=True)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor!",
+        base64.urlsafe_b64encode(b"[1]").decode(),
+        base64.urlsafe_b64encode(b'["2026-03-01", "yesterday", 5]').decode(),
+        base64.urlsafe_b64encode(b'{"id": 5}').decode(),
+        base64.urlsafe_b64encode(b"[null, null, null]").decode(),
+    ],
+    ids=["garbage", "short", "bad_datetime", "object", "nulls"],
+)
+def test_malformed_cursor_is_400(client, goal_logs, cursor):
+    goal_id, _ = goal_logs
+    response = client.get(f"/api/goals/{goal_id}/logs", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_offset_pages_keep_the_total(client, goal_logs):
+    goal_id, expected = goal_logs
+    page = client.get(f"/api/goals/{goal_id}/logs", params={"limit": 3, "offset": 2}).json()
+    assert page["total"] == 7
+    assert [item["id"] for item in page["items"]] == expected[2:5]
+
+    everything = client.get("/api/logs", params={"start_date": "2026-03-01", "end_date": "2026-03-04"}).json()
+    assert everything["total"] == 7
+    assert everything["next_cursor"] is None
@@ -0,0 +1,101 @@
+"""Targets in force per day: cached revision timelines, completion and the matrix."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import pytest
+
+from app.api.routers.goals import MAX_MATRIX_DAYS
+from app.models import GoalRevision
+from app.services import revisions
+from app.services.versioning import bump_data_version
+
+RANGE = {"from": "2026-03-01", "to": "2026-03-04"}
+
+
+def _goal(client, target: int, valid_from: str = "2026-01-01") -> int:
+    goal_id = client.post("/api/goals", json={"name": "Read", "goal_type": "count"}).json()["id"]
+    response = client.post(f"/api/goals/{goal_id}/revisions", json={"target_value": target, "valid_from": valid_from})
+    assert response.status_code == 201
+    return goal_id
+
+
+@pytest.fixture
+def timeline_loads(monkeypatch) -> list[int]:
+    loads: list[int] = []
+    load = revisions._load_timelines
+
+    def _counting(db, user_id):
+        loads.append(user_id)
+        return load(db, user_id)
+
+    monkeypatch.setattr(revisions, "_load_timelines", _counting)
+    return loads
+
+
+def _met(client, goal_id: int) -> list[bool]:
+    (series,) = client.get("/api/goals/completion", params={**RANGE, "goal_ids": goal_id}).json()["goals"]
+    return series["met"]
+
+
+def test_timelines_survive_log_writes_and_reload_on_revision_writes(client, timeline_loads):
+    goal_id = _goal(client, target=5)
+    client.post(f"/api/goals/{goal_id}/logs", json={"date": "2026-03-02", "value": 3})
+    assert _met(client, goal_id) == [False, False, False, False]
+    assert len(timeline_loads) == 1
+
+    # Un log cambia data_version y la completitud, pero no las lineas de objetivos
+    client.post(f"/api/goals/{goal_id}/logs", json={"date": "2026-03-03", "value": 6})
+    assert _met(client, goal_id) == [False, False, True, False]
+    assert len(timeline_loads) == 1
+
+    response = client.post(f"/api/goals/{goal_id}/revisions", json={"target_value": 2, "valid_from": "2026-03-02"})
+    assert response.status_code == 201
+    assert _met(client, goal_id) == [False, True, True, False]
+    assert len(timeline_loads) == 2
+
+
+def test_revision_written_in_other_worker_is_not_served_stale(client, db, user, timeline_loads):
+    goal_id = _goal(client, target=5)
+    client.post(f"/api/goals/{goal_id}/logs", json={"date": "2026-03-01", "value": 3})
+    assert _met(client, goal_id) == [False, False, False, False]
+
+    # Sin pasar por este proceso: la cache local no se invalida, solo cambia revision_version
+    db.add(GoalRevision(goal_id=goal_id, target_value=3, valid_from=date(2026, 3, 1)))
+    bump_data_version(db, user.id, revisions=True)
+    db.commit()
+
+    assert _met(client, goal_id) == [True, False, False, False]
+    assert len(timeline_loads) == 2
+
+
+def test_matrix_uses_the_target_in_force_each_day(client):
+    goal_id = _goal(client, target=5)
+    # Desde el 3 rige 2; el cambio cae en mitad del rango, en dias con y sin logs
+    client.post(f"/api/goals/{goal_id}/revisions", json={"target_value": 2, "valid_from": "2026-03-03"})
+    for day in ("2026-03-02", "2026-03-03", "2026-03-05"):
+        client.post(f"/api/goals/{goal_id}/logs", json={"date": day, "value": 3})
+
+    params = {"from": "2026-03-01", "to": "2026-03-05", "goal_ids": goal_id}
+    (row,) = client.get("/api/goals/matrix", params=params).json()["goals"]
+    assert row["target"] == [5, 5, 2, 2, 2]
+    assert row["value"] == [0, 3, 3, 0, 3]
+    assert row["met"] == [False, False, True, False, True]
+    (series,) = client.get("/api/goals/completion", params=params).json()["goals"]
+    assert series["met"] == row["met"]
+
+
+def test_matrix_range_limit(client):
+    start = date(2026, 1, 1)
+    response = client.get(
+        "/api/goals/matrix",
+        params={"from": start.isoformat(), "to": (start + timedelta(days=MAX_MATRIX_DAYS)).isoformat()},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Range too large"
+    response = client.get(
+        "/api/goals/matrix",
+        params={"from": start.isoformat(), "to": (start + timedelta(days=MAX_MATRIX_DAYS - 1)).isoformat()},
+    )
+    assert response.status_code == 200
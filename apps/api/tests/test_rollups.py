@@ -0,0 +1,125 @@
+"""Incrementally maintained daily_rollups match a recompute from the raw rows."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models import DailyRollup, FocusSession
+from app.services.focus import utcnow
+from app.services.focus_sweeper import sweep_expired_sessions
+from app.services.rollups import check_rollups
+
+
+def _goal(client, goal_type: str = "time") -> int:
+    response = client.post("/api/goals", json={"name": "Focus", "goal_type": goal_type})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def _assert_consistent(db: Session, user_id: int) -> None:
+    # Transaccion nueva: ve lo que la API acaba de confirmar
+    db.rollback()
+    assert check_rollups(db, user_id) == []
+
+
+def _start_session(client, goal_id: int | None, duration: int = 300) -> int:
+    response = client.post("/api/focus/sessions", json={"duration_seconds": duration, "goal_id": goal_id})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def expire_session(db: Session, session_id: int) -> None:
+    """Moves a running session back in time so its duration is already up."""
+    session = db.get(FocusSession, session_id)
+    started_at = utcnow() - timedelta(seconds=session.duration_seconds + 60)
+    db.execute(
+        update(FocusSession)
+        .where(FocusSession.id == session_id)
+        .values(started_at=started_at, expires_at=started_at + timedelta(seconds=session.duration_seconds))
+    )
+    db.commit()
+
+
+def test_goal_delete_moves_focus_time_to_rollups_without_goal(client, db, user):
+    goal_id = _goal(client)
+    other_id = _goal(client)
+    client.post(f"/api/goals/{goal_id}/logs", json={"date": "2026-03-01", "value": 2})
+    client.post(f"/api/goals/{other_id}/logs", json={"date": "2026-03-01", "value": 3})
+    session_id = _start_session(client, goal_id)
+    client.post(f"/api/focus/sessions/{session_id}/complete")
+    _start_session(client, None)
+    untouched = set(db.execute(select(DailyRollup.id).where(DailyRollup.goal_id == other_id)).scalars())
+
+    assert client.delete(f"/api/goals/{goal_id}").status_code == 204
+    _assert_consistent(db, user.id)
+    # Solo cambian los rollups de la meta borrada y los de sin meta
+    assert set(db.execute(select(DailyRollup.id).where(DailyRollup.goal_id == other_id)).scalars()) == untouched
+
+
+def test_log_create_update_delete(client, db, user):
+    goal_id = _goal(client, "count")
+    log = client.post(f"/api/goals/{goal_id}/logs", json={"date": "2026-03-01", "value": 2}).json()
+    _assert_consistent(db, user.id)
+
+    assert client.patch(f"/api/goals/{goal_id}/logs/{log['id']}", json={"value": 7}).status_code == 200
+    _assert_consistent(db, user.id)
+
+    assert client.delete(f"/api/goals/{goal_id}/logs/{log['id']}").status_code == 204
+    _assert_consistent(db, user.id)
+
+
+def test_batch(client, db, user):
+    goal_id = _goal(client, "count")
+    first = client.post(f"/api/goals/{goal_id}/logs", json={"date": "2026-03-01", "value": 2}).json()
+    second = client.post(f"/api/goals/{goal_id}/logs", json={"date": "2026-03-02", "value": 4}).json()
+    response = client.post(
+        "/api/logs/batch",
+        json={
+            "operations": [
+                {"op": "create", "goal_id": goal_id, "date": "2026-03-01", "value": 3},
+                {"op": "update", "goal_id": goal_id, "log_id": first["id"], "value": 9},
+                {"op": "delete", "goal_id": goal_id, "log_id": second["id"]},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    _assert_consistent(db, user.id)
+
+
+def test_import(client, db, user):
+    goal_id = _goal(client, "count")
+    client.post(f"/api/goals/{goal_id}/logs", json={"date": "2026-03-01", "value": 2})
+    body = "goal_id,date,value\n" + "".join(f"{goal_id},2026-03-0{day},{day}\n" for day in range(1, 5))
+    result = client.post("/api/logs/import", params={"format": "csv"}, content=body).json()
+    assert result["inserted"] == 3
+    _assert_consistent(db, user.id)
+
+
+def test_focus_session_create_complete_cancel(client, db, user):
+    goal_id = _goal(client)
+    session_id = _start_session(client, goal_id, duration=600)
+    _assert_consistent(db, user.id)
+
+    assert client.post(f"/api/focus/sessions/{session_id}/complete").status_code == 200
+    _assert_consistent(db, user.id)
+
+    session_id = _start_session(client, goal_id)
+    assert client.post(f"/api/focus/sessions/{session_id}/cancel").status_code == 200
+    _assert_consistent(db, user.id)
+
+
+def test_expired_session_sweep(client, db, user):
+    goal_id = _goal(client)
+    session_id = _start_session(client, goal_id)
+    expire_session(db, session_id)
+
+    assert [session.id for session in sweep_expired_sessions(db, user.id)] == [session_id]
+    _assert_consistent(db, user.id)
+
+    # Una sesion vencida tambien se completa al crear la siguiente
+    expire_session(db, _start_session(client, goal_id))
+    _start_session(client, goal_id)
+    _assert_consistent(db, user.id)
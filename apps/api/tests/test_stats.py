@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from app.services.stats import bucket_count, iter_buckets, next_bucket
+
+
+@pytest.mark.parametrize("bucket", ["day", "week", "month"])
+def test_buckets_stop_at_date_max(bucket):
+    assert next_bucket(date.max, bucket) is None
+    starts = iter_buckets(date(9999, 10, 1), date.max, bucket)
+    assert starts[-1] <= date.max
+    assert len(starts) == len(set(starts))
+
+
+def test_daily_stats_on_last_representable_day(client):
+    response = client.get("/api/stats/daily", params={"date": "9999-12-31"})
+    assert response.status_code == 200
+    assert response.json()["goal_value_sum"] == 0
+
+
+@pytest.mark.parametrize("bucket", ["day", "week", "month"])
+def test_range_ending_on_date_max(client, bucket):
+    response = client.get("/api/stats/range", params={"from": "9999-11-01", "to": "9999-12-31", "bucket": bucket})
+    assert response.status_code == 200
+    assert response.json()["buckets"][-1] <= "9999-12-31"
+
+
+@pytest.mark.parametrize("bucket", ["day", "week", "month"])
+def test_bucket_count_matches_iter_buckets(bucket):
+    for start, end in [
+        (date(2024, 1, 1), date(2024, 1, 1)),
+        (date(2023, 12, 31), date(2024, 1, 1)),
+        (date(2024, 2, 28), date(2025, 3, 3)),
+        (date(2021, 1, 3), date(2026, 10, 17)),
+        (date(9999, 1, 1), date.max),
+    ]:
+        assert bucket_count(start, end, bucket) == len(iter_buckets(start, end, bucket))
+
+
+def test_huge_range_rejected_without_building_buckets(client, monkeypatch):
+    def fail(*args):
+        raise AssertionError("buckets built before the size check")
+
+    monkeypatch.setattr("app.services.stats.iter_buckets", fail)
+    response = client.get("/api/stats/range", params={"from": "0001-01-01", "to": "9999-12-30"})
+    assert response.status_code == 400
@@ -57,6 +57,7 @@ export function FocusView({ onStatus }: Props) {
   const pollInFlightRef = useRef(false);
   const hadActiveRef = useRef(false);
   const completingRef = useRef(false);
+  const streamOpenRef = useRef(false);
   const notifiedCompletedIdsRef = useRef<Set<number>>(new Set());
   const dialProgress = (selectedMinutes - MIN_MINUTES) / (MAX_MINUTES - MIN_MINUTES);
 
@@ -72,6 +73,31 @@ export function FocusView({ onStatus }: Props) {
     };
   }, []);
 
+  useEffect(() => {
+    if (typeof EventSource === "undefined") return;
+    const source = new EventSource(api.focusEventsUrl(), { withCredentials: true });
+    source.onopen = () => {
+      streamOpenRef.current = true;
+    };
+    // EventSource reconecta solo; mientras tanto el polling cubre los cambios
+    source.onerror = () => {
+      streamOpenRef.current = false;
+    };
+    source.addEventListener("session", (event) => {
+      applyStreamSession(JSON.parse((event as MessageEvent).data) as FocusSession | null);
+    });
+    source.addEventListener("completed", (event) => {
+      setActiveSession(JSON.parse((event as MessageEvent).data) as FocusSession);
+      hadActiveRef.current = false;
+      onStatus("Focus session completed.");
+      refreshHistory().catch(() => undefined);
+    });
+    return () => {
+      streamOpenRef.current = false;
+      source.close();
+    };
+  }, []);
+
   useEffect(() => {
     if (pollRef.current) {
       window.clearInterval(pollRef.current);
@@ -115,6 +141,8 @@ export function FocusView({ onStatus }: Props) {
 
   useEffect(() => {
     if (!activeSession || activeSession.status !== "running") return;
+    // Con el stream abierto el servidor completa la sesion y envia "completed"
+    if (streamOpenRef.current) return;
     if (remainingSeconds !== null && remainingSeconds <= 0 && !completingRef.current) {
       completingRef.current = true;
       api
@@ -176,8 +204,29 @@ export function FocusView({ onStatus }: Props) {
     }
   }
 
+  function applyStreamSession(session: FocusSession | null) {
+    if (session) {
+      setActiveSession(session);
+      if (session.status === "running" || session.status === "paused") {
+        hadActiveRef.current = true;
+      } else {
+        hadActiveRef.current = false;
+        refreshHistory().catch(() => undefined);
+      }
+      return;
+    }
+    // Sin sesion activa: se conserva la vista de una sesion ya terminada
+    setActiveSession((current) =>
+      current && (current.status === "running" || current.status === "paused") ? null : current
+    );
+    if (hadActiveRef.current) {
+      hadActiveRef.current = false;
+      refreshHistory().catch(() => undefined);
+    }
+  }
+
   async function pollActive() {
-    if (pollInFlightRef.current) return;
+    if (streamOpenRef.current || pollInFlightRef.current) return;
     pollInFlightRef.current = true;
     try {
       const active = await api.focusCurrent();
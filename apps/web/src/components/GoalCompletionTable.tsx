@@ -1,5 +1,5 @@
 import React, { useEffect, useMemo, useState } from "react";
-import { api, Goal, GoalRevision } from "../lib/api";
+import { api, GoalMatrixRow } from "../lib/api";
 
 const APP_TIMEZONE = import.meta.env.VITE_APP_TIMEZONE || "UTC";
 
@@ -47,23 +47,8 @@ function buildWindow(endDate: Date): DayBucket[] {
   return days;
 }
 
-function getActiveTarget(revisions: GoalRevision[], dayKey: string): number {
-  let chosen: GoalRevision | null = null;
-  for (const rev of revisions) {
-    const starts = rev.valid_from <= dayKey;
-    const ends = rev.valid_to === null || rev.valid_to >= dayKey;
-    if (!starts || !ends) continue;
-    if (!chosen || rev.valid_from > chosen.valid_from) {
-      chosen = rev;
-    }
-  }
-  return chosen?.target_value ?? 0;
-}
-
 export function GoalCompletionTable() {
-  const [goals, setGoals] = useState<Goal[]>([]);
-  const [revisionsByGoal, setRevisionsByGoal] = useState<Record<number, GoalRevision[]>>({});
-  const [logsByGoalDate, setLogsByGoalDate] = useState<Record<string, number>>({});
+  const [rows, setRows] = useState<GoalMatrixRow[]>([]);
   const [windowEnd, setWindowEnd] = useState<Date>(() => {
     const d = todayInTimeZone(APP_TIMEZONE);
     d.setHours(0, 0, 0, 0);
@@ -76,55 +61,18 @@ export function GoalCompletionTable() {
   const displayDays = useMemo(() => [...days].reverse(), [days]);
 
   useEffect(() => {
-    loadGoalsAndRevisions();
-  }, []);
-
-  useEffect(() => {
-    if (goals.length === 0) return;
-    loadRangeLogs(days[0].key, days[days.length - 1].key);
-  }, [goals, days]);
-
-  async function loadGoalsAndRevisions() {
-    setLoading(true);
-    setError("");
-    try {
-      const goalsResp = await api.goals(200, 0);
-      const activeGoals = goalsResp.items.filter((g) => g.is_active);
-      setGoals(activeGoals);
-
-      const revisionsResp = await Promise.all(
-        activeGoals.map((goal) => api.goalRevisions(goal.id))
-      );
-      const map: Record<number, GoalRevision[]> = {};
-      activeGoals.forEach((goal, index) => {
-        map[goal.id] = revisionsResp[index].items;
-      });
-      setRevisionsByGoal(map);
-    } catch (err) {
-      setError((err as Error).message || "Failed to load goals.");
-    } finally {
-      setLoading(false);
-    }
-  }
+    loadMatrix(days[0].key, days[days.length - 1].key);
+  }, [days]);
 
-  async function loadRangeLogs(start: string, end: string) {
+  async function loadMatrix(start: string, end: string) {
     setLoading(true);
     setError("");
     try {
-      const logsResp = await api.logsByDateRange({
-        start_date: start,
-        end_date: end,
-        limit: 500,
-        offset: 0,
-      });
-      const buckets: Record<string, number> = {};
-      for (const log of logsResp.items) {
-        const key = `${log.goal_id}|${log.date}`;
-        buckets[key] = (buckets[key] || 0) + log.value;
-      }
-      setLogsByGoalDate(buckets);
+      // Una sola llamada: metas activas, objetivo vigente y total por dia
+      const matrix = await api.goalMatrix({ from: start, to: end });
+      setRows(matrix.goals);
     } catch (err) {
-      setError((err as Error).message || "Failed to load period logs.");
+      setError((err as Error).message || "Failed to load target checks.");
     } finally {
       setLoading(false);
     }
@@ -185,7 +133,7 @@ export function GoalCompletionTable() {
         <div className="chat-subtitle">Loading table...</div>
       ) : error ? (
         <div className="chat-subtitle">{error}</div>
-      ) : goals.length === 0 ? (
+      ) : rows.length === 0 ? (
         <div className="chat-subtitle">No active goals.</div>
       ) : (
         <div className="stats-table-scroll">
@@ -199,19 +147,18 @@ export function GoalCompletionTable() {
               </tr>
             </thead>
             <tbody>
-              {goals.map((goal) => (
-                <tr key={goal.id}>
-                  <td>{goal.name}</td>
-                  {displayDays.map((day) => {
-                    const done = logsByGoalDate[`${goal.id}|${day.key}`] || 0;
-                    const target =
-                      goal.goal_type === "boolean"
-                        ? 1
-                        : getActiveTarget(revisionsByGoal[goal.id] || [], day.key);
-                    const hit = target > 0 && done >= target;
+              {rows.map((row) => (
+                <tr key={row.goal_id}>
+                  <td>{row.name}</td>
+                  {displayDays.map((day, index) => {
+                    // displayDays va al reves que la matriz, que empieza en days[0]
+                    const offset = days.length - 1 - index;
+                    const done = row.value[offset] ?? 0;
+                    const target = row.target[offset] ?? 0;
+                    const hit = row.met[offset] ?? false;
                     return (
                       <td
-                        key={`${goal.id}-${day.key}`}
+                        key={`${row.goal_id}-${day.key}`}
                         title={`${done}/${target}`}
                         className={hit ? "ok" : ""}
                       >
@@ -99,19 +99,12 @@ export function GoalMonthChart() {
       const { start, end } = monthRange(selectedMonth);
       const from = formatDateKey(start);
       const to = formatDateKey(end);
-      const logs = await api.logsByDateRange({ start_date: from, end_date: to, limit: 500, offset: 0 });
-      const byDay: Record<number, number> = {};
-      for (const log of logs.items) {
-        if (log.goal_id !== selectedGoalId) continue;
-        const day = Number(log.date.split("-")[2] || "0");
-        if (!day) continue;
-        byDay[day] = (byDay[day] || 0) + log.value;
-      }
-      const daysInMonth = end.getDate();
-      const nextPoints: DayPoint[] = [];
-      for (let d = 1; d <= daysInMonth; d += 1) {
-        nextPoints.push({ day: d, minutes: byDay[d] || 0 });
-      }
+      const stats = await api.rangeStats({ from, to, bucket: "day", goal_ids: [selectedGoalId] });
+      const values = stats.goals.find((g) => g.goal_id === selectedGoalId)?.goal_value_sum || [];
+      const nextPoints: DayPoint[] = stats.buckets.map((bucket, index) => ({
+        day: Number(bucket.split("-")[2] || "0"),
+        minutes: values[index] || 0,
+      }));
       setPoints(nextPoints);
     } catch (err) {
       setError((err as Error).message || "Failed to load chart.");
@@ -1,5 +1,5 @@
 import React, { useEffect, useMemo, useState } from "react";
-import { api, GoalRevision } from "../lib/api";
+import { api } from "../lib/api";
 import { GoalMonthChart } from "./GoalMonthChart";
 import { GoalCompletionTable } from "./GoalCompletionTable";
 import { GifPicker } from "./GifPicker";
@@ -70,19 +70,6 @@ function getColor(intensity: number) {
   return "#16a34a";
 }
 
-function getActiveTarget(revisions: GoalRevision[], dayKey: string): number {
-  let chosen: GoalRevision | null = null;
-  for (const rev of revisions) {
-    const starts = rev.valid_from <= dayKey;
-    const ends = rev.valid_to === null || rev.valid_to >= dayKey;
-    if (!starts || !ends) continue;
-    if (!chosen || rev.valid_from > chosen.valid_from) {
-      chosen = rev;
-    }
-  }
-  return chosen?.target_value ?? 0;
-}
-
 type Props = {
   gifName: string;
   onGifChange: (value: string) => void;
@@ -155,49 +142,18 @@ export function HeatmapView({ gifName, onGifChange }: Props) {
       const from = formatDateKey(dates[0]);
       const to = formatDateKey(dates[dates.length - 1]);
 
-      const revisionsResponses = await Promise.all(
-        activeGoals.map((goal) => api.goalRevisions(goal.id))
-      );
-      const revisionsByGoal: Record<number, GoalRevision[]> = {};
-      activeGoals.forEach((goal, index) => {
-        revisionsByGoal[goal.id] = revisionsResponses[index].items;
-      });
-
-      const limit = 500;
-      let offset = 0;
-      let total = 0;
-      const logsByGoalDate: Record<string, number> = {};
-      do {
-        const logsResp = await api.logsByDateRange({
-          start_date: from,
-          end_date: to,
-          limit,
-          offset,
-        });
-        total = logsResp.total;
-        for (const log of logsResp.items) {
-          const key = `${log.goal_id}|${log.date}`;
-          logsByGoalDate[key] = (logsByGoalDate[key] || 0) + log.value;
-        }
-        offset += logsResp.items.length;
-      } while (offset < total);
-
-      const computedCells = dates.map(date => {
-        const key = formatDateKey(date);
+      // Una sola peticion: el servidor resuelve la revision vigente de cada dia
+      const completion = await api.goalCompletion({ from, to });
+      const computedCells = dates.map((date, index) => {
         let completedGoals = 0;
-        for (const goal of activeGoals) {
-          const done = logsByGoalDate[`${goal.id}|${key}`] || 0;
-          const target =
-            goal.goal_type === "boolean"
-              ? 1
-              : getActiveTarget(revisionsByGoal[goal.id] || [], key);
-          if (target > 0 && done >= target) {
+        for (const goal of completion.goals) {
+          if (goal.met[index]) {
             completedGoals += 1;
           }
         }
         return {
           date,
-          key,
+          key: formatDateKey(date),
           count: completedGoals,
         };
       });
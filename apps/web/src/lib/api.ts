@@ -23,7 +23,8 @@ export type Goal = {
 
 export type GoalsResponse = {
   items: Goal[];
-  total: number;
+  total: number | null;
+  next_cursor: string | null;
 };
 
 export type GoalRevision = {
@@ -52,7 +53,24 @@ export type GoalLog = {
 
 export type GoalLogsResponse = {
   items: GoalLog[];
-  total: number;
+  total: number | null;
+  next_cursor: string | null;
+};
+
+export type GoalLogImportResult = {
+  inserted: number;
+  skipped: number;
+  errors: { line: number; error: string }[];
+};
+
+export type GoalLogBatchOperation =
+  | { op: "create"; goal_id: number; date: string; value: number }
+  | { op: "update"; goal_id: number; log_id: number; value: number }
+  | { op: "delete"; goal_id: number; log_id: number };
+
+export type GoalLogBatchResult = {
+  items: GoalLog[];
+  deleted_ids: number[];
 };
 
 export type GoalHeatmapValue = {
@@ -68,6 +86,52 @@ export type GoalHeatmapResponse = {
   values: GoalHeatmapValue[];
 };
 
+export type GoalHeatmapSeries = {
+  goal_id: number;
+  // dense: counts[i] es el dia from + i; packed: base64 de uint16 little-endian
+  counts: number[] | string;
+};
+
+export type GoalsHeatmapResponse = {
+  from: string;
+  to: string;
+  unit: "day";
+  format: "dense" | "packed";
+  goals: GoalHeatmapSeries[];
+};
+
+export function decodeHeatmapCounts(counts: number[] | string): number[] {
+  if (typeof counts !== "string") return counts;
+  const bytes = Uint8Array.from(atob(counts), (c) => c.charCodeAt(0));
+  const view = new DataView(bytes.buffer);
+  const out: number[] = [];
+  for (let i = 0; i + 1 < bytes.length; i += 2) out.push(view.getUint16(i, true));
+  return out;
+}
+
+export type GoalCompletionResponse = {
+  from: string;
+  to: string;
+  // met[i] corresponde al dia from + i
+  goals: { goal_id: number; met: boolean[] }[];
+};
+
+export type GoalMatrixRow = {
+  goal_id: number;
+  name: string;
+  goal_type: GoalType;
+  // target[i], value[i] y met[i] corresponden al dia from + i
+  target: number[];
+  value: number[];
+  met: boolean[];
+};
+
+export type GoalMatrixResponse = {
+  from: string;
+  to: string;
+  goals: GoalMatrixRow[];
+};
+
 export type FocusSession = {
   id: number;
   user_id: number;
@@ -81,7 +145,8 @@ export type FocusSession = {
 
 export type FocusSessionsResponse = {
   items: FocusSession[];
-  total: number;
+  total: number | null;
+  next_cursor: string | null;
 };
 
 export type DailyStats = {
@@ -119,6 +184,22 @@ export type YearlyStats = {
   months: YearlyMonthStats[];
 };
 
+export type StatsBucket = "day" | "week" | "month";
+
+export type RangeGoalSeries = {
+  goal_id: number;
+  goal_value_sum: number[];
+  focus_seconds: number[];
+};
+
+export type RangeStats = {
+  from: string;
+  to: string;
+  bucket: StatsBucket;
+  buckets: string[];
+  goals: RangeGoalSeries[];
+};
+
 function apiHeaders() {
   return {
     "Content-Type": "application/json",
@@ -186,14 +267,49 @@ export const api = {
     apiFetch<GoalLog>(`/goals/${goalId}/logs/${logId}`, { method: "PATCH", body: JSON.stringify(payload) }),
   deleteGoalLog: (goalId: number, logId: number) =>
     apiFetch<void>(`/goals/${goalId}/logs/${logId}`, { method: "DELETE" }),
+  importGoalLogs: (body: string, format: "csv" | "ndjson" = "csv") =>
+    apiFetch<GoalLogImportResult>(`/logs/import?format=${format}`, {
+      method: "POST",
+      body,
+      headers: { "Content-Type": format === "csv" ? "text/csv" : "application/x-ndjson" },
+    }),
+  batchGoalLogs: (operations: GoalLogBatchOperation[]) =>
+    apiFetch<GoalLogBatchResult>("/logs/batch", { method: "POST", body: JSON.stringify({ operations }) }),
   goalHeatmap: (goalId: number, from: string, to: string) =>
     apiFetch<GoalHeatmapResponse>(`/goals/${goalId}/heatmap?from=${encodeURIComponent(from)}&to=${encodeURIComponent(to)}`),
-  logsByDateRange: (params: { start_date?: string; end_date?: string; limit?: number; offset?: number } = {}) => {
+  goalsHeatmap: (params: { from: string; to: string; goal_ids?: number[]; format?: "dense" | "packed" }) => {
+    const query = new URLSearchParams({ from: params.from, to: params.to, format: params.format || "dense" });
+    for (const goalId of params.goal_ids || []) query.append("goal_ids", String(goalId));
+    return apiFetch<GoalsHeatmapResponse>(`/goals/heatmap?${query.toString()}`);
+  },
+  goalCompletion: (params: { from: string; to: string; goal_ids?: number[] }) => {
+    const query = new URLSearchParams({ from: params.from, to: params.to });
+    for (const goalId of params.goal_ids || []) query.append("goal_ids", String(goalId));
+    return apiFetch<GoalCompletionResponse>(`/goals/completion?${query.toString()}`);
+  },
+  goalMatrix: (params: { from: string; to: string; goal_ids?: number[]; include_inactive?: boolean }) => {
+    const query = new URLSearchParams({ from: params.from, to: params.to });
+    for (const goalId of params.goal_ids || []) query.append("goal_ids", String(goalId));
+    if (params.include_inactive) query.set("include_inactive", "true");
+    return apiFetch<GoalMatrixResponse>(`/goals/matrix?${query.toString()}`);
+  },
+  logsByDateRange: (
+    params: {
+      start_date?: string;
+      end_date?: string;
+      limit?: number;
+      offset?: number;
+      cursor?: string;
+      include_total?: boolean;
+    } = {}
+  ) => {
     const query = new URLSearchParams();
     if (params.start_date) query.set("start_date", params.start_date);
     if (params.end_date) query.set("end_date", params.end_date);
     if (params.limit !== undefined) query.set("limit", String(params.limit));
     if (params.offset !== undefined) query.set("offset", String(params.offset));
+    if (params.cursor) query.set("cursor", params.cursor);
+    if (params.include_total !== undefined) query.set("include_total", String(params.include_total));
     const suffix = query.toString();
     return apiFetch<GoalLogsResponse>(`/logs${suffix ? `?${suffix}` : ""}`);
   },
@@ -220,6 +336,8 @@ export const api = {
     }
     return (await resp.json()) as FocusSession;
   },
+  // Server-sent events: estado de la sesion activa sin polling
+  focusEventsUrl: () => `${apiBase}/focus/sessions/events`,
   focusSessions: (limit = 20, offset = 0) =>
     apiFetch<FocusSessionsResponse>(`/focus/sessions?limit=${limit}&offset=${offset}`),
 
@@ -229,6 +347,22 @@ export const api = {
   },
   weeklyStats: () => apiFetch<WeeklyStats>("/stats/weekly"),
   yearlyStats: () => apiFetch<YearlyStats>("/stats/yearly"),
+  rangeStats: (params: { from: string; to: string; bucket?: StatsBucket; goal_ids?: number[] }) => {
+    const query = new URLSearchParams({ from: params.from, to: params.to });
+    if (params.bucket) query.set("bucket", params.bucket);
+    for (const goalId of params.goal_ids || []) query.append("goal_ids", String(goalId));
+    return apiFetch<RangeStats>(`/stats/range?${query.toString()}`);
+  },
+
+  // URL de descarga: el navegador sigue el stream directamente
+  exportUrl: (params: { format?: "ndjson" | "csv"; entity?: "all" | "goals" | "revisions" | "logs" | "sessions"; gzip?: boolean } = {}) => {
+    const query = new URLSearchParams();
+    if (params.format) query.set("format", params.format);
+    if (params.entity) query.set("entity", params.entity);
+    if (params.gzip) query.set("gzip", "true");
+    const suffix = query.toString();
+    return `${apiBase}/export${suffix ? `?${suffix}` : ""}`;
+  },
 
   health: () => apiFetch<{ status: string }>("/health"),
 };